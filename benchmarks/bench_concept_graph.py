@@ -0,0 +1,103 @@
+"""
+Micro-benchmark of the insight map analytics (concept_graph.py) on synthetic evidence.
+
+Records are drawn from a few topics with skewed vocabularies, so the concept
+graph has the communities, hubs and bridges of real evidence. Each stage is
+timed separately, and when networkx is installed the metrics are checked
+against its reference implementations first. The concept cap is raised from
+the server's `MAX_TERMS` to `BENCH_MAX_TERMS`, so the larger sizes reach
+thousands of nodes:
+
+    python benchmarks/bench_concept_graph.py --records 200 2000 6000 --max-terms 3000
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+import numpy as np  # noqa: E402
+
+import concept_graph  # noqa: E402
+from evidence import EvidenceRecord  # noqa: E402
+
+TOPICS = 20
+# Concept cap while benchmarking, well above concept_graph.MAX_TERMS
+BENCH_MAX_TERMS = 3000
+SEEDS = [f"topic{number}" for number in range(5)]
+
+
+def synthetic_records(count: int, vocabulary: int, seed: int = 0) -> List[EvidenceRecord]:
+    rng = random.Random(seed)
+    words = [f"term{number:05d}" for number in range(vocabulary)]
+    span = vocabulary // TOPICS
+    records = []
+    for number in range(count):
+        topic = rng.randrange(TOPICS)
+        title = " ".join(words[min(vocabulary - 1, int(rng.expovariate(2 / span)) + topic * span)] for _ in range(8))
+        records.append(EvidenceRecord(source="semantic_scholar", id=str(number), title=title, fields_of_study=[f"Field {topic % 7}"], query=f"topic{topic}"))
+    return records
+
+
+def check_against_networkx(records: List[EvidenceRecord]) -> None:
+    try:
+        import networkx
+    except ImportError:
+        print("networkx not installed, metrics not checked")
+        return
+    graph = concept_graph.analyze_concepts(records, SEEDS)
+    _, matrix = concept_graph.incidence(records, SEEDS)
+    weights = concept_graph.jaccard(matrix)
+    reference = networkx.from_scipy_sparse_array(weights)
+    labels = concept_graph.label_propagation(weights)
+    expected = {
+        "density": networkx.density(reference),
+        "average_clustering": networkx.average_clustering(reference),
+        "transitivity": networkx.transitivity(reference),
+        "modularity": networkx.community.modularity(reference, [set(np.flatnonzero(labels == label)) for label in range(labels.max() + 1)], weight="weight"),
+    }
+    for name, value in expected.items():
+        assert abs(graph.properties[name] - value) < 1e-3, f"{name}: {graph.properties[name]} != networkx {value}"
+    print(f"metrics match networkx on {len(records)} records")
+
+
+def bench(records: List[EvidenceRecord], repeat: int) -> Dict[str, Any]:
+    stages: Dict[str, List[float]] = {"incidence": [], "jaccard": [], "communities": [], "total": []}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, matrix = concept_graph.incidence(records, SEEDS)
+        stages["incidence"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        weights = concept_graph.jaccard(matrix)
+        stages["jaccard"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        concept_graph.label_propagation(weights)
+        stages["communities"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        graph = concept_graph.analyze_concepts(records, SEEDS)
+        stages["total"].append(time.perf_counter() - start)
+    return {"nodes": int(graph.properties["nodes"]), "edges": int(graph.properties["edges"]), **{stage: statistics.median(samples) for stage, samples in stages.items()}}
+
+
+def main(options: argparse.Namespace) -> None:
+    concept_graph.MAX_TERMS = options.max_terms
+    check_against_networkx(synthetic_records(min(options.records), options.vocabulary))
+    print(f"\n{'records':>8} {'nodes':>6} {'edges':>8} {'incidence':>10} {'jaccard':>8} {'communities':>12} {'total':>8}  (ms, p50)")
+    for count in options.records:
+        result = bench(synthetic_records(count, options.vocabulary), options.repeat)
+        print(f"{count:>8} {result['nodes']:>6} {result['edges']:>8} " + " ".join(f"{result[stage] * 1000:>{width}.1f}" for stage, width in (("incidence", 10), ("jaccard", 8), ("communities", 12), ("total", 8))))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the insight map network analytics on synthetic evidence.")
+    parser.add_argument("--records", type=int, nargs="+", default=[100, 500, 2000, 6000], help="Evidence record counts to benchmark")
+    parser.add_argument("--vocabulary", type=int, default=4000, help="Distinct title words")
+    parser.add_argument("--max-terms", type=int, default=BENCH_MAX_TERMS, help=f"Title terms kept as concepts (the servers keep {concept_graph.MAX_TERMS})")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per size")
+    main(parser.parse_args())
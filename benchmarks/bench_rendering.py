@@ -0,0 +1,183 @@
+"""
+Micro-benchmark of report rendering on large agent outputs.
+
+Compares the `ReportSpec` engine against the per-field f-string joins the
+tools used before (kept below for two representative reports) and times the
+engine on all six response models in every output format. The engine's
+markdown is checked to be identical to the legacy output first.
+
+    python benchmarks/bench_rendering.py --items 500 --item-chars 300
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import timeit
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+REPORTS = [
+    ("innovation_breakthrough_agent", "breakthrough_report", "InnovationBreakthroughResponse", {"roadblock_description": "Agents lose context across long tool chains"}),
+    ("semantic_scholar_innovation_agent", "research_report", "SemanticScholarInnovationResponse", {"innovation_idea": "Self-healing battery electrolytes"}),
+    ("knowledge_synthesizer", "synthesis_report", "KnowledgeSynthesis", {"research_question": "How do LLMs change materials discovery?", "domains": ["materials science", "machine learning"]}),
+    ("knowledge_synthesizer", "insight_map_report", "InsightMap", {"topics": ["quantum sensing", "navigation"], "visualization_type": "network"}),
+    ("knowledge_synthesizer", "brief_report", "StrategicBrief", {"topic": "Edge AI chips", "stakeholders": ["OEMs", "regulators"], "objectives": ["market entry"]}),
+    ("knowledge_synthesizer", "trend_report", "TrendAnalysis", {"domain": "synthetic biology", "timeframe": "short-term", "sources": ["academic", "industry"]}),
+]
+
+
+def legacy_breakthrough(breakthrough_data: Any, roadblock_description: str) -> str:
+    """The breakthrough_innovation_roadblock report as it was built before the engine (sections only, static footer trimmed)."""
+    return f"""# Innovation Breakthrough Analysis
+
+## Roadblock Challenge
+{roadblock_description}
+
+---
+
+## 🔍 Novel Perspectives
+{chr(10).join(f"• **{perspective.split(':')[0]}**: {perspective.split(':', 1)[1] if ':' in perspective else perspective}" for perspective in breakthrough_data.novel_perspectives)}
+
+## 🚀 Creative Approaches
+{chr(10).join(f"• **{approach.split(':')[0]}**: {approach.split(':', 1)[1] if ':' in approach else approach}" for approach in breakthrough_data.creative_approaches)}
+
+## 🔬 First Principles Insights
+{chr(10).join(f"• **{insight.split(':')[0]}**: {insight.split(':', 1)[1] if ':' in insight else insight}" for insight in breakthrough_data.first_principles_insights)}
+
+## 💡 Breakthrough Opportunities
+{chr(10).join(f"• **{opportunity.split(':')[0]}**: {opportunity.split(':', 1)[1] if ':' in opportunity else opportunity}" for opportunity in breakthrough_data.breakthrough_opportunities)}
+
+## ⚙️ Implementation Strategies
+{chr(10).join(f"• **{strategy.split(':')[0]}**: {strategy.split(':', 1)[1] if ':' in strategy else strategy}" for strategy in breakthrough_data.implementation_strategies)}
+
+## 🎯 Unconventional Solutions
+{chr(10).join(f"• **{solution.split(':')[0]}**: {solution.split(':', 1)[1] if ':' in solution else solution}" for solution in breakthrough_data.unconventional_solutions)}
+
+## 🌐 Cross-Domain Connections
+{chr(10).join(f"• **{connection.split(':')[0]}**: {connection.split(':', 1)[1] if ':' in connection else connection}" for connection in breakthrough_data.cross_domain_connections)}
+
+## 🔄 Paradigm Shifts
+{chr(10).join(f"• **{shift.split(':')[0]}**: {shift.split(':', 1)[1] if ':' in shift else shift}" for shift in breakthrough_data.paradigm_shifts)}
+
+## 📋 Innovation Frameworks
+{chr(10).join(f"• **{framework.split(':')[0]}**: {framework.split(':', 1)[1] if ':' in framework else framework}" for framework in breakthrough_data.innovation_frameworks)}
+
+## 🔮 Next Exploration Paths
+{chr(10).join(f"• **{path.split(':')[0]}**: {path.split(':', 1)[1] if ':' in path else path}" for path in breakthrough_data.next_exploration_paths)}
+"""
+
+
+def legacy_synthesis(synthesis_data: Any, research_question: str, domains: List[str]) -> str:
+    """The synthesize_knowledge_domains report as it was built before the engine."""
+    return f"""# Cross-Domain Knowledge Synthesis
+
+## Research Question
+{research_question}
+
+## Domains Analyzed
+{', '.join(domains)}
+
+## Synthesis Summary
+{synthesis_data.synthesis_summary}
+
+## Domain Connections
+{chr(10).join(f"- {connection}" for connection in synthesis_data.domain_connections)}
+
+## Cross-Domain Insights
+{chr(10).join(f"- {insight}" for insight in synthesis_data.cross_domain_insights)}
+
+## Convergence Patterns
+{chr(10).join(f"- {pattern}" for pattern in synthesis_data.convergence_patterns)}
+
+## Interdisciplinary Opportunities
+{chr(10).join(f"- {opportunity}" for opportunity in synthesis_data.interdisciplinary_opportunities)}
+
+## Knowledge Gaps
+{chr(10).join(f"- {gap}" for gap in synthesis_data.knowledge_gaps)}
+
+## Methodology
+{synthesis_data.synthesis_methodology}
+
+## Confidence Scores
+{chr(10).join(f"- {key}: {value:.2f}" for key, value in synthesis_data.confidence_scores.items())}
+
+## Supporting Evidence
+{chr(10).join(f"- {evidence}" for evidence in synthesis_data.supporting_evidence)}
+
+## Citations
+{chr(10).join(f"- {citation}" for citation in synthesis_data.citations)}
+
+---
+*Generated by Knowledge Synthesizer*
+"""
+
+
+def large_output(model: Any, items: int, item_chars: int) -> Any:
+    """An instance of `model` with `items` entries of about `item_chars` characters in every list and mapping."""
+    text = ("lorem ipsum dolor sit amet " * (item_chars // 27 + 1))[:item_chars]
+    values: Dict[str, Any] = {}
+    for name, field in model.model_fields.items():
+        annotation = str(field.annotation)
+        if annotation.startswith(("typing.List", "list")):
+            values[name] = [f"{name.replace('_', ' ').title()} {number}: {text}" for number in range(items)]
+        elif "float" in annotation:
+            values[name] = {f"{name} {number}": number / items for number in range(items)}
+        elif annotation.startswith(("typing.Dict", "dict")):
+            values[name] = {f"{name} {number}": text for number in range(items)}
+        else:
+            values[name] = text * 4
+    return model(**values)
+
+
+def best_of(function: Callable[[], Any], repeat: int) -> float:
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main(options: argparse.Namespace) -> None:
+    os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+    os.environ.setdefault("LOGFIRE_SEND_TO_LOGFIRE", "false")
+    os.environ.setdefault("LOGFIRE_CONSOLE", "false")
+    sys.path.insert(0, str(REPO_DIR))
+
+    rows: List[Tuple[str, str, float, float]] = []
+    for module_name, spec_name, model_name, context in REPORTS:
+        module = importlib.import_module(module_name)
+        spec = getattr(module, spec_name)
+        data = large_output(getattr(module, model_name), options.items, options.item_chars)
+
+        if spec_name == "breakthrough_report":
+            legacy = lambda: legacy_breakthrough(data, **context)
+        elif spec_name == "synthesis_report":
+            legacy = lambda: legacy_synthesis(data, **context)
+        else:
+            legacy = None
+        if legacy is not None:
+            expected = legacy()
+            rendered = spec.render(data, context)
+            # The legacy breakthrough copy stops after the last section, before the static footer
+            assert rendered.startswith(expected.rstrip("\n")), f"{spec_name}: engine output differs from the legacy report"
+
+        size = len(spec.render(data, context))
+        for output_format in ("markdown", "json", "compact"):
+            engine = best_of(lambda: spec.render(data, context, output_format), options.repeat)
+            baseline = best_of(legacy, options.repeat) if legacy is not None and output_format == "markdown" else 0.0
+            rows.append((f"{spec_name} ({size // 1024} KiB)", output_format, engine, baseline))
+
+    print(f"{'report':<34} {'format':<9} {'engine ms':>10} {'f-string ms':>12} {'speedup':>8}")
+    for name, output_format, engine, baseline in rows:
+        speedup = f"{baseline / engine:7.2f}x" if baseline else ""
+        legacy_ms = f"{baseline * 1000:12.3f}" if baseline else f"{'':>12}"
+        print(f"{name:<34} {output_format:<9} {engine * 1000:10.3f} {legacy_ms} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark of report rendering on large outputs.")
+    parser.add_argument("--items", type=int, default=500, help="Entries per list or mapping field")
+    parser.add_argument("--item-chars", type=int, default=300, help="Characters per entry")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats, the best is reported")
+    main(parser.parse_args())
@@ -0,0 +1,175 @@
+"""
+Startup benchmark of the agent MCP servers: import time and time to `tools/list`.
+
+MCP clients spawn these servers on demand, so everything done at import is
+paid before the client sees a tool list. Each module is imported in a fresh
+interpreter and the report shows:
+
+- import: seconds to import the module
+- tools/list: import plus building the tool list FastMCP answers with
+- deferred: deferred setups (see startup.py) that ran before any tool call;
+  anything listed here means agent or telemetry setup crept back into import
+- eager: packages the local indexes import on first use (`LAZY_PACKAGES`)
+  that were loaded at import anyway
+- the packages with the largest self import time, from `python -X importtime`
+
+Usage:
+
+    python benchmarks/bench_startup.py --runs 5 --output startup.json
+    python benchmarks/bench_startup.py --baseline startup.json --tolerance 0.2 --budget 2.5
+
+With `--baseline` or `--budget` the run exits non-zero if a p50 exceeds the
+baseline by more than the tolerance, `tools/list` takes longer than the
+budget, or a deferred setup or lazy package ran at import, so it can gate CI.
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+MODULES = ["innovation_breakthrough_agent", "semantic_scholar_innovation_agent", "knowledge_synthesizer"]
+
+# Imported inside the functions of concept_graph, trend_signals, embedding_index and citation_graph, never at import
+LAZY_PACKAGES = ["numpy", "scipy", "fastembed"]
+
+# Interpreter startup varies by machine load; regressions below this many seconds are ignored
+ABSOLUTE_SLACK = 0.05
+
+# "import time: self [us] | cumulative | imported package", nesting shown by indentation of the name
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Run in a fresh interpreter: import the module, then list its tools the way FastMCP answers tools/list
+PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+module = __import__(sys.argv[1])
+imported = time.perf_counter()
+tools = asyncio.run(module.mcp.get_tools())
+listed = time.perf_counter()
+import startup
+print(json.dumps({
+    "import": imported - start,
+    "tools_list": listed - start,
+    "tools": len(tools),
+    "deferred": [setup.name for setup in startup._registered if setup.built],
+    "eager": [name for name in sys.argv[2:] if name in sys.modules],
+}))
+"""
+
+
+def run_python(args: List[str], env: Dict[str, str]) -> subprocess.CompletedProcess:
+    process = subprocess.run([sys.executable, *args], cwd=REPO_DIR, env=env, capture_output=True, text=True)
+    if process.returncode:
+        raise RuntimeError(f"python {' '.join(args[:2])} failed:\n{process.stderr[-2000:]}")
+    return process
+
+
+def import_breakdown(module: str, env: Dict[str, str], top: int) -> Dict[str, Any]:
+    """Self import time per top-level package, and the module's cumulative import time, from `-X importtime`."""
+    stderr = run_python(["-X", "importtime", "-c", f"import {module}"], env).stderr
+    packages: Counter = Counter()
+    cumulative = 0.0
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        packages[name.split(".")[0]] += int(self_us) / 1e6
+        if name == module and len(indent) == 1:
+            cumulative = int(cumulative_us) / 1e6
+    return {"cumulative": cumulative, "packages": dict(packages.most_common(top))}
+
+
+def bench_module(module: str, runs: int, top: int, env: Dict[str, str]) -> Dict[str, Any]:
+    samples = [json.loads(run_python(["-c", PROBE, module, *LAZY_PACKAGES], env).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    return {
+        "import": statistics.median(sample["import"] for sample in samples),
+        "tools_list": statistics.median(sample["tools_list"] for sample in samples),
+        "tools": samples[-1]["tools"],
+        "deferred": sorted({name for sample in samples for name in sample["deferred"]}),
+        "eager": sorted({name for sample in samples for name in sample["eager"]}),
+        "importtime": import_breakdown(module, env, top),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    def ms(seconds: float) -> str:
+        return f"{seconds * 1000:9.1f}"
+
+    print(f"\n{'module':<36} {'import':>9} {'tools/list':>10} {'tools':>5}  (ms, p50)")
+    for name, result in report["modules"].items():
+        print(f"{name:<36} {ms(result['import'])} {ms(result['tools_list']):>10} {result['tools']:>5}" + (f"  DEFERRED RAN: {', '.join(result['deferred'])}" if result["deferred"] else "")
+              + (f"  EAGER IMPORT: {', '.join(result['eager'])}" if result["eager"] else ""))
+
+    for name, result in report["modules"].items():
+        print(f"\n{name} -X importtime: {result['importtime']['cumulative'] * 1000:.1f}ms cumulative")
+        for package, seconds in result["importtime"]["packages"].items():
+            print(f"  {package:<34} {ms(seconds)}")
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, budget: float) -> List[str]:
+    """Regressions of the report against a baseline report and the tools/list budget."""
+    regressions = []
+    for name, result in report["modules"].items():
+        if result["deferred"]:
+            regressions.append(f"{name}: deferred setup ran before the first tool call: {', '.join(result['deferred'])}")
+        if result["eager"]:
+            regressions.append(f"{name}: imported at startup instead of on first use: {', '.join(result['eager'])}")
+        if budget and result["tools_list"] > budget:
+            regressions.append(f"{name} tools/list: {result['tools_list'] * 1000:.1f}ms over the {budget * 1000:.0f}ms budget")
+        base = baseline.get("modules", {}).get(name)
+        if base is None:
+            continue
+        for phase in ("import", "tools_list"):
+            before = base.get(phase)
+            if before is not None and result[phase] > before * (1 + tolerance) + ABSOLUTE_SLACK:
+                regressions.append(f"{name} {phase}: p50 {result[phase] * 1000:.1f}ms vs baseline {before * 1000:.1f}ms")
+    return regressions
+
+
+def main(options: argparse.Namespace) -> int:
+    # Isolated caches, no Logfire export and a placeholder key, as in run_benchmarks.py
+    env = {
+        **os.environ,
+        "KNOWLEDGE_AGENTS_CACHE_DIR": tempfile.mkdtemp(prefix="knowledge-agents-startup-"),
+        "GOOGLE_API_KEY": os.environ.get("GOOGLE_API_KEY", "offline-benchmark"),
+        "LOGFIRE_SEND_TO_LOGFIRE": "false",
+        "LOGFIRE_CONSOLE": "false",
+    }
+    report = {
+        "options": {key: value for key, value in vars(options).items() if key not in ("output", "baseline")},
+        "modules": {module: bench_module(module, options.runs, options.top, env) for module in options.modules},
+    }
+    print_report(report)
+
+    if options.output:
+        Path(options.output).write_text(json.dumps(report, indent=2))
+
+    regressions = []
+    if options.baseline or options.budget:
+        baseline = json.loads(Path(options.baseline).read_text()) if options.baseline else {}
+        regressions = compare(report, baseline, options.tolerance, options.budget)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import time and time to tools/list of the agent MCP servers.")
+    parser.add_argument("--modules", nargs="+", default=MODULES, choices=MODULES, help="Agent modules to benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=10, help="Packages shown in the import time breakdown")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--baseline", help="Fail on regressions against this JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50 slowdown over the baseline")
+    parser.add_argument("--budget", type=float, default=0.0, help="Fail when tools/list takes longer than this many seconds (0: no budget)")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark of the publication trend engine (trend_signals.py) on synthetic paper metadata.
+
+Papers are spread over ten years and a handful of steady topics, with a few
+planted trends: a term that appears three years ago and stays, one that
+disappears, one emerging in the last months and a three-paper weak signal.
+The run checks that the planted trends are found, then times one scoring
+pass per size and granularity.
+
+    python benchmarks/bench_trend_signals.py --papers 1000 10000 50000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from trend_signals import compute_signals  # noqa: E402
+
+TODAY = (2025, 10)
+TOPICS = ["graph networks", "protein folding", "reinforcement agents", "sensor fusion", "image segmentation", "speech recognition"]
+
+
+def synthetic_rows(count: int, seed: int = 0) -> List[Tuple[str, Optional[int], Optional[str], str]]:
+    rng = random.Random(seed)
+    rows = []
+    for number in range(count):
+        year, month = rng.randrange(2016, 2026), rng.randint(1, 12)
+        if (year, month) > TODAY:
+            year -= 1
+        words = rng.choice(TOPICS)
+        if year >= 2023 and rng.random() < 0.3:
+            words = f"diffusion models {words}"
+        if year <= 2019 and rng.random() < 0.3:
+            words = f"support vector {words}"
+        if (year, month) >= (2025, 5) and rng.random() < 0.05:
+            words = f"quantum kernels {words}"
+        title = f"{words} for machine learning study {number}"
+        rows.append((title, year, f"{year}-{month:02d}-15", json.dumps(["Computer Science"])))
+    # Weak signal: three papers last month
+    rows += [(f"spiking photonics for machine learning study {number}", 2025, "2025-09-20", "[]") for number in range(3)]
+    return rows
+
+
+def check(rows: List[Tuple[str, Optional[int], Optional[str], str]]) -> None:
+    yearly = compute_signals(rows, "machine learning", "year", today=TODAY)
+    monthly = compute_signals(rows, "machine learning", "month", today=TODAY)
+    found = {signal.term: signal for signal in yearly.signals + yearly.declining}
+    assert found.get("diffusion models") and found["diffusion models"].trajectory in ("rising", "accelerating"), "diffusion models not rising"
+    assert found.get("support vector") and found["support vector"].trajectory == "declining", "support vector not declining"
+    monthly_found = {signal.term: signal for signal in monthly.signals}
+    assert monthly_found.get("quantum kernels") and monthly_found["quantum kernels"].trajectory == "emerging", "quantum kernels not emerging"
+    assert monthly_found.get("spiking photonics") and monthly_found["spiking photonics"].weak_signal, "spiking photonics not a weak signal"
+    print(f"planted trends found in {len(rows)} papers")
+
+
+def main(options: argparse.Namespace) -> None:
+    check(synthetic_rows(options.papers[-1]))
+    print(f"\n{'papers':>8} {'granularity':>11} {'terms':>6} {'p50 ms':>8}")
+    for count in options.papers:
+        rows = synthetic_rows(count)
+        for granularity in ("year", "month"):
+            samples = []
+            for _ in range(options.repeat):
+                start = time.perf_counter()
+                signals = compute_signals(rows, "machine learning", granularity, today=TODAY)
+                samples.append(time.perf_counter() - start)
+            print(f"{count:>8} {granularity:>11} {signals.terms:>6} {statistics.median(samples) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the publication trend engine on synthetic paper metadata.")
+    parser.add_argument("--papers", type=int, nargs="+", default=[1000, 10000, 50000], help="Paper counts to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size and granularity")
+    main(parser.parse_args())
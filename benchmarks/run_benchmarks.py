@@ -0,0 +1,349 @@
+"""
+Offline latency benchmarks for every `@mcp.tool` of the three agent servers.
+
+The agent modules are imported as libraries (no `mcp.run()`), their pooled
+MCP servers are pointed at `standin_server.py` and every agent's Gemini model
+is replaced by a scripted `FunctionModel` (or pydantic-ai's `TestModel`).
+Each tool is then called through an in-memory FastMCP client, and the
+report breaks its latency down into:
+
+- spawn: stand-in subprocess startup, per MCP server
+- tool calls: MCP tool calls made by the agents or the retrieval stage, per server/tool
+  (summed per tool call, so concurrent calls can add up to more than the total)
+- model turns: requests to the (scripted) model
+- render: a repeated call answered from the result memo, i.e. report formatting
+
+Usage:
+
+    python benchmarks/run_benchmarks.py --iterations 5 --output bench.json
+    python benchmarks/run_benchmarks.py --baseline bench.json --tolerance 0.25
+
+With `--baseline`, the run exits non-zero if any tool fails or any p50
+exceeds the baseline by more than the tolerance, so it can gate CI.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCHMARK_DIR.parent
+STANDIN_SERVER = BENCHMARK_DIR / "standin_server.py"
+MODULES = ["innovation_breakthrough_agent", "semantic_scholar_innovation_agent", "knowledge_synthesizer"]
+
+# Errors are returned as text by the tools, e.g. "Knowledge synthesis failed: ..."
+TOOL_FAILURE = re.compile(r"^[\w\s]+ failed: ")
+
+# Tools of the background job API, which only wrap the other tools
+JOB_API_TOOLS = ("start_job", "get_job")
+
+# Small timings are dominated by noise; regressions below this many seconds are ignored
+ABSOLUTE_SLACK = 0.005
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile, 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered) + 0.5) - 1))]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "max": max(values, default=0.0),
+        "total": sum(values),
+    }
+
+
+@dataclass
+class Recorder:
+    """Timings of the tool currently being benchmarked. Calls are sequential, so one global bucket is enough."""
+    tool: Optional[str] = None
+    samples: Dict[str, Dict[str, List[float]]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(list)))
+    tool_calls: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    spawns: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+
+    def add(self, phase: str, seconds: float) -> None:
+        if self.tool is not None:
+            self.samples[self.tool][phase].append(seconds)
+
+
+recorder = Recorder()
+
+
+def sample_value(schema: Dict[str, Any], defs: Dict[str, Any], text: str) -> Any:
+    """A value that validates against a (pydantic-generated) JSON schema."""
+    if "$ref" in schema:
+        return sample_value(defs[schema["$ref"].split("/")[-1]], defs, text)
+    if "anyOf" in schema:
+        return sample_value(next(s for s in schema["anyOf"] if s.get("type") != "null"), defs, text)
+    kind = schema.get("type", "string")
+    if kind == "object":
+        if "properties" in schema:
+            return {name: sample_value(prop, defs, text) for name, prop in schema["properties"].items()}
+        return {f"{text.split()[0]} {number}": sample_value(schema.get("additionalProperties", {}), defs, text) for number in range(3)}
+    if kind == "array":
+        return [sample_value(schema.get("items", {}), defs, text) for _ in range(3)]
+    if kind == "number":
+        return 0.5
+    if kind == "integer":
+        return 1
+    if kind == "boolean":
+        return False
+    return text
+
+
+def scripted_model(tool_calls_per_run: int, latency: float, output_chars: int):
+    """A FunctionModel that calls the agent's first tools once, then returns a schema-valid output."""
+    from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart, ToolReturnPart
+    from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+    filler = ("Stand-in analysis text. " * (output_chars // 24 + 1))[:output_chars]
+
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        await asyncio.sleep(latency)
+        called_tools = any(isinstance(part, ToolReturnPart) for message in messages for part in message.parts)
+        if info.function_tools and not called_tools:
+            return ModelResponse(parts=[
+                ToolCallPart(tool.name, sample_value(tool.parameters_json_schema, tool.parameters_json_schema.get("$defs", {}), "quantum sensing"))
+                for tool in info.function_tools[:tool_calls_per_run]
+            ])
+        if info.output_tools:
+            tool = info.output_tools[0]
+            schema = tool.parameters_json_schema
+            return ModelResponse(parts=[ToolCallPart(tool.name, sample_value(schema, schema.get("$defs", {}), filler))])
+        return ModelResponse(parts=[TextPart(filler)])
+
+    return FunctionModel(respond)
+
+
+def timed_model(model):
+    """Wrap a model so every request is recorded as a model turn."""
+    from pydantic_ai.models.wrapper import WrapperModel
+
+    class TimedModel(WrapperModel):
+        async def request(self, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await super().request(*args, **kwargs)
+            finally:
+                recorder.add("model_turns", time.perf_counter() - start)
+
+    return TimedModel(model)
+
+
+def timed_tool_calls(server_name: str, process_tool_call: Optional[Callable]) -> Callable:
+    """A `process_tool_call` hook recording each MCP tool call, chained in front of the server's own hook."""
+    async def process(ctx, call_tool, name, args):
+        start = time.perf_counter()
+        try:
+            if process_tool_call is not None:
+                return await process_tool_call(ctx, call_tool, name, args)
+            return await call_tool(name, args)
+        finally:
+            elapsed = time.perf_counter() - start
+            recorder.add("tool_calls", elapsed)
+            recorder.tool_calls[f"{server_name}/{name}"].append(elapsed)
+
+    return process
+
+
+def load_modules(names: List[str], tool_latency: float, payload_bytes: int, rate_limits: bool = False) -> List[Any]:
+    """Import the agent modules and point every pooled MCP server at the stand-in.
+
+    The stand-ins have no rate limits, so the upstream schedulers are dropped
+    unless `rate_limits` asks to measure their pacing too.
+    """
+    sys.path.insert(0, str(REPO_DIR))
+    modules = [importlib.import_module(name) for name in names]
+
+    # Agents are normally built on the first tool call; build them now so their models can be overridden
+    import startup
+    startup.complete()
+
+    from mcp_pool import pool
+    for name, server in pool._servers.items():
+        server.command = sys.executable
+        server.args = [str(STANDIN_SERVER), name, "--latency", str(tool_latency), "--payload-bytes", str(payload_bytes)]
+        server.process_tool_call = timed_tool_calls(name, server.process_tool_call)
+        if not rate_limits:
+            server.scheduler = None
+    return modules
+
+
+async def bench_module(module: Any, options: argparse.Namespace) -> Dict[str, Any]:
+    from fastmcp import Client
+    from mcp_pool import pool
+    from pydantic_ai import Agent
+    from pydantic_ai.models.test import TestModel
+    from citation_graph import citation_graph
+    from paper_store import paper_store
+    from tool_cache import semantic_scholar_cache
+
+    agents = [value for value in vars(module).values() if isinstance(value, Agent)]
+    results: Dict[str, Any] = {}
+
+    with contextlib.ExitStack() as overrides:
+        # Overrides are context variables, so they must be in place before the client starts the server task
+        for agent in agents:
+            model = TestModel(call_tools="all") if options.model == "test" else scripted_model(options.tool_calls, options.model_latency, options.output_chars)
+            overrides.enter_context(agent.override(model=timed_model(model)))
+
+        connect_start = time.perf_counter()
+        async with Client(module.mcp) as client:
+            # The lifespan no longer waits for the eager servers; wait here so tool timings exclude their startup
+            await pool.warm()
+            recorder.spawns[f"{module.__name__} (eager pool start)"].append(time.perf_counter() - connect_start)
+            tools = await client.list_tools()
+
+            for tool in tools:
+                if options.tools and tool.name not in options.tools:
+                    continue
+                # The job tools run the tools benchmarked here in the background (jobs.py)
+                if tool.name in JOB_API_TOOLS:
+                    continue
+                schema = tool.inputSchema
+                properties = schema.get("properties", {})
+                arguments = {name: sample_value(properties[name], schema.get("$defs", {}), "quantum sensing") for name in schema.get("required", [])}
+                cold_arguments = {**arguments, "force_refresh": True} if "force_refresh" in properties else arguments
+                recorder.tool = tool.name
+                failures = []
+
+                for _ in range(options.iterations):
+                    semantic_scholar_cache.clear()
+                    paper_store.clear()
+                    citation_graph.clear()
+                    start = time.perf_counter()
+                    result = await client.call_tool(tool.name, cold_arguments, raise_on_error=False)
+                    recorder.add("total", time.perf_counter() - start)
+                    text = "".join(getattr(block, "text", "") for block in result.content)
+                    if result.is_error or TOOL_FAILURE.match(text):
+                        failures.append(text[:200])
+
+                    # Same arguments again: answered from the result memo, so this is the report rendering
+                    start = time.perf_counter()
+                    await client.call_tool(tool.name, arguments, raise_on_error=False)
+                    recorder.add("render", time.perf_counter() - start)
+
+                recorder.tool = None
+                samples = recorder.samples[tool.name]
+                results[tool.name] = {
+                    "module": module.__name__,
+                    "failures": failures,
+                    "phases": {phase: summarize(values) for phase, values in samples.items()},
+                }
+
+        for name, stats in pool.stats().items():
+            if stats["starts"] and stats["last_startup_seconds"] is not None:
+                recorder.spawns[name].append(stats["last_startup_seconds"])
+
+    return results
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    def ms(seconds: float) -> str:
+        return f"{seconds * 1000:9.1f}"
+
+    print(f"\n{'tool':<44} {'total p50':>9} {'p95':>9} {'model':>9} {'turns':>5} {'mcp':>9} {'calls':>5} {'render':>9}  (ms, per call)")
+    for name, result in report["tools"].items():
+        phases = result["phases"]
+        calls = max(phases.get("total", {}).get("count", 0), 1)
+        model = phases.get("model_turns", {"total": 0.0, "count": 0})
+        tool_calls = phases.get("tool_calls", {"total": 0.0, "count": 0})
+        print(
+            f"{name:<44} {ms(phases['total']['p50'])} {ms(phases['total']['p95'])} "
+            f"{ms(model['total'] / calls)} {model['count'] // calls:>5} "
+            f"{ms(tool_calls['total'] / calls)} {tool_calls['count'] // calls:>5} "
+            f"{ms(phases['render']['p50'])}"
+            + ("  FAILED" if result["failures"] else "")
+        )
+
+    print(f"\n{'mcp server/tool':<44} {'p50':>9} {'p95':>9} {'count':>5}")
+    for name, stats in report["tool_calls"].items():
+        print(f"{name:<44} {ms(stats['p50'])} {ms(stats['p95'])} {stats['count']:>5}")
+
+    print(f"\n{'spawn':<44} {'p50':>9} {'max':>9} {'count':>5}")
+    for name, stats in report["spawns"].items():
+        print(f"{name:<44} {ms(stats['p50'])} {ms(stats['max'])} {stats['count']:>5}")
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions of the report against a baseline report."""
+    regressions = []
+    for name, result in report["tools"].items():
+        if result["failures"]:
+            regressions.append(f"{name}: {len(result['failures'])} failed calls, e.g. {result['failures'][0]}")
+        base = baseline.get("tools", {}).get(name)
+        if base is None:
+            continue
+        for phase, stats in result["phases"].items():
+            before = base["phases"].get(phase, {}).get("p50")
+            if before is not None and stats["p50"] > before * (1 + tolerance) + ABSOLUTE_SLACK:
+                regressions.append(f"{name} {phase}: p50 {stats['p50'] * 1000:.1f}ms vs baseline {before * 1000:.1f}ms")
+    return regressions
+
+
+async def main(options: argparse.Namespace) -> int:
+    modules = load_modules(options.modules, options.tool_latency, options.payload_bytes, options.rate_limits)
+    tools: Dict[str, Any] = {}
+    for module in modules:
+        tools.update(await bench_module(module, options))
+
+    report = {
+        "options": {key: value for key, value in vars(options).items() if key not in ("output", "baseline")},
+        "tools": tools,
+        "tool_calls": {name: summarize(values) for name, values in sorted(recorder.tool_calls.items())},
+        "spawns": {name: summarize(values) for name, values in recorder.spawns.items()},
+    }
+    print_report(report)
+
+    if options.output:
+        Path(options.output).write_text(json.dumps(report, indent=2))
+
+    regressions = [f"{name}: {result['failures'][0]}" for name, result in tools.items() if result["failures"]]
+    if options.baseline:
+        regressions = compare(report, json.loads(Path(options.baseline).read_text()), options.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline latency benchmarks for the agent MCP servers.")
+    parser.add_argument("--modules", nargs="+", default=MODULES, choices=MODULES, help="Agent modules to benchmark")
+    parser.add_argument("--tools", nargs="+", help="Only benchmark these tools")
+    parser.add_argument("--iterations", type=int, default=3, help="Calls per tool")
+    parser.add_argument("--model", choices=["scripted", "test"], default="scripted", help="Scripted FunctionModel or pydantic-ai TestModel")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Seconds per scripted model turn")
+    parser.add_argument("--tool-calls", type=int, default=2, help="Tools the scripted model calls per agent run")
+    parser.add_argument("--output-chars", type=int, default=200, help="Length of each text field of the scripted outputs")
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="Seconds per stand-in MCP tool call")
+    parser.add_argument("--payload-bytes", type=int, default=2000, help="Size of each stand-in tool result")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the upstream schedulers' rate limits in front of the stand-ins")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--baseline", help="Fail on regressions against this JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 slowdown over the baseline")
+    options = parser.parse_args()
+
+    # Isolated caches, no Logfire export and a placeholder key so the Gemini agents can be constructed
+    os.environ["KNOWLEDGE_AGENTS_CACHE_DIR"] = tempfile.mkdtemp(prefix="knowledge-agents-bench-")
+    os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+    os.environ.setdefault("LOGFIRE_SEND_TO_LOGFIRE", "false")
+    os.environ.setdefault("LOGFIRE_CONSOLE", "false")
+
+    sys.exit(asyncio.run(main(options)))
@@ -0,0 +1,97 @@
+"""
+Local stand-in for the MCP servers the agents connect to.
+
+Serves the same tool names as the real server it replaces, answering after a
+fixed latency with a payload of a configurable size, so benchmarks run
+without Smithery, npx or network access:
+
+    python benchmarks/standin_server.py semantic_scholar --latency 0.05 --payload-bytes 4000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from typing import Optional
+
+from fastmcp import FastMCP
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("server", choices=["semantic_scholar", "fetch", "sequential_thinking", "ultra_crawler", "notion"])
+parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each tool call returns")
+parser.add_argument("--payload-bytes", type=int, default=2000, help="Approximate size of each tool result")
+args = parser.parse_args()
+
+mcp = FastMCP(f"standin-{args.server}")
+
+
+async def respond(kind: str, query: str) -> str:
+    await asyncio.sleep(args.latency)
+    records = []
+    size = 0
+    while size < args.payload_bytes:
+        number = len(records)
+        record = {
+            "paperId": f"{kind}-{abs(hash(query)) % 10**8}-{number}",
+            "title": f"{query.title()} study {number}",
+            "year": 2025 - number % 3,
+            "publicationDate": f"{2025 - number % 3}-{number % 12 + 1:02d}-15",
+            "authors": [{"name": f"Author {number}"}, {"name": f"Author {number + 1}"}],
+            "venue": "Stand-in Proceedings",
+            "citationCount": 100 // (number + 1),
+            "fieldsOfStudy": ["Computer Science"],
+            "abstract": f"A stand-in {kind} result about {query}. " * 4,
+            "url": f"https://example.org/{kind}/{number}",
+        }
+        records.append(record)
+        size += len(json.dumps(record))
+    return json.dumps({"total": len(records), "data": records, "pid": os.getpid()})
+
+
+if args.server == "semantic_scholar":
+    @mcp.tool(name="papers-search-basic")
+    async def papers_search_basic(query: str, limit: int = 10) -> str:
+        return await respond("paper", query)
+
+    @mcp.tool(name="papers-search-advanced")
+    async def papers_search_advanced(query: str, limit: int = 10, sortBy: Optional[str] = None, yearStart: Optional[int] = None, yearEnd: Optional[int] = None) -> str:
+        return await respond("paper", query)
+
+    @mcp.tool(name="papers-get")
+    async def papers_get(paperId: str) -> str:
+        return await respond("paper", paperId)
+
+    @mcp.tool(name="papers-citations")
+    async def papers_citations(paperId: str, limit: int = 10) -> str:
+        return await respond("citing", paperId)
+
+    @mcp.tool(name="papers-references")
+    async def papers_references(paperId: str, limit: int = 10) -> str:
+        return await respond("cited", paperId)
+
+elif args.server == "fetch":
+    @mcp.tool(name="fetch")
+    async def fetch(url: str) -> str:
+        return await respond("page", url)
+
+elif args.server == "sequential_thinking":
+    @mcp.tool(name="sequentialthinking")
+    async def sequentialthinking(thought: str, thoughtNumber: int = 1, totalThoughts: int = 1, nextThoughtNeeded: bool = False) -> str:
+        await asyncio.sleep(args.latency)
+        return json.dumps({"thoughtNumber": thoughtNumber, "totalThoughts": totalThoughts, "nextThoughtNeeded": nextThoughtNeeded})
+
+elif args.server == "ultra_crawler":
+    @mcp.tool(name="crawl")
+    async def crawl(url: str) -> str:
+        return await respond("crawl", url)
+
+elif args.server == "notion":
+    @mcp.tool(name="notion-search")
+    async def notion_search(query: str) -> str:
+        return await respond("note", query)
+
+
+if __name__ == "__main__":
+    logging.getLogger("FastMCP").setLevel(logging.WARNING)
+    mcp.run(show_banner=False)
@@ -0,0 +1,264 @@
+"""
+Deterministic network analytics for insight maps.
+
+`create_insight_maps` used to ask the model for `connection_strengths` and
+`network_properties`, which cost reasoning tokens and changed from run to
+run. `analyze_concepts` computes them from the retrieved evidence instead:
+
+1. Concepts: the requested topics and connections, the fields of study of
+   the records, and the title terms found in at least two records
+2. A record x concept incidence matrix, sparse; co-occurrence is `B.T @ B`
+3. Edge weight: Jaccard overlap of the records two concepts appear in
+4. Density, clustering coefficient and transitivity (triangle counts from
+   `A @ A`), degree and eigenvector centrality, label propagation
+   communities with their modularity, and participation coefficients for
+   the concepts bridging communities
+
+Everything is vectorized SciPy sparse algebra, so a few thousand concepts
+take well under a second. The model gets `ConceptGraph.to_prompt()` to
+write the narrative around; the numbers in the report are the computed ones.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from evidence import EvidenceRecord
+from paper_store import STOPWORDS
+
+if TYPE_CHECKING:
+    import numpy as np
+    import scipy.sparse as sp
+
+# Title terms that become concepts: in at least this many records, the most frequent first.
+# MAX_TERMS is a deliberate limit: beyond the 200 most frequent terms (plus seeds and fields)
+# nodes are rare words that only add noise to the reported metrics. The analytics themselves
+# scale to thousands of concepts (benchmarks/bench_concept_graph.py raises the cap to check).
+MIN_RECORDS = 2
+MAX_TERMS = 200
+
+# Words too generic to say anything about a topic
+GENERIC_TERMS = frozenset("""
+    analysis approach based between case data design development effects evaluation framework impact
+    learning method methods model models new novel performance review study survey system systems towards
+    their this through under use which within
+""".split())
+
+# Label propagation rounds; each updates a fixed random half of the nodes, so the result is reproducible
+PROPAGATION_ROUNDS = 30
+
+# Strengths reported: every pair of requested concepts, plus the strongest other edges up to this many
+MAX_STRENGTHS = 20
+
+
+class ConceptGraph(BaseModel):
+    """Computed structure of the concepts in a set of evidence records"""
+    concepts: List[str]
+    properties: Dict[str, float]
+    strengths: Dict[str, float]
+    central: List[Tuple[str, float]]
+    communities: List[List[str]]
+    bridges: List[Tuple[str, float]]
+
+    def to_prompt(self, members: int = 6) -> str:
+        """Compact text form of the metrics for a model prompt."""
+        lines = ["COMPUTED NETWORK METRICS (co-occurrence graph of the concepts in the evidence; report these numbers as given, do not re-estimate them)"]
+        lines.append("Properties: " + ", ".join(f"{name}={value:g}" for name, value in self.properties.items()))
+        lines.append("Connection strengths (Jaccard overlap of supporting records): " + "; ".join(f"{pair}={value:.2f}" for pair, value in self.strengths.items()))
+        lines.append("Most central concepts (eigenvector centrality): " + ", ".join(f"{name} ({value:.2f})" for name, value in self.central))
+        for number, community in enumerate(self.communities, 1):
+            lines.append(f"Community {number}: {', '.join(community[:members])}" + (f" (+{len(community) - members} more)" if len(community) > members else ""))
+        lines.append("Bridging concepts (participation across communities): " + ", ".join(f"{name} ({value:.2f})" for name, value in self.bridges))
+        return "\n".join(lines)
+
+
+WORD = re.compile(r"\w+")
+TERM = re.compile(r"[a-z][a-z0-9-]+")
+
+
+def _phrase(text: str) -> str:
+    return " ".join(WORD.findall(text.casefold()))
+
+
+def title_terms(title: str) -> List[str]:
+    """Distinctive words and word pairs of a title."""
+    words = [word for word in TERM.findall(title.casefold()) if word not in STOPWORDS and len(word) > 3]
+    return [word for word in words if word not in GENERIC_TERMS] + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def incidence(records: Sequence[EvidenceRecord], seeds: Sequence[str]) -> Tuple[List[str], sp.csr_matrix]:
+    """Concept names and the binary record x concept incidence matrix.
+
+    The seeds come first, in order; a record contains a seed when the phrase
+    is in its title, abstract or the query that retrieved it.
+    """
+    import numpy as np
+    import scipy.sparse as sp
+    seeds = list(dict.fromkeys(seed.strip() for seed in seeds if seed.strip()))
+    known = {_phrase(seed) for seed in seeds}
+    texts = [" " + _phrase(" ".join([record.title, record.abstract or "", record.query])) + " " for record in records]
+    fields = [[field for field in record.fields_of_study if _phrase(field) not in known] for record in records]
+    # Terms that are part of a requested phrase ("machine" of "machine learning") add nothing
+    parts = {" ".join(words[i:j]) for words in (phrase.split() for phrase in known) for i in range(len(words)) for j in range(i + 1, len(words) + 1)}
+    terms = [set(title_terms(record.title)) - parts for record in records]
+
+    counts = Counter(term for record_terms in terms for term in record_terms)
+    frequent = {term for term, count in counts.most_common(MAX_TERMS) if count >= MIN_RECORDS}
+    names = seeds + sorted({field for record_fields in fields for field in record_fields} | frequent)
+    columns = {name: column for column, name in enumerate(names)}
+
+    rows, cols = [], []
+    for row, (text, record_fields, record_terms) in enumerate(zip(texts, fields, terms)):
+        found = {columns[seed] for seed in seeds if f" {_phrase(seed)} " in text}
+        found.update(columns[field] for field in record_fields)
+        found.update(columns[term] for term in record_terms & frequent)
+        rows.extend([row] * len(found))
+        cols.extend(found)
+    matrix = sp.csr_matrix((np.ones(len(rows), dtype=np.float64), (rows, cols)), shape=(len(records), len(names)))
+    return names, matrix
+
+
+def jaccard(matrix: sp.csr_matrix) -> sp.csr_matrix:
+    """Concept x concept Jaccard overlap of the records each concept appears in, without self-loops."""
+    import numpy as np
+    import scipy.sparse as sp
+    co = (matrix.T @ matrix).tocoo()
+    occurrences = np.asarray(matrix.sum(axis=0)).ravel()
+    off = co.row != co.col
+    row, col, shared = co.row[off], co.col[off], co.data[off]
+    return sp.csr_matrix((shared / (occurrences[row] + occurrences[col] - shared), (row, col)), shape=co.shape)
+
+
+def eigenvector_centrality(weights: sp.csr_matrix, iterations: int = 100, tolerance: float = 1e-8) -> np.ndarray:
+    """Power iteration on `weights + I` (the shift keeps bipartite parts from oscillating), scaled to a maximum of 1."""
+    import numpy as np
+    n = weights.shape[0]
+    vector = np.full(n, 1 / np.sqrt(n)) if n else np.zeros(0)
+    for _ in range(iterations):
+        following = weights @ vector + vector
+        norm = np.linalg.norm(following)
+        if not norm:
+            return np.zeros(n)
+        following /= norm
+        if np.abs(following - vector).sum() < n * tolerance:
+            vector = following
+            break
+        vector = following
+    return vector / vector.max() if n and vector.max() > 0 else vector
+
+
+def row_argmax(matrix: sp.csr_matrix) -> np.ndarray:
+    """Column of the largest stored value in each row (the first on ties), -1 for empty rows."""
+    import numpy as np
+    lengths = np.diff(matrix.indptr)
+    best = np.full(matrix.shape[0], -1)
+    filled = np.flatnonzero(lengths)
+    if not len(filled):
+        return best
+    rows = np.repeat(np.arange(matrix.shape[0]), lengths)
+    top = np.maximum.reduceat(matrix.data, matrix.indptr[filled])
+    positions = np.flatnonzero(matrix.data == np.repeat(top, lengths[filled]))
+    first = np.unique(rows[positions], return_index=True)[1]
+    best[filled] = matrix.indices[positions[first]]
+    return best
+
+
+def label_propagation(weights: sp.csr_matrix, rounds: int = PROPAGATION_ROUNDS, seed: int = 0) -> np.ndarray:
+    """Community label of every node: each round, half the nodes take the label with the most edge weight among their neighbors."""
+    import numpy as np
+    import scipy.sparse as sp
+    n = weights.shape[0]
+    labels = np.arange(n)
+    lengths = np.diff(weights.indptr)
+    has_edges = lengths > 0
+    rows = np.concatenate([np.repeat(np.arange(n), lengths), np.arange(n)])
+    # A node's own label breaks ties in its favor
+    data = np.concatenate([weights.data, np.full(n, 1e-9)])
+    rng = np.random.default_rng(seed)
+    for _ in range(rounds):
+        votes = sp.csr_matrix((data, (rows, np.concatenate([labels[weights.indices], labels]))), shape=(n, n))
+        best = row_argmax(votes)
+        update = has_edges & (rng.random(n) < 0.5)
+        if (best[has_edges] == labels[has_edges]).all():
+            break
+        labels = np.where(update, best, labels)
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def analyze_concepts(records: Sequence[EvidenceRecord], seeds: Sequence[str], top: int = 8) -> ConceptGraph:
+    """Concept co-occurrence graph of the records and its network metrics.
+
+    Args:
+        records: Evidence records; each is one co-occurrence context
+        seeds: Requested topics and connections, always nodes and always in the reported strengths
+        top: Central and bridging concepts reported
+    """
+    import numpy as np
+    import scipy.sparse as sp
+    from scipy.sparse.csgraph import connected_components
+    names, matrix = incidence(records, seeds)
+    seeds = names[:len({seed.strip() for seed in seeds if seed.strip()})]
+    n = len(names)
+    weights = jaccard(matrix)
+    adjacency = (weights > 0).astype(np.float64)
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    strength = np.asarray(weights.sum(axis=1)).ravel()
+    edges = adjacency.nnz // 2
+
+    # Triangles through each node: (A @ A) counts 2-paths, masked by A they close into triangles (each counted twice)
+    triangles = np.asarray((adjacency @ adjacency).multiply(adjacency).sum(axis=1)).ravel() / 2
+    pairs = degree * (degree - 1)
+    clustering = np.divide(2 * triangles, pairs, out=np.zeros(n), where=pairs > 0)
+
+    labels = label_propagation(weights)
+    communities = labels.max() + 1 if n else 0
+    membership = sp.csr_matrix((np.ones(n), (np.arange(n), labels)), shape=(n, communities))
+    # Modularity from the community x community weight matrix
+    between = (membership.T @ weights @ membership).toarray()
+    total = between.sum()
+    modularity = float(np.trace(between) / total - ((between.sum(axis=1) / total) ** 2).sum()) if total else 0.0
+    # Participation coefficient: 1 - sum over communities of the squared share of a node's edge weight
+    shares = (weights @ membership).tocsr()
+    squared = np.asarray(shares.multiply(shares).sum(axis=1)).ravel()
+    participation = np.where(strength > 0, 1 - squared / np.maximum(strength, 1e-12) ** 2, 0.0)
+
+    centrality = eigenvector_centrality(weights)
+    component_count, components = connected_components(adjacency, directed=False) if n else (0, np.zeros(0, dtype=int))
+    largest = np.bincount(components).max() if n else 0
+
+    index = {name: i for i, name in enumerate(names)}
+    strengths = {f"{a} <-> {b}": round(float(weights[index[a], index[b]]), 3) for i, a in enumerate(seeds) for b in seeds[i + 1:]}
+    upper = sp.triu(weights, k=1).tocoo()
+    for k in np.argsort(-upper.data, kind="stable"):
+        if len(strengths) >= MAX_STRENGTHS:
+            break
+        strengths.setdefault(f"{names[upper.row[k]]} <-> {names[upper.col[k]]}", round(float(upper.data[k]), 3))
+
+    by_size = np.argsort(-np.bincount(labels, minlength=communities), kind="stable") if n else []
+    grouped = [[names[i] for i in np.flatnonzero(labels == label)[np.argsort(-strength[labels == label], kind="stable")]] for label in by_size]
+    bridge_order = np.argsort(-(participation * centrality), kind="stable")[:top]
+
+    return ConceptGraph(
+        concepts=names,
+        properties={
+            "nodes": float(n),
+            "edges": float(edges),
+            "density": round(2 * edges / (n * (n - 1)), 4) if n > 1 else 0.0,
+            "average_degree": round(float(degree.mean()), 3) if n else 0.0,
+            "average_clustering": round(float(clustering.mean()), 4) if n else 0.0,
+            "transitivity": round(float(2 * triangles.sum() / pairs.sum()), 4) if pairs.sum() else 0.0,
+            "communities": float(sum(1 for community in grouped if len(community) > 1)),
+            "modularity": round(modularity, 4),
+            "components": float(component_count),
+            "largest_component_share": round(largest / n, 4) if n else 0.0,
+            "records": float(matrix.shape[0]),
+        },
+        strengths=strengths,
+        central=[(names[i], round(float(centrality[i]), 3)) for i in np.argsort(-centrality, kind="stable")[:top] if centrality[i] > 0],
+        communities=[community for community in grouped if len(community) > 1],
+        bridges=[(names[i], round(float(participation[i]), 3)) for i in bridge_order if participation[i] > 0.01],
+    )
@@ -0,0 +1,160 @@
+"""
+End-to-end deadlines for tool calls, and hedged model requests.
+
+A slow Gemini response can take a minute or more, long after the MCP client
+calling our tool has given up. Each tool now runs under a deadline:
+
+    report = await within_deadline(run_tool(), seconds=TOOL_DEADLINES["my_tool"], what="my_tool")
+
+The deadline is kept in a context variable, so everything the tool awaits
+sees the time left: pooled MCP tool calls are cancelled when it runs out,
+and `HedgedModel` caps each model request by it. Nested deadlines can only
+shorten the current one.
+
+`HedgedModel` wraps any model. When a request is still running after the
+model's recent p95 latency, it sends one duplicate ("hedge") and returns
+whichever answer arrives first, cancelling the other. Streamed requests
+are passed through unhedged; the tool deadline still bounds them.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Optional, TypeVar, Union
+
+from pydantic_ai.models import KnownModelName, Model
+from pydantic_ai.models.wrapper import WrapperModel
+
+from latency_metrics import RollingHistogram, latency
+
+T = TypeVar("T")
+
+# Loop time (`loop.time()`) by which the current tool call must finish
+_deadline: ContextVar[Optional[float]] = ContextVar("tool_deadline", default=None)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The tool call ran out of time."""
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or `None` without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - asyncio.get_running_loop().time()
+
+
+async def within_deadline(awaitable: Awaitable[T], seconds: Optional[float] = None, what: str = "call") -> T:
+    """Await `awaitable` under the current deadline, shortened to `seconds` from now if given.
+
+    Raises `DeadlineExceeded` when the time runs out; the awaitable is cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = _deadline.get()
+    if seconds is not None:
+        deadline = loop.time() + seconds if deadline is None else min(deadline, loop.time() + seconds)
+    if deadline is None:
+        return await awaitable
+    left = deadline - loop.time()
+    if left <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise DeadlineExceeded(f"{what} has no time left before its deadline")
+
+    token = _deadline.set(deadline)
+    try:
+        # wait_for runs the awaitable in a task that copies this context, deadline included
+        return await asyncio.wait_for(awaitable, left)
+    except DeadlineExceeded:
+        raise
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"{what} did not finish within its deadline") from None
+    finally:
+        _deadline.reset(token)
+
+
+class HedgedModel(WrapperModel):
+    """Bounds each request of the wrapped model and hedges the slow ones.
+
+    Args:
+        wrapped: Model or model name
+        request_timeout: Longest a single request may take, further capped by the current deadline
+        hedge_quantile: Latency quantile of recent requests after which the hedge is sent
+        initial_hedge_delay: Hedge delay used until `min_samples` requests have completed
+        min_hedge_delay: Lower bound of the hedge delay
+        min_samples: Completed requests needed before the quantile is trusted
+    """
+
+    def __init__(
+        self,
+        wrapped: Union[Model, KnownModelName],
+        request_timeout: float = 90.0,
+        hedge_quantile: float = 0.95,
+        initial_hedge_delay: float = 30.0,
+        min_hedge_delay: float = 2.0,
+        min_samples: int = 20,
+    ):
+        super().__init__(wrapped)
+        self.request_timeout = request_timeout
+        self.hedge_quantile = hedge_quantile
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.latencies = RollingHistogram()
+
+    def hedge_delay(self) -> float:
+        if self.latencies.count < self.min_samples:
+            return self.initial_hedge_delay
+        return max(self.min_hedge_delay, self.latencies.quantile(self.hedge_quantile))
+
+    async def _attempt(self, messages: list, args: Any, kwargs: Any) -> Any:
+        start = time.perf_counter()
+        response = await self.wrapped.request(messages, *args, **kwargs)
+        self.latencies.record(time.perf_counter() - start)
+        return response
+
+    async def request(self, messages: list, *args: Any, **kwargs: Any):
+        loop = asyncio.get_running_loop()
+        left = remaining()
+        timeout = self.request_timeout if left is None else min(self.request_timeout, left)
+        if timeout <= 0:
+            raise DeadlineExceeded(f"{self.model_name} request has no time left before its deadline")
+        start = loop.time()
+        give_up = start + timeout
+        hedge_at = start + self.hedge_delay()
+
+        primary = asyncio.ensure_future(self._attempt(messages, args, kwargs))
+        pending = {primary}
+        hedge: Optional["asyncio.Future[Any]"] = None
+        try:
+            while True:
+                wait = give_up - loop.time() if hedge is not None else min(give_up, hedge_at) - loop.time()
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, wait), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if hedge is not None:
+                            latency.record("model.hedge", loop.time() - start, model=self.model_name, winner="hedge" if task is hedge else "primary")
+                        return task.result()
+                if done:
+                    # A failed attempt only counts once there is nothing left to wait for
+                    if not pending:
+                        return done.pop().result()
+                    continue
+                if hedge is None and loop.time() < give_up:
+                    hedge = asyncio.ensure_future(self._attempt(messages, args, kwargs))
+                    pending.add(hedge)
+                    continue
+                raise DeadlineExceeded(f"{self.model_name} request did not finish within {timeout:.1f}s")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @asynccontextmanager
+    async def request_stream(self, messages: list, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        left = remaining()
+        if left is not None and left <= 0:
+            raise DeadlineExceeded(f"{self.model_name} request has no time left before its deadline")
+        async with super().request_stream(messages, *args, **kwargs) as response:
+            yield response
@@ -0,0 +1,385 @@
+"""
+Embedding index over the local paper store, for semantic retrieval.
+
+Keyword search misses related work phrased differently, so the agents used
+to issue many query variations. `EmbeddingIndex` keeps one float32
+embedding per stored paper (title plus abstract) in a memory-mapped `.npy`
+matrix and answers a batch of queries with one vectorized cosine top-k:
+
+    hits = await paper_embeddings.search(["self-healing electrolytes", "solid-state batteries"], k=10)
+
+The index follows the paper store (see paper_store.py) incrementally: new
+or changed papers are embedded and appended before each search, and the
+matrix doubles its capacity in place of reallocating on every append.
+
+Embeddings come from a local CPU model: fastembed's ONNX build of
+`BAAI/bge-small-en-v1.5` when fastembed is installed, otherwise a hashed
+bag of words, word pairs and character trigrams, which only matches shared
+vocabulary but needs nothing beyond NumPy. Each embedder keeps its own
+index directory.
+
+Agents get `papers-search-semantic` next to `papers-search-local` (local_tools.py); the
+knowledge synthesizer's retrieval stage calls `semantic_answers()`, which
+only lets the fastembed model answer in place of Semantic Scholar.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import logfire
+
+from mcp_pool import CACHE_DIR
+from paper_store import STOPWORDS, PaperStore, paper_store
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Rows scored per block, so a large index never needs a full (papers x queries) score matrix
+SEARCH_BLOCK_ROWS = 65536
+
+# Papers embedded per batch while catching up with the paper store
+SYNC_BATCH = 256
+
+
+@lru_cache(maxsize=1 << 18)
+def _bucket(feature: str, dim: int) -> Tuple[int, float]:
+    """Column and sign of a hashed feature."""
+    digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+    return digest % dim, 1.0 if digest >> 63 else -1.0
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words, word pairs and character trigrams, L2-normalized.
+
+    Matches shared vocabulary (trigrams also catch inflections such as
+    "battery" and "batteries"), not meaning, but needs nothing beyond NumPy.
+    """
+
+    # Cosine similarity above which a paper counts as a match for the query
+    min_score = 0.3
+    # Shared vocabulary is not evidence that a stored paper answers a search, see `semantic_answers`
+    answers_queries = False
+
+    # Weights of word and word pair features, and of character trigram features
+    WORD_WEIGHT = 1.0
+    TRIGRAM_WEIGHT = 0.5
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        words = [word for word in re.findall(r"\w+", text.casefold()) if word not in STOPWORDS]
+        features = [(word, self.WORD_WEIGHT) for word in words]
+        features += [(f"{a} {b}", self.WORD_WEIGHT) for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"#{word}#"
+            features += [(f"#3{padded[start:start + 3]}", self.TRIGRAM_WEIGHT) for start in range(len(padded) - 2)]
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        import numpy as np
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                bucket, sign = _bucket(feature, self.dim)
+                vectors[row, bucket] += sign * weight
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class FastEmbedEmbedder:
+    """Sentence embeddings from a small ONNX model run on the CPU by fastembed."""
+
+    min_score = 0.75
+    answers_queries = True
+
+    def __init__(self, model: str = "BAAI/bge-small-en-v1.5"):
+        from fastembed import TextEmbedding
+
+        self._model = TextEmbedding(model)
+        self.name = model.replace("/", "--")
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        import numpy as np
+        vectors = np.asarray(list(self._model.embed(list(texts))), dtype=np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def default_embedder() -> Any:
+    """fastembed's model when it is installed and loads, the hashing embedder otherwise."""
+    try:
+        return FastEmbedEmbedder()
+    except Exception as e:
+        logfire.info("using the hashing embedder for the paper index: {error}", error=repr(e))
+        return HashingEmbedder()
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+class EmbeddingIndex:
+    """Memory-mapped float32 embedding matrix plus the paper ID of each row.
+
+    Files in `directory`: `vectors.npy` (rows beyond `count` are spare
+    capacity) and `meta.json` (IDs, text digests, paper store watermark),
+    which is only rewritten after the rows it counts are flushed.
+
+    Args:
+        directory: Where the index files are kept
+        embedder: Object with `name`, `min_score`, `answers_queries` and `embed(texts) -> (n, dim) float32`, created on first use if omitted
+        store: Paper store the index follows
+        initial_capacity: Rows allocated for a new index
+    """
+
+    def __init__(self, directory: Path, embedder: Any = None, store: Optional[PaperStore] = None, initial_capacity: int = 1024):
+        self.directory = Path(directory)
+        self.store = store
+        self.initial_capacity = initial_capacity
+        self._embedder = embedder
+        self._vectors: Optional[np.ndarray] = None
+        self._ids: List[str] = []
+        self._digests: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._watermark: Tuple[float, int] = (0.0, 0)
+        self._lock = threading.Lock()
+        self._embedder_lock = threading.Lock()
+        self._sync_lock: Optional[asyncio.Lock] = None
+        self.searches = 0
+        self.queries = 0
+        self.embedded = 0
+
+    @property
+    def embedder(self) -> Any:
+        if self._embedder is None:
+            with self._embedder_lock:
+                if self._embedder is None:
+                    self._embedder = default_embedder()
+        return self._embedder
+
+    async def load_embedder(self) -> Any:
+        """The embedder, loaded in a worker thread the first time: fastembed may download its model files."""
+        if self._embedder is None:
+            await asyncio.to_thread(lambda: self.embedder)
+        return self._embedder
+
+    @property
+    def path(self) -> Path:
+        return self.directory / self.embedder.name
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _open(self) -> None:
+        """Load the index from disk, or create an empty one."""
+        import numpy as np
+        if self._vectors is not None:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta_path = self.path / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            self._vectors = np.load(self.path / "vectors.npy", mmap_mode="r+")
+            self._ids = meta["ids"]
+            self._digests = meta["digests"]
+            self._watermark = tuple(meta["watermark"])
+        else:
+            dim = self.embedder.embed(["dimension probe"]).shape[1]
+            self._vectors = np.lib.format.open_memmap(self.path / "vectors.npy", mode="w+", dtype=np.float32, shape=(self.initial_capacity, dim))
+        self._rows = {paper_id: row for row, paper_id in enumerate(self._ids)}
+
+    def _grow(self, rows: int) -> None:
+        """Make room for `rows` more rows, doubling the capacity as needed."""
+        import numpy as np
+        capacity = self._vectors.shape[0]
+        if len(self._ids) + rows <= capacity:
+            return
+        while capacity < len(self._ids) + rows:
+            capacity *= 2
+        grown_path = self.path / "vectors.grow.npy"
+        grown = np.lib.format.open_memmap(grown_path, mode="w+", dtype=np.float32, shape=(capacity, self._vectors.shape[1]))
+        grown[:len(self._ids)] = self._vectors[:len(self._ids)]
+        grown.flush()
+        del grown
+        self._vectors = None
+        os.replace(grown_path, self.path / "vectors.npy")
+        self._vectors = np.load(self.path / "vectors.npy", mmap_mode="r+")
+
+    def _save_meta(self) -> None:
+        meta_path = self.path / "meta.json"
+        partial = meta_path.with_suffix(".partial")
+        partial.write_text(json.dumps({"embedder": self.embedder.name, "ids": self._ids, "digests": self._digests, "watermark": list(self._watermark)}))
+        os.replace(partial, meta_path)
+
+    def add(self, paper_ids: Sequence[str], texts: Sequence[str], save: bool = True) -> int:
+        """Embed and store texts by paper ID: new IDs are appended, changed texts overwrite their row. Returns the rows written.
+
+        With `save=False` the caller saves the metadata (`_save_meta`) once after a series of adds.
+        """
+        with self._lock:
+            self._open()
+            pending = [(paper_id, text, _digest(text)) for paper_id, text in zip(paper_ids, texts)]
+            pending = [(paper_id, text, digest) for paper_id, text, digest in pending if paper_id not in self._rows or self._digests[self._rows[paper_id]] != digest]
+            if not pending:
+                return 0
+            vectors = self.embedder.embed([text for _, text, _ in pending])
+            self._grow(sum(1 for paper_id, _, _ in pending if paper_id not in self._rows))
+            for (paper_id, _, digest), vector in zip(pending, vectors):
+                row = self._rows.get(paper_id)
+                if row is None:
+                    row = self._rows[paper_id] = len(self._ids)
+                    self._ids.append(paper_id)
+                    self._digests.append(digest)
+                self._vectors[row] = vector
+                self._digests[row] = digest
+            self._vectors.flush()
+            if save:
+                self._save_meta()
+            self.embedded += len(pending)
+            return len(pending)
+
+    def search_vectors(self, queries: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        """Top-`k` (paper ID, cosine similarity) per row of `queries` (normalized, shape (m, dim)), best first."""
+        import numpy as np
+        with self._lock:
+            self._open()
+            count = len(self._ids)
+            best_scores = np.full((queries.shape[0], 0), -np.inf, dtype=np.float32)
+            best_rows = np.zeros((queries.shape[0], 0), dtype=np.int64)
+            for start in range(0, count, SEARCH_BLOCK_ROWS):
+                block = np.asarray(self._vectors[start:min(count, start + SEARCH_BLOCK_ROWS)])
+                scores = np.concatenate([best_scores, queries @ block.T], axis=1)
+                rows = np.concatenate([best_rows, np.broadcast_to(np.arange(start, start + block.shape[0]), (queries.shape[0], block.shape[0]))], axis=1)
+                if scores.shape[1] > k:
+                    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                    scores = np.take_along_axis(scores, top, axis=1)
+                    rows = np.take_along_axis(rows, top, axis=1)
+                best_scores, best_rows = scores, rows
+            order = np.argsort(-best_scores, axis=1)
+            best_scores = np.take_along_axis(best_scores, order, axis=1)
+            best_rows = np.take_along_axis(best_rows, order, axis=1)
+            return [[(self._ids[row], float(score)) for row, score in zip(rows, scores)] for rows, scores in zip(best_rows, best_scores)]
+
+    def _sync(self) -> int:
+        """Embed the papers stored or updated since the last sync."""
+        embedded = 0
+        with self._lock:
+            self._open()
+        watermark = self._watermark
+        while True:
+            changed = self.store.changed_since(watermark, limit=SYNC_BATCH)
+            if not changed:
+                break
+            embedded += self.add([row[0] for row in changed], [f"{row[1]}. {row[2] or ''}".strip() for row in changed], save=False)
+            watermark = (changed[-1][3], changed[-1][4])
+        if watermark != self._watermark:
+            with self._lock:
+                self._watermark = watermark
+                self._save_meta()
+        return embedded
+
+    async def sync(self) -> int:
+        """Catch up with the paper store in a worker thread. Returns the papers embedded."""
+        if self.store is None:
+            return 0
+        if self._sync_lock is None:
+            self._sync_lock = asyncio.Lock()
+        async with self._sync_lock:
+            with logfire.span("sync paper embeddings"):
+                return await asyncio.to_thread(self._sync)
+
+    async def search(self, queries: Sequence[str], k: int = 10) -> List[List[Tuple[str, float]]]:
+        """Top-`k` (paper ID, cosine similarity) per query, best first, after catching up with the paper store."""
+        await self.sync()
+        self.searches += 1
+        self.queries += len(queries)
+        return await asyncio.to_thread(lambda: self.search_vectors(self.embedder.embed(list(queries)), k))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "embedder": self._embedder.name if self._embedder is not None else None,
+            "papers": len(self._ids),
+            "capacity": self._vectors.shape[0] if self._vectors is not None else 0,
+            "dimensions": self._vectors.shape[1] if self._vectors is not None else 0,
+            "embedded": self.embedded,
+            "searches": self.searches,
+            "queries": self.queries,
+        }
+
+
+paper_embeddings = EmbeddingIndex(CACHE_DIR / "paper_embeddings", store=paper_store)
+
+
+async def semantic_search(
+    queries: Sequence[str],
+    limit: int = 10,
+    year_start: Optional[int] = None,
+    year_end: Optional[int] = None,
+    min_score: Optional[float] = None,
+    index: Optional[EmbeddingIndex] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Stored papers most similar to each query, as Semantic Scholar-shaped records with a `score`.
+
+    One batched search for all queries. Papers outside the year range or
+    below `min_score` (the embedder's match threshold by default) are dropped.
+    """
+    index = paper_embeddings if index is None else index
+    # Over-fetch so the year filter still leaves `limit` candidates
+    k = limit * 4 if year_start or year_end else limit
+    hits = await index.search(queries, k=k)
+    threshold = index.embedder.min_score if min_score is None else min_score
+    results = []
+    for query_hits in hits:
+        scores = {paper_id: score for paper_id, score in query_hits if score >= threshold}
+        papers = [
+            {**paper, "score": round(scores[paper["paperId"]], 4)}
+            for paper in index.store.get(list(scores))
+            if (year_start is None or (paper["year"] or 0) >= year_start) and (year_end is None or (paper["year"] or 0) <= year_end)
+        ]
+        results.append(papers[:limit])
+    return results
+
+
+async def semantic_answers(
+    queries: Sequence[str],
+    limit: int = 10,
+    year_start: Optional[int] = None,
+    index: Optional[EmbeddingIndex] = None,
+) -> List[List[Dict[str, Any]]]:
+    """`semantic_search` for retrieval stages that skip Semantic Scholar for the queries it answers.
+
+    Only an embedder that matches meaning (`answers_queries`) may stand in for
+    a search: with the hashing fallback every query gets no answers here and
+    goes upstream.
+    """
+    index = paper_embeddings if index is None else index
+    if not (await index.load_embedder()).answers_queries:
+        return [[] for _ in queries]
+    return await semantic_search(queries, limit=limit, year_start=year_start, index=index)
+
+
+async def papers_search_semantic(query: str, limit: int = 10, yearStart: Optional[int] = None, yearEnd: Optional[int] = None) -> str:
+    """Find stored papers about the same topic as the query, even when they use different words.
+
+    Searches the papers already retrieved from Semantic Scholar, on local disk,
+    by embedding similarity of titles and abstracts. One semantic query covers
+    several keyword variations; results carry a similarity `score`.
+
+    Args:
+        query: Description of the topic, in natural language
+        limit: Maximum number of papers to return
+        yearStart: Only papers published in or after this year
+        yearEnd: Only papers published in or before this year
+    """
+    papers = (await semantic_search([query], limit=limit, year_start=yearStart, year_end=yearEnd))[0]
+    return json.dumps({"total": len(papers), "source": "local paper store, semantic", "data": papers}, ensure_ascii=False)
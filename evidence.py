@@ -0,0 +1,243 @@
+"""
+Evidence retrieval stage for the knowledge synthesizer.
+
+Instead of letting each analysis agent decide on searches turn by turn (and
+carry every raw tool result through every later turn), the queries are
+planned in plain code from the tool arguments, issued to the Semantic
+Scholar and fetch MCP servers in parallel (paper queries the local paper
+store can fill, by embedding similarity or full-text match, are answered
+from disk instead), normalized into
+`EvidenceRecord`s and deduplicated. The compact `EvidenceBundle` is then
+handed to a single model call.
+"""
+
+import asyncio
+import json
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import quote_plus
+
+import logfire
+from pydantic import BaseModel
+
+# Tool names of the upstream MCP servers used by the retrieval stage
+PAPER_SEARCH_TOOL = "papers-search-advanced"
+FETCH_TOOL = "fetch"
+
+# Industry and startup signal source reachable through the fetch server
+WEB_SEARCH_URL = "https://hn.algolia.com/api/v1/search?tags=story&hitsPerPage={limit}&query={query}"
+
+
+class EvidenceRecord(BaseModel):
+    """One normalized search result"""
+    source: str
+    id: str
+    title: str
+    year: Optional[int] = None
+    published: Optional[str] = None
+    authors: List[str] = []
+    venue: Optional[str] = None
+    citation_count: Optional[int] = None
+    fields_of_study: List[str] = []
+    abstract: Optional[str] = None
+    url: Optional[str] = None
+    external_ids: Dict[str, str] = {}
+    query: str = ""
+
+
+class EvidenceBundle(BaseModel):
+    """Deduplicated evidence gathered for one request"""
+    queries: List[str]
+    records: List[EvidenceRecord]
+    errors: List[str] = []
+    timings: Dict[str, float] = {}
+
+    def to_prompt(self, max_records: Optional[int] = None, abstract_chars: int = 400) -> str:
+        """Compact, citable text form of the evidence for a model prompt."""
+        records = self.records if max_records is None else self.records[:max_records]
+        lines = [f"EVIDENCE ({len(records)} records retrieved for: {'; '.join(self.queries)})", ""]
+        for number, record in enumerate(records, 1):
+            details = [str(record.year)] if record.year else []
+            if record.venue:
+                details.append(record.venue)
+            if record.citation_count is not None:
+                details.append(f"{record.citation_count} citations")
+            if record.fields_of_study:
+                details.append(", ".join(record.fields_of_study[:3]))
+            authors = ", ".join(record.authors[:3]) + (" et al." if len(record.authors) > 3 else "")
+            lines.append(f"[E{number}] {record.title}" + (f" - {authors}" if authors else "") + (f" ({'; '.join(details)})" if details else ""))
+            if record.url:
+                lines.append(f"    {record.url}")
+            if record.abstract:
+                abstract = " ".join(record.abstract.split())
+                lines.append(f"    {abstract[:abstract_chars]}{'...' if len(abstract) > abstract_chars else ''}")
+        return "\n".join(lines)
+
+
+def _year(value: Any) -> Optional[int]:
+    match = re.search(r"\b(19|20)\d{2}\b", str(value)) if value is not None else None
+    return int(match.group(0)) if match else None
+
+
+def _date(value: Any) -> Optional[str]:
+    match = re.search(r"\b(?:19|20)\d{2}-\d{2}(?:-\d{2})?\b", str(value)) if value is not None else None
+    return match.group(0) if match else None
+
+
+def _int(value: Any) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _names(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [name.strip() for name in value.split(",") if name.strip()]
+    if isinstance(value, list):
+        return [item.get("name", "") if isinstance(item, dict) else str(item) for item in value if item]
+    return []
+
+
+def _text_records(text: str) -> Iterator[Dict[str, Any]]:
+    """Records from a plain-text listing of `Key: value` blocks."""
+    for block in re.split(r"\n\s*\n", text):
+        fields = {}
+        for line in block.splitlines():
+            key, sep, value = line.strip().lstrip("-*#0123456789. ").partition(":")
+            if sep and value.strip():
+                fields[key.strip().lower().replace(" ", "")] = value.strip()
+        if "title" in fields:
+            yield fields
+
+
+def raw_records(value: Any) -> Iterator[Dict[str, Any]]:
+    """Every dict that looks like a paper or story in an MCP tool result, whatever its nesting."""
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+        except ValueError:
+            yield from _text_records(value)
+            return
+        yield from raw_records(parsed)
+    elif isinstance(value, dict):
+        if value.get("title"):
+            yield value
+        else:
+            for item in value.values():
+                yield from raw_records(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from raw_records(item)
+
+
+def normalize_records(result: Any, source: str, query: str) -> List[EvidenceRecord]:
+    """Map a raw tool result onto `EvidenceRecord`s."""
+    records = []
+    for raw in raw_records(result):
+        external = raw.get("externalIds") or raw.get("externalids") or {}
+        doi = external.get("DOI") if isinstance(external, dict) else None
+        title = " ".join(str(raw["title"]).split())
+        record_id = raw.get("paperId") or raw.get("paperid") or raw.get("objectID") or doi or title
+        fields = raw.get("fieldsOfStudy") or raw.get("fieldsofstudy") or []
+        records.append(EvidenceRecord(
+            source=source,
+            id=str(record_id),
+            title=title,
+            year=_year(raw.get("year") or raw.get("publicationDate") or raw.get("created_at")),
+            published=_date(raw.get("publicationDate") or raw.get("publicationdate") or raw.get("created_at")),
+            authors=_names(raw.get("authors") or raw.get("author")),
+            venue=raw.get("venue") or None,
+            citation_count=_int(raw.get("citationCount") or raw.get("citations") or raw.get("citationcount")),
+            fields_of_study=_names(fields),
+            abstract=raw.get("abstract") or raw.get("tldr") or raw.get("story_text") or None,
+            url=raw.get("url") or (f"https://doi.org/{doi}" if doi else None),
+            external_ids={key: str(value) for key, value in external.items() if value} if isinstance(external, dict) else {},
+            query=query,
+        ))
+    return records
+
+
+def dedupe_key(record: EvidenceRecord) -> str:
+    return re.sub(r"[^a-z0-9]", "", record.title.casefold())
+
+
+def merge_records(batches: Iterable[List[EvidenceRecord]]) -> List[EvidenceRecord]:
+    """Interleave results of all queries (so every query is represented near the top) and drop duplicates."""
+    batches = [list(batch) for batch in batches]
+    merged: Dict[str, EvidenceRecord] = {}
+    for rank in range(max((len(batch) for batch in batches), default=0)):
+        for batch in batches:
+            if rank < len(batch):
+                merged.setdefault(dedupe_key(batch[rank]), batch[rank])
+    return list(merged.values())
+
+
+async def gather_evidence(
+    queries: List[str],
+    semantic_scholar: Any,
+    fetch: Any = None,
+    web_queries: Iterable[str] = (),
+    year_start: Optional[int] = None,
+    per_query: int = 10,
+    local: Any = None,
+    semantic: Optional[Callable[..., Awaitable[List[List[Dict[str, Any]]]]]] = None,
+    sort_by: str = "citationCount",
+) -> EvidenceBundle:
+    """Run all searches in parallel and return the normalized, deduplicated evidence.
+
+    Args:
+        queries: Semantic Scholar search queries
+        semantic_scholar: Pooled Semantic Scholar MCP server
+        fetch: Pooled fetch MCP server, used for `web_queries`
+        web_queries: Queries to run against the web search source through `fetch`
+        year_start: Only papers published in or after this year
+        per_query: Results requested per query
+        local: `PaperStore` answering the paper queries it has `per_query` full matches for, without a Semantic Scholar call
+        semantic: Batched local semantic search (`embedding_index.semantic_answers`), tried for all paper queries at once before `local`
+        sort_by: Order of the paper searches, local and upstream: "citationCount" (most cited first), "relevance" or "year"
+    """
+    queries = list(dict.fromkeys(" ".join(query.split()) for query in queries if query.strip()))
+    web_queries = list(dict.fromkeys(" ".join(query.split()) for query in web_queries if query.strip())) if fetch is not None else []
+
+    answered: Dict[str, List[EvidenceRecord]] = {}
+
+    async def search_papers(query: str) -> List[EvidenceRecord]:
+        if query in answered:
+            return answered[query]
+        if local is not None:
+            papers = local.search(query, limit=per_query, year_start=year_start, sort_by=sort_by, any_term=False)
+            if len(papers) >= per_query:
+                return normalize_records(papers, "semantic_scholar", query)
+        args: Dict[str, Any] = {"query": query, "limit": per_query, "sortBy": sort_by}
+        if year_start:
+            args["yearStart"] = year_start
+        return normalize_records(await semantic_scholar.call(PAPER_SEARCH_TOOL, args), "semantic_scholar", query)
+
+    async def search_web(query: str) -> List[EvidenceRecord]:
+        url = WEB_SEARCH_URL.format(query=quote_plus(query), limit=per_query)
+        return normalize_records(await fetch.call(FETCH_TOOL, {"url": url}), "web", query)
+
+    start = time.perf_counter()
+    with logfire.span("retrieve evidence", queries=queries, web_queries=web_queries):
+        if semantic is not None and queries:
+            try:
+                hits = await semantic(queries, limit=per_query, year_start=year_start)
+            except Exception as e:
+                logfire.warn("local semantic search failed: {error}", error=repr(e))
+            else:
+                answered = {query: normalize_records(papers, "semantic_scholar", query) for query, papers in zip(queries, hits) if len(papers) >= per_query}
+        results = await asyncio.gather(
+            *(search_papers(query) for query in queries),
+            *(search_web(query) for query in web_queries),
+            return_exceptions=True,
+        )
+    errors = [f"{type(result).__name__}: {result}" for result in results if isinstance(result, BaseException)]
+    records = merge_records(result for result in results if not isinstance(result, BaseException))
+    return EvidenceBundle(
+        queries=queries + [f"web: {query}" for query in web_queries],
+        records=records,
+        errors=errors,
+        timings={"retrieval_seconds": time.perf_counter() - start, "calls": float(len(results)), "semantic_answers": float(len(answered))},
+    )
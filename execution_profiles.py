@@ -0,0 +1,76 @@
+"""
+Execution profiles behind the knowledge synthesizer's `depth` argument.
+
+A depth used to be a word in the prompt; a "surface" request cost as much
+as a "comprehensive" one. Each `ExecutionProfile` now fixes what a request
+may spend, so callers can pick a predictable latency tier:
+
+- `model`: the model tier answering the request
+- `request_limit`: model requests per agent run (pydantic-ai usage limits)
+- `tool_calls_limit`: MCP tool calls per run when the agent researches on its own
+- `servers`: the MCP servers the agent may use
+- `max_queries` / `per_query` / `web_search`: size of the retrieval stage
+- `evidence_items`: evidence records passed to the model
+
+`comprehensive` is what every request did before profiles existed.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Literal, Optional, Tuple
+
+from pydantic_ai import RunContext
+from pydantic_ai.toolsets import ToolsetTool, WrapperToolset
+from pydantic_ai.usage import UsageLimits
+
+Depth = Literal["surface", "moderate", "comprehensive"]
+
+
+@dataclass(frozen=True)
+class ExecutionProfile:
+    """Model tier, usage limits, servers and evidence budget of one depth."""
+    name: str
+    model: str
+    request_limit: int
+    tool_calls_limit: int
+    servers: Tuple[str, ...]
+    max_queries: Optional[int]
+    per_query: int
+    web_search: bool
+    evidence_items: Optional[int]
+
+    def usage_limits(self) -> UsageLimits:
+        return UsageLimits(request_limit=self.request_limit)
+
+
+PROFILES: Dict[str, ExecutionProfile] = {
+    "surface": ExecutionProfile(
+        "surface", "gemini-2.5-flash-lite", request_limit=6, tool_calls_limit=4,
+        servers=("semantic_scholar",), max_queries=3, per_query=5, web_search=False, evidence_items=15,
+    ),
+    "moderate": ExecutionProfile(
+        "moderate", "gemini-2.5-flash", request_limit=12, tool_calls_limit=12,
+        servers=("semantic_scholar", "fetch"), max_queries=6, per_query=8, web_search=True, evidence_items=40,
+    ),
+    "comprehensive": ExecutionProfile(
+        "comprehensive", "gemini-2.5-flash", request_limit=25, tool_calls_limit=40,
+        servers=("semantic_scholar", "fetch", "ultra_crawler", "notion"), max_queries=None, per_query=10, web_search=True, evidence_items=None,
+    ),
+}
+
+
+class ToolCallBudget(WrapperToolset):
+    """Toolset answering every call past `limit` with a note to finish, instead of calling the tool.
+
+    Create one per agent run; the count is not reset.
+    """
+
+    def __init__(self, wrapped: Any, limit: int):
+        super().__init__(wrapped)
+        self.limit = limit
+        self.calls = 0
+
+    async def call_tool(self, name: str, tool_args: Dict[str, Any], ctx: RunContext[Any], tool: ToolsetTool[Any]) -> Any:
+        self.calls += 1
+        if self.calls > self.limit:
+            return f"Tool call budget of {self.limit} calls for this depth is used up. Do not call more tools; answer with the information gathered so far."
+        return await super().call_tool(name, tool_args, ctx, tool)
@@ -0,0 +1,202 @@
+"""
+Gemini context caching for the static part of agent requests.
+
+Every request of an agent run repeats the same system instruction (system
+prompt plus request scaffolding), tool declarations and tool config; only
+the conversation contents change. `CachedGeminiModel` registers that static
+prefix once as Gemini cached content and sends each request with
+`cached_content` instead, so the prefix is neither re-uploaded nor
+re-processed. A prefix that is too small to cache (or a failed cache
+creation) falls back to a plain request. Prefixes are not measured locally:
+any that could reach the model's minimum is offered to `caches.create`, and
+one Gemini rejects as invalid (400, e.g. under the minimum) is not offered again.
+
+    agent = Agent(CachedGeminiModel("gemini-2.5-pro"), system_prompt=[...])
+
+`context_cache.stats()` reports prompt tokens split into cached and
+uncached, as counted by Gemini's usage metadata.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Optional
+
+import logfire
+from google.genai import errors as genai_errors
+from pydantic_ai.models.google import GoogleModel
+
+# Request config fields that move into the cached content; Gemini rejects them next to `cached_content`
+CACHED_FIELDS = ("system_instruction", "tools", "tool_config")
+
+# Gemini's minimum cacheable prompt size per model
+MIN_CACHE_TOKENS = {"gemini-2.5-pro": 2048, "gemini-2.5-flash": 1024}
+
+
+@dataclass
+class _CacheEntry:
+    name: Optional[str] = None
+    expires_at: float = 0.0
+    failed_at: Optional[float] = None
+    rejected: bool = False
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class GeminiContextCache:
+    """Cached content per distinct (model, static prefix), plus token accounting.
+
+    Args:
+        ttl_seconds: Lifetime of each cached content on Google's side
+        refresh_margin: Recreate a cached content this many seconds before it expires
+        retry_after: Seconds before retrying a prefix whose cache creation failed
+    """
+
+    def __init__(self, ttl_seconds: int = 3600, refresh_margin: float = 60.0, retry_after: float = 600.0):
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self.retry_after = retry_after
+        self._entries: Dict[str, _CacheEntry] = {}
+        self.requests = 0
+        self.cached_requests = 0
+        self.creations = 0
+        self.failures = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    @staticmethod
+    def prefix_key(model: str, config: Dict[str, Any]) -> str:
+        static = {name: config.get(name) for name in CACHED_FIELDS}
+        return hashlib.sha256(json.dumps([model, static], sort_keys=True, default=str).encode()).hexdigest()
+
+    async def cached_content(self, client: Any, model: str, config: Dict[str, Any]) -> Optional[str]:
+        """Name of the cached content holding the static part of `config`, creating it if needed."""
+        static = {name: config[name] for name in CACHED_FIELDS if config.get(name)}
+        if "system_instruction" not in static:
+            return None
+        # Every token is at least one character, so only a prefix shorter than the minimum in characters certainly can't be cached
+        if len(json.dumps(static, default=str)) < MIN_CACHE_TOKENS.get(model, 1024):
+            return None
+
+        key = self.prefix_key(model, config)
+        entry = self._entries.setdefault(key, _CacheEntry())
+        async with entry.lock:
+            now = time.monotonic()
+            if entry.name and now < entry.expires_at - self.refresh_margin:
+                return entry.name
+            if entry.rejected or (entry.failed_at is not None and now - entry.failed_at < self.retry_after):
+                return None
+            try:
+                cached = await client.aio.caches.create(
+                    model=model,
+                    config={**static, "ttl": f"{self.ttl_seconds}s", "display_name": f"knowledge-agents-{key[:12]}"},
+                )
+            except genai_errors.APIError as e:
+                entry.name, entry.failed_at = None, now
+                # The static prefix never changes, so neither does a 400 for it
+                entry.rejected = e.code == 400
+                self.failures += 1
+                logfire.warn("gemini context cache creation failed for {model}: {error}", model=model, error=str(e))
+                return None
+            entry.name, entry.expires_at, entry.failed_at = cached.name, now + self.ttl_seconds, None
+            self.creations += 1
+            logfire.info("gemini context cache {name} created for {model}", name=cached.name, model=model)
+            return entry.name
+
+    def invalidate(self, model: str, config: Dict[str, Any]) -> None:
+        entry = self._entries.get(self.prefix_key(model, config))
+        if entry is not None:
+            entry.name = None
+
+    def record(self, response: Any, cached: bool) -> None:
+        self.requests += 1
+        self.cached_requests += int(cached)
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata is not None:
+            self.prompt_tokens += metadata.prompt_token_count or 0
+            self.cached_tokens += metadata.cached_content_token_count or 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "cached_requests": self.cached_requests,
+            "cache_creations": self.creations,
+            "cache_failures": self.failures,
+            "active_caches": sum(1 for entry in self._entries.values() if entry.name),
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "uncached_tokens": self.prompt_tokens - self.cached_tokens,
+            "cached_token_ratio": self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0,
+        }
+
+
+context_cache = GeminiContextCache()
+
+
+class _CachingModels:
+    """The `client.aio.models` calls GoogleModel makes, sent against cached content when possible."""
+
+    def __init__(self, client: Any, cache: GeminiContextCache):
+        self._client = client
+        self._cache = cache
+
+    async def _config(self, model: str, config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        name = await self._cache.cached_content(self._client, model, config)
+        if name is None:
+            return None
+        return {**{key: value for key, value in config.items() if key not in CACHED_FIELDS}, "cached_content": name}
+
+    async def generate_content(self, *, model: str, contents: Any, config: Dict[str, Any]) -> Any:
+        cached_config = await self._config(model, config)
+        if cached_config is not None:
+            try:
+                response = await self._client.aio.models.generate_content(model=model, contents=contents, config=cached_config)
+                self._cache.record(response, cached=True)
+                return response
+            except genai_errors.ClientError as e:
+                # Expired or deleted on Google's side: forget it and send the full request
+                if e.code not in (403, 404):
+                    raise
+                self._cache.invalidate(model, config)
+        response = await self._client.aio.models.generate_content(model=model, contents=contents, config=config)
+        self._cache.record(response, cached=False)
+        return response
+
+    async def generate_content_stream(self, *, model: str, contents: Any, config: Dict[str, Any]) -> AsyncIterator[Any]:
+        cached_config = await self._config(model, config)
+        try:
+            stream = await self._client.aio.models.generate_content_stream(model=model, contents=contents, config=cached_config or config)
+        except genai_errors.ClientError as e:
+            if cached_config is None or e.code not in (403, 404):
+                raise
+            self._cache.invalidate(model, config)
+            cached_config = None
+            stream = await self._client.aio.models.generate_content_stream(model=model, contents=contents, config=config)
+
+        async def record_last_chunk() -> AsyncIterator[Any]:
+            last = None
+            async for chunk in stream:
+                last = chunk
+                yield chunk
+            if last is not None:
+                self._cache.record(last, cached=cached_config is not None)
+
+        return record_last_chunk()
+
+
+class _CachingClient:
+    """Stand-in for `genai.Client` exposing `aio.models` (cached) and `aio.caches`."""
+
+    def __init__(self, client: Any, cache: GeminiContextCache):
+        self.aio = self
+        self.models = _CachingModels(client, cache)
+        self.caches = client.aio.caches
+
+
+class CachedGeminiModel(GoogleModel):
+    """GoogleModel whose requests reuse cached content for the system instruction and tools."""
+
+    def __init__(self, model_name: str, *, provider: str = "google-gla", cache: Optional[GeminiContextCache] = None, **kwargs: Any):
+        super().__init__(model_name, provider=provider, **kwargs)
+        self.client = _CachingClient(self.client, cache or context_cache)
@@ -9,21 +9,27 @@
 # ]
 # ///
 
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 from pydantic_ai import Agent
-from pydantic_ai.mcp import MCPServerStdio
 from pydantic import BaseModel
 import os
 from dotenv import load_dotenv
-import logfire
+import json
+from typing import Optional
+from deadlines import HedgedModel, within_deadline
+from jobs import JobStore, fail
+from latency_metrics import TimedModel, latency
+from mcp_pool import CACHE_DIR, pool
+from model_cascade import ModelCascade, list_field_issues
+from report_rendering import LABELED, TEXT, Block, ReportFormat, ReportSpec, Section
+from report_streaming import SectionStreamer
+from startup import DeferredStartup, deferred, telemetry
+from tool_cache import HOUR, ToolResultMemo
 
 # Load environment variables
 load_dotenv()
 
-mcp = FastMCP("innovation-breakthrough-agent")
-
-logfire.configure()
-logfire.instrument_pydantic_ai()
+mcp = FastMCP("innovation-breakthrough-agent", lifespan=pool.lifespan)
 
 class InnovationBreakthroughResponse(BaseModel):
     """Structured output for innovative thinking breakthroughs"""
@@ -39,7 +45,7 @@ class InnovationBreakthroughResponse(BaseModel):
     next_exploration_paths: list[str]
 
 # Connect to MCP servers for enhanced reasoning
-sequential_thinking = MCPServerStdio('npx', args=['-y', '@modelcontextprotocol/server-sequential-thinking'])
+sequential_thinking = pool.server('sequential_thinking', 'npx', args=['-y', '@modelcontextprotocol/server-sequential-thinking'])
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
@@ -86,17 +92,144 @@ Always approach roadblocks as innovation opportunities, providing multiple creat
 
 Your responses should spark breakthrough thinking and provide actionable innovative approaches."""
 
-# Configure the innovation agent
-innovation_agent = Agent(
-    "gemini-2.5-pro",
-    system_prompt=system_prompt,
-    mcp_servers=[sequential_thinking],
-    output_type=InnovationBreakthroughResponse,
-    instrument=True
+# Static instructions for every breakthrough request; the request itself only carries the roadblock description
+INNOVATION_REQUEST_INSTRUCTIONS = """As a 300 IQ innovation catalyst, please use sequential thinking to deconstruct the roadblock described in each request and provide breakthrough solutions across these dimensions:
+
+1. NOVEL PERSPECTIVES:
+- Completely fresh ways to view this challenge
+- Unconventional angles that haven't been considered
+- Paradigm shifts that reframe the problem space
+- Hidden opportunities within the roadblock
+
+2. CREATIVE APPROACHES:
+- Innovative methodologies for solving the challenge
+- Unconventional techniques and strategies
+- Creative problem-solving frameworks
+- Novel implementation patterns
+
+3. FIRST PRINCIPLES INSIGHTS:
+- Fundamental truths underlying the roadblock
+- Core assumptions that can be challenged
+- Essential components that can be reimagined
+- Basic principles that enable breakthrough solutions
+
+4. BREAKTHROUGH OPPORTUNITIES:
+- Revolutionary possibilities hidden within the challenge
+- Transformative potential of the roadblock
+- Innovation catalysts that can be leveraged
+- Paradigm-shifting possibilities
+
+5. IMPLEMENTATION STRATEGIES:
+- Practical approaches to execute innovative solutions
+- Step-by-step breakthrough implementation
+- Resource-efficient innovation pathways
+- Rapid prototyping and validation strategies
+
+6. UNCONVENTIONAL SOLUTIONS:
+- Non-obvious approaches that others would miss
+- Counterintuitive strategies that work
+- Innovative workarounds and alternatives
+- Creative combinations of existing elements
+
+7. CROSS-DOMAIN CONNECTIONS:
+- Insights from unexpected fields and disciplines
+- Analogies from nature, science, art, philosophy
+- Pattern recognition across diverse domains
+- Innovative applications from other industries
+
+8. PARADIGM SHIFTS:
+- Fundamental changes in thinking approach
+- Revolutionary new frameworks for the problem
+- Transformative perspectives on the challenge
+- Disruptive innovations that change the game
+
+9. INNOVATION FRAMEWORKS:
+- Structured approaches to breakthrough thinking
+- Methodologies for sustained innovation
+- Creative problem-solving frameworks
+- Innovation acceleration techniques
+
+10. NEXT EXPLORATION PATHS:
+- Future directions for continued innovation
+- Advanced concepts to explore further
+- Emerging opportunities to investigate
+- Evolution pathways for the solutions
+
+Focus on providing breakthrough insights that push the boundaries of what's possible in LLM agentic function design. Think beyond conventional limitations and offer genuinely innovative approaches that can transform how we approach these challenges."""
+
+# Agents are built on the first tool call, so initialize and tools/list don't wait for the Gemini client
+@deferred
+def build_agents() -> None:
+    global innovation_agent, breakthrough_cascade
+    from gemini_cache import CachedGeminiModel
+
+    # Configure the innovation agent
+    innovation_agent = Agent(
+        TimedModel(HedgedModel(CachedGeminiModel("gemini-2.5-pro"))),
+        system_prompt=[system_prompt, INNOVATION_REQUEST_INSTRUCTIONS],
+        mcp_servers=[sequential_thinking],
+        output_type=InnovationBreakthroughResponse,
+        instrument=True
+    )
+
+    # Cascade mode: a flash draft answers when it passes the quality gate, otherwise the agent's pro model runs
+    breakthrough_cascade = ModelCascade(
+        "breakthrough_innovation_roadblock",
+        [("flash", TimedModel(HedgedModel(CachedGeminiModel("gemini-2.5-flash")))), ("pro", None)],
+        gate=list_field_issues,
+    )
+
+mcp.add_middleware(DeferredStartup(telemetry, build_agents))
+
+# Report layouts, rendered by report_rendering.py
+breakthrough_report = ReportSpec(
+    "Innovation Breakthrough Analysis",
+    Section("Roadblock Challenge", "roadblock_description", TEXT),
+    Block("---"),
+    Section("Novel Perspectives", "novel_perspectives", LABELED, icon="🔍"),
+    Section("Creative Approaches", "creative_approaches", LABELED, icon="🚀"),
+    Section("First Principles Insights", "first_principles_insights", LABELED, icon="🔬"),
+    Section("Breakthrough Opportunities", "breakthrough_opportunities", LABELED, icon="💡"),
+    Section("Implementation Strategies", "implementation_strategies", LABELED, icon="⚙️"),
+    Section("Unconventional Solutions", "unconventional_solutions", LABELED, icon="🎯"),
+    Section("Cross-Domain Connections", "cross_domain_connections", LABELED, icon="🌐"),
+    Section("Paradigm Shifts", "paradigm_shifts", LABELED, icon="🔄"),
+    Section("Innovation Frameworks", "innovation_frameworks", LABELED, icon="📋"),
+    Section("Next Exploration Paths", "next_exploration_paths", LABELED, icon="🔮"),
+    Block("""---
+
+*Generated by Innovation Breakthrough Agent - Your 300 IQ Creative Catalyst*
+
+## Key Innovation Principles Applied:
+- **First Principles Thinking**: Deconstructed the challenge to fundamental components
+- **Analogical Reasoning**: Drew insights from unexpected domains and patterns
+- **Constraint Removal**: Challenged assumed limitations and conventional boundaries
+- **Combinatorial Innovation**: Merged disparate concepts for novel solutions
+- **Edge Case Exploration**: Found breakthrough insights in extreme scenarios
+- **Pattern Disruption**: Identified and broke limiting thought patterns
+
+## Breakthrough Activation Protocol:
+1. **Perspective Shift**: Adopt the most compelling novel perspective
+2. **Rapid Prototyping**: Implement the most promising unconventional solution
+3. **Cross-Domain Integration**: Apply the most relevant cross-domain insight
+4. **Paradigm Implementation**: Execute the most transformative paradigm shift
+5. **Innovation Acceleration**: Follow the most promising exploration path
+
+Ready to transform your roadblock into a breakthrough opportunity!"""),
+    bullet="•",
+)
+
+# End-to-end time limit of each tool, in seconds, so MCP clients get an answer before they time out
+TOOL_DEADLINES = {"breakthrough_innovation_roadblock": 240.0}
+
+# Memoized agent outputs for repeated or equivalent requests
+tool_results = ToolResultMemo(
+    ttls={"breakthrough_innovation_roadblock": 24 * HOUR},
+    path=CACHE_DIR / "innovation_breakthrough_results.sqlite",
 )
 
 @mcp.tool
-async def breakthrough_innovation_roadblock(roadblock_description: str) -> str:
+async def breakthrough_innovation_roadblock(roadblock_description: str, cascade: bool = False, force_refresh: bool = False, stream_sections: bool = False, output_format: ReportFormat = "markdown", ctx: Optional[Context] = None) -> str:
     """
     Help overcome innovative thinking roadblocks for creating powerful LLM agentic functions.
     
@@ -110,6 +243,10 @@ async def breakthrough_innovation_roadblock(roadblock_description: str) -> str:
     
     Args:
         roadblock_description: Description of the innovative thinking roadblock or challenge
+        cascade: Draft with a fast flash model and escalate to pro only if the draft fails a completeness and duplicate check
+        force_refresh: Re-run the analysis even if an equivalent request was answered recently
+        stream_sections: Send each report section to the client as a log/progress notification as soon as it is written
+        output_format: Report format: "markdown" (default), "json" or "compact" (one plain line per section)
     
     Returns:
         Structured innovative insights with breakthrough approaches and creative solutions
@@ -120,141 +257,135 @@ async def breakthrough_innovation_roadblock(roadblock_description: str) -> str:
     
     ROADBLOCK DESCRIPTION:
     {roadblock_description}
-    
-    As a 300 IQ innovation catalyst, please use sequential thinking to deconstruct this roadblock and provide breakthrough solutions across these dimensions:
-    
-    1. NOVEL PERSPECTIVES:
-    - Completely fresh ways to view this challenge
-    - Unconventional angles that haven't been considered
-    - Paradigm shifts that reframe the problem space
-    - Hidden opportunities within the roadblock
-    
-    2. CREATIVE APPROACHES:
-    - Innovative methodologies for solving the challenge
-    - Unconventional techniques and strategies
-    - Creative problem-solving frameworks
-    - Novel implementation patterns
-    
-    3. FIRST PRINCIPLES INSIGHTS:
-    - Fundamental truths underlying the roadblock
-    - Core assumptions that can be challenged
-    - Essential components that can be reimagined
-    - Basic principles that enable breakthrough solutions
-    
-    4. BREAKTHROUGH OPPORTUNITIES:
-    - Revolutionary possibilities hidden within the challenge
-    - Transformative potential of the roadblock
-    - Innovation catalysts that can be leveraged
-    - Paradigm-shifting possibilities
-    
-    5. IMPLEMENTATION STRATEGIES:
-    - Practical approaches to execute innovative solutions
-    - Step-by-step breakthrough implementation
-    - Resource-efficient innovation pathways
-    - Rapid prototyping and validation strategies
-    
-    6. UNCONVENTIONAL SOLUTIONS:
-    - Non-obvious approaches that others would miss
-    - Counterintuitive strategies that work
-    - Innovative workarounds and alternatives
-    - Creative combinations of existing elements
-    
-    7. CROSS-DOMAIN CONNECTIONS:
-    - Insights from unexpected fields and disciplines
-    - Analogies from nature, science, art, philosophy
-    - Pattern recognition across diverse domains
-    - Innovative applications from other industries
-    
-    8. PARADIGM SHIFTS:
-    - Fundamental changes in thinking approach
-    - Revolutionary new frameworks for the problem
-    - Transformative perspectives on the challenge
-    - Disruptive innovations that change the game
-    
-    9. INNOVATION FRAMEWORKS:
-    - Structured approaches to breakthrough thinking
-    - Methodologies for sustained innovation
-    - Creative problem-solving frameworks
-    - Innovation acceleration techniques
-    
-    10. NEXT EXPLORATION PATHS:
-    - Future directions for continued innovation
-    - Advanced concepts to explore further
-    - Emerging opportunities to investigate
-    - Evolution pathways for the solutions
-    
-    Focus on providing breakthrough insights that push the boundaries of what's possible in LLM agentic function design. Think beyond conventional limitations and offer genuinely innovative approaches that can transform how we approach these challenges.
     """
     
     try:
-        async with innovation_agent.run_mcp_servers():
-            result = await innovation_agent.run(innovation_prompt)
-        
-        breakthrough_data = result.output
+        sections = SectionStreamer(ctx if stream_sections else None)
+
+        async def run_tier(model) -> InnovationBreakthroughResponse:
+            # Only the tier that can no longer be escalated streams its sections
+            streamer = sections if model is None else SectionStreamer(None)
+            return await streamer.run(innovation_agent, innovation_prompt, model=model)
+
+        async def run_innovation() -> InnovationBreakthroughResponse:
+            with pool.track_run("breakthrough_innovation_roadblock"):
+                async with innovation_agent.run_mcp_servers():
+                    if cascade:
+                        return await breakthrough_cascade.run(run_tier)
+                    return await sections.run(innovation_agent, innovation_prompt)
+
+        breakthrough_data = await within_deadline(
+            tool_results.get_or_run(
+                "breakthrough_innovation_roadblock",
+                {"roadblock_description": roadblock_description, "cascade": cascade},
+                InnovationBreakthroughResponse,
+                run_innovation,
+                force_refresh=force_refresh,
+            ),
+            seconds=TOOL_DEADLINES["breakthrough_innovation_roadblock"],
+            what="breakthrough_innovation_roadblock",
+        )
+        await sections.finish(breakthrough_data)
         
         # Generate structured innovation breakthrough report
-        innovation_report = f"""# Innovation Breakthrough Analysis
-
-## Roadblock Challenge
-{roadblock_description}
-
----
-
-## 🔍 Novel Perspectives
-{chr(10).join(f"• **{perspective.split(':')[0]}**: {perspective.split(':', 1)[1] if ':' in perspective else perspective}" for perspective in breakthrough_data.novel_perspectives)}
-
-## 🚀 Creative Approaches
-{chr(10).join(f"• **{approach.split(':')[0]}**: {approach.split(':', 1)[1] if ':' in approach else approach}" for approach in breakthrough_data.creative_approaches)}
-
-## 🔬 First Principles Insights
-{chr(10).join(f"• **{insight.split(':')[0]}**: {insight.split(':', 1)[1] if ':' in insight else insight}" for insight in breakthrough_data.first_principles_insights)}
-
-## 💡 Breakthrough Opportunities
-{chr(10).join(f"• **{opportunity.split(':')[0]}**: {opportunity.split(':', 1)[1] if ':' in opportunity else opportunity}" for opportunity in breakthrough_data.breakthrough_opportunities)}
-
-## ⚙️ Implementation Strategies
-{chr(10).join(f"• **{strategy.split(':')[0]}**: {strategy.split(':', 1)[1] if ':' in strategy else strategy}" for strategy in breakthrough_data.implementation_strategies)}
+        with latency.measure("render", tool="breakthrough_innovation_roadblock"):
+            return breakthrough_report.render(breakthrough_data, {"roadblock_description": roadblock_description}, output_format)
+        
+    except Exception as e:
+        fail(e)
+        return f"Innovation breakthrough analysis failed: {str(e)}"
 
-## 🎯 Unconventional Solutions
-{chr(10).join(f"• **{solution.split(':')[0]}**: {solution.split(':', 1)[1] if ':' in solution else solution}" for solution in breakthrough_data.unconventional_solutions)}
+# Tools that can also run as background jobs, for calls that outlast the client's request timeout
+JOB_TOOLS = ["breakthrough_innovation_roadblock"]
 
-## 🌐 Cross-Domain Connections
-{chr(10).join(f"• **{connection.split(':')[0]}**: {connection.split(':', 1)[1] if ':' in connection else connection}" for connection in breakthrough_data.cross_domain_connections)}
+background_jobs = JobStore()
 
-## 🔄 Paradigm Shifts
-{chr(10).join(f"• **{shift.split(':')[0]}**: {shift.split(':', 1)[1] if ':' in shift else shift}" for shift in breakthrough_data.paradigm_shifts)}
+@mcp.tool
+async def start_job(tool: str, arguments: Optional[dict] = None) -> str:
+    """
+    Start a long-running tool in the background and return its job ID right away.
+    
+    Use this instead of a direct call when the tool may run longer than the
+    client waits for a response. Collect the outcome later with get_job or by
+    reading the jobs://{job_id} resource; many jobs can run at once.
+    
+    Args:
+        tool: Tool to run: breakthrough_innovation_roadblock
+        arguments: The tool's arguments, as for a direct call
+    
+    Returns:
+        JSON with the job ID, its status and the resource it can be read from
+    """
+    
+    try:
+        job = await background_jobs.submit(mcp, tool, arguments or {}, JOB_TOOLS)
+    except ValueError as e:
+        return f"Could not start job: {str(e)}"
+    return json.dumps(job.snapshot(), indent=2)
 
-## 📋 Innovation Frameworks
-{chr(10).join(f"• **{framework.split(':')[0]}**: {framework.split(':', 1)[1] if ':' in framework else framework}" for framework in breakthrough_data.innovation_frameworks)}
+@mcp.tool
+async def get_job(job_id: str, wait_seconds: float = 0.0) -> str:
+    """
+    Status, progress and, once finished, the report of a job started with start_job.
+    
+    Args:
+        job_id: The job ID returned by start_job
+        wait_seconds: Wait up to this long (at most 50 seconds) for the job to finish before answering
+    
+    Returns:
+        JSON with the status (queued, running, done, failed), current phase, tool calls and model requests made so far, and the report once done
+    """
+    
+    return json.dumps(await background_jobs.describe(job_id, wait_seconds), indent=2)
 
-## 🔮 Next Exploration Paths
-{chr(10).join(f"• **{path.split(':')[0]}**: {path.split(':', 1)[1] if ':' in path else path}" for path in breakthrough_data.next_exploration_paths)}
+@mcp.resource("cache://tool-results")
+def get_tool_result_cache_stats() -> str:
+    """
+    Hit/miss statistics of the memoized tool results.
+    """
+    
+    return json.dumps(tool_results.stats(), indent=2)
 
----
+@mcp.resource("cache://gemini-context")
+def get_gemini_context_cache_stats() -> str:
+    """
+    Gemini context cache usage: prompt tokens served from cached content versus sent uncached.
+    """
+    from gemini_cache import context_cache
+    
+    return json.dumps(context_cache.stats(), indent=2)
 
-*Generated by Innovation Breakthrough Agent - Your 300 IQ Creative Catalyst*
+@mcp.resource("metrics://cascade")
+def get_cascade_stats() -> str:
+    """
+    Cascade mode of breakthrough_innovation_roadblock: runs answered per model tier, escalation rate and reasons, per-tier latency.
+    """
+    
+    return json.dumps(breakthrough_cascade.stats(), indent=2)
 
-## Key Innovation Principles Applied:
-- **First Principles Thinking**: Deconstructed the challenge to fundamental components
-- **Analogical Reasoning**: Drew insights from unexpected domains and patterns
-- **Constraint Removal**: Challenged assumed limitations and conventional boundaries
-- **Combinatorial Innovation**: Merged disparate concepts for novel solutions
-- **Edge Case Exploration**: Found breakthrough insights in extreme scenarios
-- **Pattern Disruption**: Identified and broke limiting thought patterns
+@mcp.resource("jobs://{job_id}")
+async def get_job_status(job_id: str) -> str:
+    """
+    Status, progress and, once finished, the report of a background job.
+    """
+    
+    return json.dumps(await background_jobs.describe(job_id), indent=2)
 
-## Breakthrough Activation Protocol:
-1. **Perspective Shift**: Adopt the most compelling novel perspective
-2. **Rapid Prototyping**: Implement the most promising unconventional solution
-3. **Cross-Domain Integration**: Apply the most relevant cross-domain insight
-4. **Paradigm Implementation**: Execute the most transformative paradigm shift
-5. **Innovation Acceleration**: Follow the most promising exploration path
+@mcp.resource("metrics://jobs")
+def get_job_stats() -> str:
+    """
+    Background jobs per status, jobs evicted from the finished job store, and the store limits.
+    """
+    
+    return json.dumps(background_jobs.stats(), indent=2)
 
-Ready to transform your roadblock into a breakthrough opportunity!
-"""
-        
-        return innovation_report
-        
-    except Exception as e:
-        return f"Innovation breakthrough analysis failed: {str(e)}"
+@mcp.resource("metrics://latency")
+def get_latency_metrics() -> str:
+    """
+    Rolling p50/p95/p99 latencies (seconds) of MCP server startup and shutdown, MCP tool calls, model requests, retries and report rendering.
+    """
+    
+    return json.dumps(latency.snapshot(), indent=2)
 
-mcp.run()
\ No newline at end of file
+if __name__ == "__main__":
+    mcp.run()
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+Background jobs for the long-running agent tools.
+
+`research_innovation_idea` makes 15-20+ tool calls and the synthesizer tools
+run for minutes, longer than many MCP clients wait for a response, and the
+work was lost with the timed-out request. Every server therefore also runs
+its long-running tools as jobs:
+
+- `start_job` checks the arguments, starts the tool in a background task and
+  returns the job ID at once
+- `get_job`, or reading the `jobs://{job_id}` resource, answers with the
+  status, the progress so far (upstream MCP tool calls and model requests
+  made, current phase) and, once finished, the report
+- up to `max_running` jobs run at a time and the rest wait queued; their
+  upstream calls are admitted at batch priority (upstream_scheduler.py), so
+  interactive tool calls go first
+
+Progress is reported where the work happens: the pool (mcp_pool.py) on every
+agent run and MCP tool call, `TimedModel` (latency_metrics.py) on every model
+request. Each job runs in its own task, so `report` finds the job through the
+task's context, including from the tasks the tool starts itself.
+
+The tools catch their own errors and answer with a "... failed: ..." text,
+so they call `fail` in their error branch; the job then ends as "failed"
+with the error, rather than "done" with the failure text as its report.
+
+Finished jobs stay in memory until `max_finished` newer ones have finished;
+the oldest are evicted first, and their IDs answer as unknown. Jobs do not
+survive a server restart.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Sequence
+
+from fastmcp import Context, FastMCP
+from fastmcp.exceptions import NotFoundError
+from fastmcp.utilities.types import find_kwarg_by_type
+
+FINISHED = ("done", "failed", "cancelled")
+
+# Longest a `get_job` call waits for the job to finish, well under common client request timeouts
+MAX_WAIT = 50.0
+# Latest MCP tool calls listed in a job's progress
+RECENT_CALLS = 5
+
+
+@dataclass
+class Job:
+    """One background run of a tool, and its progress."""
+    id: str
+    tool: str
+    arguments: Dict[str, Any]
+    status: str = "queued"
+    phase: str = "queued"
+    tool_calls: int = 0
+    model_requests: int = 0
+    recent_calls: Deque[str] = field(default_factory=lambda: deque(maxlen=RECENT_CALLS))
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[str] = None
+    error: Optional[str] = None
+    finished: asyncio.Event = field(default_factory=asyncio.Event)
+    task: Optional["asyncio.Task[None]"] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Status and progress, plus the report or error once finished."""
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.id,
+            "resource": f"jobs://{self.id}",
+            "tool": self.tool,
+            "arguments": self.arguments,
+            "status": self.status,
+            "phase": self.phase,
+            "tool_calls": self.tool_calls,
+            "model_requests": self.model_requests,
+            "recent_tool_calls": list(self.recent_calls),
+            "queued_seconds": round((self.started_at or end) - self.created_at, 3),
+            "running_seconds": round(end - self.started_at, 3) if self.started_at else 0.0,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+_current_job: ContextVar[Optional[Job]] = ContextVar("current_job", default=None)
+
+
+def report(phase: str, tool_call: Optional[str] = None, model_request: bool = False) -> None:
+    """Record the progress of the job running in the current context, if any."""
+    job = _current_job.get()
+    if job is None:
+        return
+    job.phase = phase
+    if tool_call is not None:
+        job.tool_calls += 1
+        job.recent_calls.append(tool_call)
+    if model_request:
+        job.model_requests += 1
+
+
+def fail(error: BaseException) -> None:
+    """Mark the job running in the current context, if any, as failed with `error`."""
+    job = _current_job.get()
+    if job is not None:
+        job.error = f"{type(error).__name__}: {error}"
+
+
+def unknown(job_id: str) -> Dict[str, Any]:
+    return {"job_id": job_id, "status": "unknown", "error": "No such job: the ID is wrong, the job was evicted, or the server restarted since"}
+
+
+class JobStore:
+    """Background jobs of one server: a bounded number running, the latest finished ones kept.
+
+    Args:
+        max_running: Jobs running at a time; later ones wait queued
+        max_pending: Jobs queued or running at most; starting more is refused
+        max_finished: Finished jobs kept for collection, the oldest evicted first
+    """
+
+    def __init__(self, max_running: int = 4, max_pending: int = 100, max_finished: int = 100):
+        self.max_running = max_running
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._jobs: Dict[str, Job] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.started = 0
+        self.evicted = 0
+
+    def start(self, tool: str, arguments: Dict[str, Any], run: Callable[[], Awaitable[str]]) -> Job:
+        """Run `run` as a background job of `tool` and return the job right away.
+
+        Raises `ValueError` when `max_pending` jobs are already queued or running.
+        """
+        if len(self._jobs) - len(self._finished) >= self.max_pending:
+            raise ValueError(f"{self.max_pending} jobs are already queued or running, collect some first")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_running)
+        job = Job(id=uuid.uuid4().hex, tool=tool, arguments=arguments)
+        self._jobs[job.id] = job
+        self.started += 1
+        job.task = asyncio.create_task(self._run(job, run))
+        return job
+
+    async def submit(self, mcp: FastMCP, tool: str, arguments: Dict[str, Any], allowed: Sequence[str]) -> Job:
+        """Start a job running the registered tool `tool` of `mcp` with `arguments`.
+
+        Raises `ValueError` for tools not in `allowed` and for arguments the tool does not take.
+        """
+        if tool not in allowed:
+            raise ValueError(f"{tool!r} does not run as a job, expected one of {', '.join(allowed)}")
+        try:
+            registered = await mcp.get_tool(tool)
+        except NotFoundError as e:
+            raise ValueError(str(e))
+        # Check the names now; the values are validated when the tool runs
+        properties = registered.parameters.get("properties", {})
+        unexpected = sorted(set(arguments) - set(properties))
+        missing = sorted(set(registered.parameters.get("required", [])) - set(arguments))
+        if unexpected or missing:
+            raise ValueError(f"{tool} " + "; ".join(filter(None, [
+                f"takes no argument {', '.join(unexpected)}" if unexpected else "",
+                f"requires {', '.join(missing)}" if missing else "",
+            ])))
+        return self.start(tool, arguments, lambda: call_tool(registered, arguments))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def describe(self, job_id: str, wait: float = 0.0) -> Dict[str, Any]:
+        """Snapshot of the job, after waiting up to `wait` seconds (at most `MAX_WAIT`) for it to finish."""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return unknown(job_id)
+        if wait > 0 and job.status not in FINISHED:
+            try:
+                await asyncio.wait_for(job.finished.wait(), timeout=min(wait, MAX_WAIT))
+            except asyncio.TimeoutError:
+                pass
+        return job.snapshot()
+
+    async def _run(self, job: Job, run: Callable[[], Awaitable[str]]) -> None:
+        # Imported here: upstream_scheduler imports latency_metrics, which reports to this module
+        from upstream_scheduler import call_priority
+
+        _current_job.set(job)
+        try:
+            async with self._slots:
+                job.status = job.phase = "running"
+                job.started_at = time.time()
+                with call_priority("batch"):
+                    job.result = await run()
+                job.status = "failed" if job.error else "done"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            job.status = "failed"
+            job.error = f"{type(e).__name__}: {e}"
+        finally:
+            job.phase = job.status
+            job.finished_at = time.time()
+            job.finished.set()
+            job.task = None
+            self._finished[job.id] = None
+            while len(self._finished) > self.max_finished:
+                evicted, _ = self._finished.popitem(last=False)
+                del self._jobs[evicted]
+                self.evicted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Jobs per status, evictions and limits."""
+        statuses: Dict[str, int] = {}
+        for job in self._jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "jobs": statuses,
+            "started": self.started,
+            "evicted": self.evicted,
+            "max_running": self.max_running,
+            "max_pending": self.max_pending,
+            "max_finished": self.max_finished,
+        }
+
+
+async def call_tool(tool: Any, arguments: Dict[str, Any]) -> str:
+    """Run a registered FastMCP tool outside of a client request and return its text."""
+    arguments = dict(arguments)
+    # The request that started the job has returned, there is no client context to stream to
+    context = find_kwarg_by_type(tool.fn, kwarg_type=Context) if hasattr(tool, "fn") else None
+    if context:
+        arguments[context] = None
+    result = await tool.run(arguments)
+    return "\n".join(block.text for block in result.content if hasattr(block, "text"))
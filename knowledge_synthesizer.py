@@ -6,26 +6,46 @@
 #     "pydantic>=2.0.0",
 #     "python-dotenv>=1.0.0",
 #     "logfire>=0.1.0",
+#     "numpy>=1.24",
+#     "scipy>=1.10",
+#     "fastembed>=0.3",
 # ]
 # ///
 
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 from pydantic_ai import Agent
-from pydantic_ai.mcp import MCPServerStdio
+from pydantic_ai.toolsets import CombinedToolset
 from pydantic import BaseModel
 import os
 from dotenv import load_dotenv
-import logfire
+import json
 import asyncio
-from typing import List, Dict, Optional
+import time
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from citation_graph import citation_context, citation_graph
+from concept_graph import analyze_concepts
+from deadlines import HedgedModel, within_deadline
+from embedding_index import paper_embeddings, semantic_answers
+from evidence import EvidenceBundle, gather_evidence
+from execution_profiles import PROFILES, Depth, ExecutionProfile, ToolCallBudget
+from jobs import JobStore, fail
+from latency_metrics import TimedModel, latency
+from local_tools import local_papers
+from mcp_pool import CACHE_DIR, pool
+from paper_store import paper_store
+from report_rendering import INLINE, PAIRS, SCORES, TEXT, Block, ReportFormat, ReportSpec, Section
+from report_streaming import SectionStreamer
+from startup import DeferredStartup, deferred, telemetry
+from tool_cache import HOUR, ToolResultMemo, semantic_scholar_cache
+from trend_signals import TrendSignals, trend_signals
+from trend_watch import TrendState, newer_than, signal_changes, trend_watch
+from upstream_scheduler import fetch_scheduler, semantic_scholar_scheduler
 
 # Load environment variables
 load_dotenv()
 
-mcp = FastMCP("knowledge-synthesizer")
-
-logfire.configure()
-logfire.instrument_pydantic_ai()
+mcp = FastMCP("knowledge-synthesizer", lifespan=pool.lifespan)
 
 class KnowledgeSynthesis(BaseModel):
     """Structured output for cross-domain knowledge synthesis"""
@@ -53,6 +73,17 @@ class InsightMap(BaseModel):
     network_properties: Dict[str, float]
     recommended_explorations: List[str]
 
+class InsightNarrative(BaseModel):
+    """The part of an InsightMap written by the mapping agent; the strengths and network properties are computed (see concept_graph.py)"""
+    map_summary: str
+    relationship_types: List[str]
+    knowledge_clusters: List[str]
+    bridging_concepts: List[str]
+    visualization_elements: List[str]
+    interaction_patterns: List[str]
+    hierarchical_structures: List[str]
+    recommended_explorations: List[str]
+
 class StrategicBrief(BaseModel):
     """Structured output for strategic intelligence briefing"""
     executive_summary: str
@@ -79,18 +110,40 @@ class TrendAnalysis(BaseModel):
     prediction_confidence: Dict[str, float]
     monitoring_recommendations: List[str]
 
-# Connect to MCP servers
-semantic_scholar = MCPServerStdio('npx', args=['-y', '@smithery/cli@latest', 'run', '@hamid-vakilzadeh/mcpsemanticscholar', '--key', '4e694cd2-ce2d-4ea7-a742-4990a24854f1'])
-fetch = MCPServerStdio('npx', args=['-y', '@smithery/cli@latest', 'run', '@smithery-ai/fetch', '--key', '4e694cd2-ce2d-4ea7-a742-4990a24854f1'])
-ultra_crawler = MCPServerStdio('uv', args=['run', '/home/jfloyd/mcp/tools/ultra_simple_crawler_mcp.py'])
-notion = MCPServerStdio('npx', args=['-y', '@smithery/cli@latest', 'run', '@smithery-ai/notion', '--key', '4e694cd2-ce2d-4ea7-a742-4990a24854f1'])
+class TrendUpdate(BaseModel):
+    """Revisions to a previous TrendAnalysis from publications since its last run; fields left null are unchanged"""
+    trend_summary: Optional[str] = None
+    emerging_patterns: Optional[List[str]] = None
+    trend_trajectories: Optional[Dict[str, str]] = None
+    disruption_indicators: Optional[List[str]] = None
+    convergence_signals: Optional[List[str]] = None
+    weak_signals: Optional[List[str]] = None
+    scenario_projections: Optional[List[str]] = None
+    influence_factors: Optional[List[str]] = None
+    prediction_confidence: Optional[Dict[str, float]] = None
+    monitoring_recommendations: Optional[List[str]] = None
+
+class KnowledgeDossier(BaseModel):
+    """All four analyses of one topic, built on a single evidence-gathering phase"""
+    evidence: EvidenceBundle
+    synthesis: KnowledgeSynthesis
+    insight_map: InsightMap
+    strategic_brief: StrategicBrief
+    trend_analysis: TrendAnalysis
+    timings: Dict[str, float]
+
+# Connect to MCP servers (shared warm subprocesses, see mcp_pool.py)
+# Notion and the crawler are rarely called, so they only start on first use
+semantic_scholar = pool.server('semantic_scholar', 'npx', args=['-y', '@smithery/cli@latest', 'run', '@hamid-vakilzadeh/mcpsemanticscholar', '--key', '4e694cd2-ce2d-4ea7-a742-4990a24854f1'], coalesce=True, scheduler=semantic_scholar_scheduler, process_tool_call=paper_store.capture(citation_graph.capture(semantic_scholar_cache.process_tool_call)))
+fetch = pool.server('fetch', 'npx', args=['-y', '@smithery/cli@latest', 'run', '@smithery-ai/fetch', '--key', '4e694cd2-ce2d-4ea7-a742-4990a24854f1'], coalesce=True, scheduler=fetch_scheduler)
+ultra_crawler = pool.server('ultra_crawler', 'uv', args=['run', '/home/jfloyd/mcp/tools/ultra_simple_crawler_mcp.py'], lazy=True, coalesce=True)
+notion = pool.server('notion', 'npx', args=['-y', '@smithery/cli@latest', 'run', '@smithery-ai/notion', '--key', '4e694cd2-ce2d-4ea7-a742-4990a24854f1'], lazy=True)
+pooled_servers = {server.pool_name: server for server in (semantic_scholar, fetch, ultra_crawler, notion)}
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
-# Knowledge synthesis agent
-synthesis_agent = Agent(
-    "gemini-2.5-flash",
-    system_prompt="""You are an expert knowledge synthesizer specializing in cross-domain intelligence and strategic insight generation.
+# Knowledge synthesis agent instructions
+synthesis_prompt = """You are an expert knowledge synthesizer specializing in cross-domain intelligence and strategic insight generation.
 
 Your expertise covers:
 - Cross-domain knowledge synthesis and pattern recognition
@@ -118,16 +171,10 @@ Provide comprehensive analysis that demonstrates:
 - Actionable recommendations and next steps
 - Confidence assessments for key insights
 
-Focus on generating novel insights that emerge from the intersection of different knowledge domains.""",
-    mcp_servers=[semantic_scholar, fetch, ultra_crawler, notion],
-    output_type=KnowledgeSynthesis,
-    instrument=True
-)
+Focus on generating novel insights that emerge from the intersection of different knowledge domains."""
 
-# Insight mapping agent
-mapping_agent = Agent(
-    "gemini-2.5-flash",
-    system_prompt="""You are an expert knowledge mapper specializing in visualizing complex relationships and knowledge structures.
+# Insight mapping agent instructions
+mapping_prompt = """You are an expert knowledge mapper specializing in visualizing complex relationships and knowledge structures.
 
 Your expertise covers:
 - Knowledge graph construction and analysis
@@ -141,21 +188,17 @@ Your expertise covers:
 MAPPING METHODOLOGY:
 1. Analyze topics and identify key concepts
 2. Map relationships between concepts and domains
-3. Identify connection strengths and types
+3. Identify connection types and interpret the computed connection strengths
 4. Create hierarchical and network structures
 5. Design visualization strategies
 6. Recommend exploration pathways
 
-Focus on creating clear, actionable knowledge maps that reveal hidden connections and guide strategic exploration.""",
-    mcp_servers=[semantic_scholar, fetch, ultra_crawler, notion],
-    output_type=InsightMap,
-    instrument=True
-)
+When the citation structure of the evidence is provided, ground relationship types, clusters and bridging concepts in it.
 
-# Strategic briefing agent
-briefing_agent = Agent(
-    "gemini-2.5-flash",
-    system_prompt="""You are an expert strategic intelligence analyst specializing in executive briefings and decision support.
+Focus on creating clear, actionable knowledge maps that reveal hidden connections and guide strategic exploration."""
+
+# Strategic briefing agent instructions
+briefing_prompt = """You are an expert strategic intelligence analyst specializing in executive briefings and decision support.
 
 Your expertise covers:
 - Strategic analysis and competitive intelligence
@@ -174,16 +217,10 @@ BRIEFING METHODOLOGY:
 5. Create implementation roadmaps
 6. Define success metrics and KPIs
 
-Focus on providing clear, actionable strategic intelligence that supports executive decision-making.""",
-    mcp_servers=[semantic_scholar, fetch, ultra_crawler, notion],
-    output_type=StrategicBrief,
-    instrument=True
-)
+Focus on providing clear, actionable strategic intelligence that supports executive decision-making."""
 
-# Trend analysis agent
-trend_agent = Agent(
-    "gemini-2.5-flash",
-    system_prompt="""You are an expert trend analyst specializing in emerging pattern recognition and future scenario development.
+# Trend analysis agent instructions
+trend_prompt = """You are an expert trend analyst specializing in emerging pattern recognition and future scenario development.
 
 Your expertise covers:
 - Trend analysis and pattern recognition
@@ -202,14 +239,272 @@ ANALYSIS METHODOLOGY:
 5. Develop scenario projections
 6. Provide monitoring recommendations
 
-Focus on identifying trends that could significantly impact the specified domain and timeframe.""",
-    mcp_servers=[semantic_scholar, fetch, ultra_crawler, notion],
-    output_type=TrendAnalysis,
-    instrument=True
+When computed publication trends are provided, ground trajectories, weak signals and prediction confidence in their growth, acceleration and burst scores.
+
+Focus on identifying trends that could significantly impact the specified domain and timeframe."""
+
+# Models and agents are built on the first tool call, so initialize and tools/list don't wait for the Gemini client
+@deferred
+def build_agents() -> None:
+    global profile_models, synthesis_agent, mapping_agent, briefing_agent, trend_agent
+
+    # Model tier of each depth (see execution_profiles.py); every agent run takes its model from here
+    # and its tools from the profile (run_analysis), so the agents only carry their prompt and output type
+    profile_models = {name: TimedModel(HedgedModel(profile.model)) for name, profile in PROFILES.items()}
+
+    # Knowledge synthesis agent
+    synthesis_agent = Agent(
+        system_prompt=synthesis_prompt,
+        output_type=KnowledgeSynthesis,
+        instrument=True
+    )
+
+    # Insight mapping agent
+    mapping_agent = Agent(
+        system_prompt=mapping_prompt,
+        output_type=InsightNarrative,
+        instrument=True
+    )
+
+    # Strategic briefing agent
+    briefing_agent = Agent(
+        system_prompt=briefing_prompt,
+        output_type=StrategicBrief,
+        instrument=True
+    )
+
+    # Trend analysis agent
+    trend_agent = Agent(
+        system_prompt=trend_prompt,
+        output_type=TrendAnalysis,
+        instrument=True
+    )
+
+mcp.add_middleware(DeferredStartup(telemetry, build_agents))
+
+# Report layouts, rendered by report_rendering.py
+synthesis_report = ReportSpec(
+    "Cross-Domain Knowledge Synthesis",
+    Section("Research Question", "research_question", TEXT),
+    Section("Domains Analyzed", "domains", INLINE),
+    Section("Synthesis Summary", "synthesis_summary", TEXT),
+    Section("Domain Connections", "domain_connections"),
+    Section("Cross-Domain Insights", "cross_domain_insights"),
+    Section("Convergence Patterns", "convergence_patterns"),
+    Section("Interdisciplinary Opportunities", "interdisciplinary_opportunities"),
+    Section("Knowledge Gaps", "knowledge_gaps"),
+    Section("Methodology", "synthesis_methodology", TEXT),
+    Section("Confidence Scores", "confidence_scores", SCORES),
+    Section("Supporting Evidence", "supporting_evidence"),
+    Section("Citations", "citations"),
+    Block("---\n*Generated by Knowledge Synthesizer*"),
+)
+
+insight_map_report = ReportSpec(
+    "Knowledge Relationship Map",
+    Section("Topics Analyzed", "topics", INLINE),
+    Section("Visualization Type", "visualization_type", TEXT),
+    Section("Map Summary", "map_summary", TEXT),
+    Section("Relationship Types", "relationship_types"),
+    Section("Connection Strengths", "connection_strengths", SCORES),
+    Section("Knowledge Clusters", "knowledge_clusters"),
+    Section("Bridging Concepts", "bridging_concepts"),
+    Section("Visualization Elements", "visualization_elements"),
+    Section("Interaction Patterns", "interaction_patterns"),
+    Section("Hierarchical Structures", "hierarchical_structures"),
+    Section("Network Properties", "network_properties", SCORES),
+    Section("Recommended Explorations", "recommended_explorations"),
+    Block("---\n*Generated by Knowledge Synthesizer*"),
+)
+
+brief_report = ReportSpec(
+    "Strategic Intelligence Brief",
+    Section("Topic", "topic", TEXT),
+    Section("Key Stakeholders", "stakeholders", INLINE),
+    Section("Strategic Objectives", "objectives", INLINE),
+    Section("Executive Summary", "executive_summary", TEXT),
+    Section("Key Findings", "key_findings"),
+    Section("Strategic Implications", "strategic_implications"),
+    Section("Stakeholder Impacts", "stakeholder_impacts", PAIRS),
+    Section("Risk Assessment", "risk_assessments"),
+    Section("Opportunity Analysis", "opportunity_analysis"),
+    Section("Competitive Landscape", "competitive_landscape"),
+    Section("Implementation Roadmap", "implementation_roadmap"),
+    Section("Success Metrics", "success_metrics"),
+    Section("Recommendations", "recommendations"),
+    Block("---\n*Generated by Knowledge Synthesizer*"),
 )
 
+trend_report = ReportSpec(
+    "Emerging Trend Analysis",
+    Section("Domain", "domain", TEXT),
+    Section("Timeframe", "timeframe", TEXT),
+    Section("Sources Analyzed", "sources", INLINE),
+    Section("Trend Summary", "trend_summary", TEXT),
+    Section("Emerging Patterns", "emerging_patterns"),
+    Section("Trend Trajectories", "trend_trajectories", PAIRS),
+    Section("Disruption Indicators", "disruption_indicators"),
+    Section("Convergence Signals", "convergence_signals"),
+    Section("Weak Signals", "weak_signals"),
+    Section("Scenario Projections", "scenario_projections"),
+    Section("Influence Factors", "influence_factors"),
+    Section("Prediction Confidence", "prediction_confidence", SCORES),
+    Section("Monitoring Recommendations", "monitoring_recommendations"),
+    Block("---\n*Generated by Knowledge Synthesizer*"),
+)
+
+# End-to-end time limit of each tool, in seconds, so MCP clients get an answer before they time out
+TOOL_DEADLINES = {
+    "synthesize_knowledge_domains": 180.0,
+    "create_insight_maps": 180.0,
+    "generate_strategic_brief": 180.0,
+    "track_emerging_trends": 180.0,
+    "build_knowledge_dossier": 300.0,
+}
+
+# Results per query of an incremental trend retrieval, as a multiple of the profile's per_query
+INCREMENTAL_OVERFETCH = 3
+
+# Memoized agent outputs for repeated or equivalent requests
+tool_results = ToolResultMemo(
+    ttls={
+        "synthesize_knowledge_domains": 12 * HOUR,
+        "create_insight_maps": 12 * HOUR,
+        "generate_strategic_brief": 6 * HOUR,
+        "track_emerging_trends": 6 * HOUR,
+        "build_knowledge_dossier": 6 * HOUR,
+    },
+    path=CACHE_DIR / "knowledge_synthesizer_results.sqlite",
+)
+
+EVIDENCE_INSTRUCTIONS = """
+        RESEARCH ALREADY COMPLETED:
+        The evidence below was retrieved for this request. Do not plan further searches: base your analysis on it,
+        cite records by their [E#] labels, and state where the evidence is thin.
+"""
+
+# Only for the research loop: with retrieved evidence the agents run without tools
+RESEARCH_INSTRUCTIONS = """
+        Trace citation structure with citations-local-neighborhood and citations-local-related first: they walk the citations
+        and references already retrieved, locally. Call papers-citations / papers-references only for papers they do not know.
+"""
+
+async def retrieve_evidence(tool_name: str, queries: List[str], profile: ExecutionProfile, force_refresh: bool = False) -> EvidenceBundle:
+    """Retrieval stage of a tool: parallel Semantic Scholar and web searches planned from its arguments, sized by the profile and memoized on its own."""
+    queries = list(dict.fromkeys(queries))[:profile.max_queries]
+    web_queries = queries[:2] if profile.web_search else []
+    year_start = datetime.now().year - 1
+    
+    async def run_retrieval() -> EvidenceBundle:
+        with pool.track_run(f"{tool_name} retrieval"):
+            return await gather_evidence(
+                queries, semantic_scholar, fetch, web_queries=web_queries, year_start=year_start, per_query=profile.per_query,
+                local=None if force_refresh else paper_store, semantic=None if force_refresh else semantic_answers,
+            )
+    
+    return await tool_results.get_or_run(
+        f"{tool_name}.evidence",
+        {"queries": queries, "web_queries": web_queries, "per_query": profile.per_query, "year_start": year_start},
+        EvidenceBundle,
+        run_retrieval,
+        force_refresh=force_refresh,
+        unordered=["queries", "web_queries"],
+        # A search that failed upstream (rate limit, timeout) is retried on the next call instead of pinning partial evidence
+        cacheable=lambda evidence: bool(evidence.records) and not evidence.errors,
+    )
+
+async def map_insights(tool_name: str, prompt: str, seeds: List[str], evidence: EvidenceBundle, sections: SectionStreamer, profile: ExecutionProfile) -> InsightMap:
+    """Mapping analysis: the concept graph and citation structure of the evidence are computed first, and the mapping agent writes the narrative around them."""
+    with latency.measure("analytics", tool=tool_name):
+        records = evidence.records[:profile.evidence_items]
+        graph, citations = await asyncio.gather(
+            asyncio.to_thread(analyze_concepts, records, seeds),
+            asyncio.to_thread(citation_context, records),
+        )
+    narrative = await run_analysis(mapping_agent, tool_name, "\n".join(filter(None, [prompt, graph.to_prompt(), citations])), evidence, sections, profile)
+    return InsightMap(**narrative.model_dump(), connection_strengths=graph.strengths, network_properties=graph.properties)
+
+async def analyze_trends(tool_name: str, prompt: str, domain: str, evidence: EvidenceBundle, sections: SectionStreamer, profile: ExecutionProfile) -> Tuple[TrendAnalysis, TrendSignals]:
+    """Trend analysis: publication time series of the stored papers on the domain are scored first and given to the trend agent as evidence.
+    
+    Returns the analysis and the signals it was based on; `track_emerging_trends` saves both as the domain's state (see trend_watch.py).
+    """
+    with latency.measure("analytics", tool=tool_name):
+        signals = await asyncio.to_thread(trend_signals, paper_store, domain)
+    analysis = await run_analysis(trend_agent, tool_name, f"{prompt}\n{signals.to_prompt()}", evidence, sections, profile)
+    return analysis, signals
+
+async def update_trends(domain: str, timeframe: str, sources: List[str], state: TrendState, sections: SectionStreamer, profile: ExecutionProfile) -> TrendAnalysis:
+    """Incremental trend analysis: only publications after the domain's watermark are retrieved, and the model revises the previous analysis.
+    
+    When there are no new publications and no trend signal moved, the previous analysis is returned without a model call.
+    """
+    trend_watch.incremental_runs += 1
+    queries = list(dict.fromkeys([domain, f"emerging {domain}", f"{domain} breakthrough"] + [f"{domain} {source}" for source in sources]))[:profile.max_queries]
+    with pool.track_run("track_emerging_trends retrieval"):
+        # Papers published since the watermark have hardly been cited yet: sorted by citation count they lose
+        # to older papers of the same year, so search by relevance and take more results per query
+        evidence = await gather_evidence(
+            queries, semantic_scholar, fetch, web_queries=queries[:2] if profile.web_search else [],
+            year_start=int(state.watermark[:4]) if state.watermark else None, per_query=profile.per_query * INCREMENTAL_OVERFETCH,
+            sort_by="relevance",
+        )
+    new = EvidenceBundle(queries=evidence.queries, records=newer_than(evidence.records, state.watermark), errors=evidence.errors, timings=evidence.timings)
+    with latency.measure("analytics", tool="track_emerging_trends"):
+        signals = await asyncio.to_thread(trend_signals, paper_store, domain)
+    changes = signal_changes(state.signals, signals)
+    previous = TrendAnalysis.model_validate(state.analysis)
+    
+    if not new.records and not changes:
+        trend_watch.model_calls_skipped += 1
+        trend_watch.record(domain, signals, previous, timeframe, sources)
+        return previous
+    
+    prompt = f"""
+        EMERGING TREND UPDATE REQUEST
+        
+        Domain: {domain}
+        Timeframe: {timeframe}
+        Source Types: {', '.join(sources)}
+        
+        The analysis below was written when the latest known publication was from {state.watermark or 'an unknown date'}.
+        Revise it for the publications since then and the trend signal changes. Return only the fields that change;
+        leave every field the new evidence does not affect null. A field you return replaces the previous one entirely:
+        give the complete revised list or mapping, including the unchanged entries you keep, not just the additions.
+        
+        PREVIOUS ANALYSIS:
+        {previous.model_dump_json()}
+        
+        TREND SIGNAL CHANGES SINCE THE PREVIOUS ANALYSIS:
+        {chr(10).join(changes) or 'none'}
+        """
+    with pool.track_run("track_emerging_trends"), trend_agent.override(toolsets=[]):
+        update = await sections.run(
+            trend_agent,
+            f"{prompt}\n{signals.to_prompt()}\n\n{new.to_prompt(max_records=profile.evidence_items) if new.records else 'NO NEW PUBLICATIONS.'}",
+            output_type=TrendUpdate, model=profile_models[profile.name], usage_limits=profile.usage_limits(),
+        )
+    analysis = TrendAnalysis(**{**previous.model_dump(), **update.model_dump(exclude_none=True)})
+    trend_watch.record(domain, signals, analysis, timeframe, sources)
+    return analysis
+
+async def run_analysis(agent: Agent, tool_name: str, prompt: str, evidence: EvidenceBundle, sections: SectionStreamer, profile: ExecutionProfile):
+    """Single model call over the retrieved evidence; falls back to the agent's own research loop if retrieval found nothing.
+    
+    The profile picks the model tier, usage limits, evidence count and, for the research loop, the servers and tool call budget.
+    """
+    run_options = {"model": profile_models[profile.name], "usage_limits": profile.usage_limits()}
+    with pool.track_run(tool_name):
+        if evidence.records:
+            with agent.override(toolsets=[]):
+                return await sections.run(agent, f"{prompt}\n{EVIDENCE_INSTRUCTIONS}\n{evidence.to_prompt(max_records=profile.evidence_items)}", **run_options)
+        servers = ToolCallBudget(CombinedToolset([local_papers, *(pooled_servers[name] for name in profile.servers)]), profile.tool_calls_limit)
+        with agent.override(toolsets=[servers]):
+            async with agent.run_mcp_servers():
+                return await sections.run(agent, f"{prompt}\n{RESEARCH_INSTRUCTIONS}", **run_options)
+
 @mcp.tool
-async def synthesize_knowledge_domains(domains: List[str], research_question: str, depth: str = "comprehensive") -> str:
+async def synthesize_knowledge_domains(domains: List[str], research_question: str, depth: Depth = "comprehensive", force_refresh: bool = False, stream_sections: bool = False, output_format: ReportFormat = "markdown", ctx: Optional[Context] = None) -> str:
     """
     Synthesize knowledge across multiple domains to generate cross-domain insights and novel connections.
     
@@ -223,7 +518,10 @@ async def synthesize_knowledge_domains(domains: List[str], research_question: st
     Args:
         domains: List of knowledge domains to synthesize (e.g., ["AI", "healthcare", "ethics"])
         research_question: Specific question or challenge to explore across domains
-        depth: Analysis depth - "surface", "moderate", or "comprehensive"
+        depth: Execution profile - "surface" (fastest: small model, few searches), "moderate", or "comprehensive" (default: full research)
+        force_refresh: Re-run the analysis even if an equivalent request was answered recently
+        stream_sections: Send each report section to the client as a log/progress notification as soon as it is written
+        output_format: Report format: "markdown" (default), "json" or "compact" (one plain line per section)
     
     Returns:
         Structured knowledge synthesis with cross-domain insights, connections, and recommendations
@@ -266,61 +564,41 @@ async def synthesize_knowledge_domains(domains: List[str], research_question: st
         Use your research capabilities to gather comprehensive information and generate novel insights that emerge from the intersection of these domains.
         """
         
-        async with synthesis_agent.run_mcp_servers():
-            result = await synthesis_agent.run(synthesis_prompt)
-        
-        synthesis_data = result.output
+        sections = SectionStreamer(ctx if stream_sections else None)
+
+        async def run_synthesis() -> KnowledgeSynthesis:
+            evidence = await retrieve_evidence(
+                "synthesize_knowledge_domains",
+                [research_question] + [f"{domain} {research_question}" for domain in domains],
+                PROFILES[depth],
+                force_refresh=force_refresh,
+            )
+            return await run_analysis(synthesis_agent, "synthesize_knowledge_domains", synthesis_prompt, evidence, sections, PROFILES[depth])
+
+        synthesis_data = await within_deadline(
+            tool_results.get_or_run(
+                "synthesize_knowledge_domains",
+                {"domains": domains, "research_question": research_question, "depth": depth},
+                KnowledgeSynthesis,
+                run_synthesis,
+                force_refresh=force_refresh,
+                unordered=["domains"],
+            ),
+            seconds=TOOL_DEADLINES["synthesize_knowledge_domains"],
+            what="synthesize_knowledge_domains",
+        )
+        await sections.finish(synthesis_data)
         
         # Create structured output
-        output = f"""# Cross-Domain Knowledge Synthesis
-
-## Research Question
-{research_question}
-
-## Domains Analyzed
-{', '.join(domains)}
-
-## Synthesis Summary
-{synthesis_data.synthesis_summary}
-
-## Domain Connections
-{chr(10).join(f"- {connection}" for connection in synthesis_data.domain_connections)}
-
-## Cross-Domain Insights
-{chr(10).join(f"- {insight}" for insight in synthesis_data.cross_domain_insights)}
-
-## Convergence Patterns
-{chr(10).join(f"- {pattern}" for pattern in synthesis_data.convergence_patterns)}
-
-## Interdisciplinary Opportunities
-{chr(10).join(f"- {opportunity}" for opportunity in synthesis_data.interdisciplinary_opportunities)}
-
-## Knowledge Gaps
-{chr(10).join(f"- {gap}" for gap in synthesis_data.knowledge_gaps)}
-
-## Methodology
-{synthesis_data.synthesis_methodology}
-
-## Confidence Scores
-{chr(10).join(f"- {key}: {value:.2f}" for key, value in synthesis_data.confidence_scores.items())}
-
-## Supporting Evidence
-{chr(10).join(f"- {evidence}" for evidence in synthesis_data.supporting_evidence)}
-
-## Citations
-{chr(10).join(f"- {citation}" for citation in synthesis_data.citations)}
-
----
-*Generated by Knowledge Synthesizer*
-"""
-        
-        return output
+        with latency.measure("render", tool="synthesize_knowledge_domains"):
+            return synthesis_report.render(synthesis_data, {"research_question": research_question, "domains": domains}, output_format)
         
     except Exception as e:
+        fail(e)
         return f"Knowledge synthesis failed: {str(e)}"
 
 @mcp.tool
-async def create_insight_maps(topics: List[str], connections: List[str], visualization_type: str = "network") -> str:
+async def create_insight_maps(topics: List[str], connections: List[str], visualization_type: str = "network", depth: Depth = "comprehensive", force_refresh: bool = False, stream_sections: bool = False, output_format: ReportFormat = "markdown", ctx: Optional[Context] = None) -> str:
     """
     Create comprehensive knowledge relationship maps showing connections between topics and concepts.
     
@@ -335,6 +613,10 @@ async def create_insight_maps(topics: List[str], connections: List[str], visuali
         topics: List of topics/concepts to map (e.g., ["machine learning", "ethics", "governance"])
         connections: List of known or suspected connections to explore
         visualization_type: Type of visualization - "network", "hierarchy", "cluster", or "flow"
+        depth: Execution profile - "surface" (fastest: small model, few searches), "moderate", or "comprehensive" (default: full research)
+        force_refresh: Re-run the analysis even if an equivalent request was answered recently
+        stream_sections: Send each report section to the client as a log/progress notification as soon as it is written
+        output_format: Report format: "markdown" (default), "json" or "compact" (one plain line per section)
     
     Returns:
         Comprehensive insight map with relationship analysis and visualization recommendations
@@ -359,14 +641,14 @@ async def create_insight_maps(topics: List[str], connections: List[str], visuali
         2. CONNECTION MAPPING:
         - Explore the specified connections: {', '.join(connections)}
         - Identify additional relationship types
-        - Assess connection strengths and directions
+        - Interpret the computed connection strengths and directions
         - Map direct and indirect relationships
         
         3. STRUCTURAL ANALYSIS:
         - Create hierarchical topic organization
         - Identify knowledge clusters and communities
         - Find bridging concepts and central nodes
-        - Analyze network properties and patterns
+        - Interpret the computed network properties and patterns
         
         4. VISUALIZATION DESIGN:
         - Design {visualization_type} visualization strategy
@@ -377,61 +659,42 @@ async def create_insight_maps(topics: List[str], connections: List[str], visuali
         Use your research capabilities to gather comprehensive information about these topics and their relationships.
         """
         
-        async with mapping_agent.run_mcp_servers():
-            result = await mapping_agent.run(mapping_prompt)
-        
-        mapping_data = result.output
+        sections = SectionStreamer(ctx if stream_sections else None)
+
+        async def run_mapping() -> InsightMap:
+            evidence = await retrieve_evidence(
+                "create_insight_maps",
+                topics + connections + [f"{a} {b}" for i, a in enumerate(topics) for b in topics[i + 1:]],
+                PROFILES[depth],
+                force_refresh=force_refresh,
+            )
+            return await map_insights("create_insight_maps", mapping_prompt, topics + connections, evidence, sections, PROFILES[depth])
+
+        mapping_data = await within_deadline(
+            tool_results.get_or_run(
+                "create_insight_maps",
+                {"topics": topics, "connections": connections, "visualization_type": visualization_type, "depth": depth},
+                InsightMap,
+                run_mapping,
+                force_refresh=force_refresh,
+                unordered=["topics", "connections"],
+                casefold=["visualization_type"],
+            ),
+            seconds=TOOL_DEADLINES["create_insight_maps"],
+            what="create_insight_maps",
+        )
+        await sections.finish(mapping_data)
         
         # Create structured output
-        output = f"""# Knowledge Relationship Map
-
-## Topics Analyzed
-{', '.join(topics)}
-
-## Visualization Type
-{visualization_type}
-
-## Map Summary
-{mapping_data.map_summary}
-
-## Relationship Types
-{chr(10).join(f"- {relationship}" for relationship in mapping_data.relationship_types)}
-
-## Connection Strengths
-{chr(10).join(f"- {key}: {value:.2f}" for key, value in mapping_data.connection_strengths.items())}
-
-## Knowledge Clusters
-{chr(10).join(f"- {cluster}" for cluster in mapping_data.knowledge_clusters)}
-
-## Bridging Concepts
-{chr(10).join(f"- {concept}" for concept in mapping_data.bridging_concepts)}
-
-## Visualization Elements
-{chr(10).join(f"- {element}" for element in mapping_data.visualization_elements)}
-
-## Interaction Patterns
-{chr(10).join(f"- {pattern}" for pattern in mapping_data.interaction_patterns)}
-
-## Hierarchical Structures
-{chr(10).join(f"- {structure}" for structure in mapping_data.hierarchical_structures)}
-
-## Network Properties
-{chr(10).join(f"- {key}: {value:.2f}" for key, value in mapping_data.network_properties.items())}
-
-## Recommended Explorations
-{chr(10).join(f"- {exploration}" for exploration in mapping_data.recommended_explorations)}
-
----
-*Generated by Knowledge Synthesizer*
-"""
-        
-        return output
+        with latency.measure("render", tool="create_insight_maps"):
+            return insight_map_report.render(mapping_data, {"topics": topics, "visualization_type": visualization_type}, output_format)
         
     except Exception as e:
+        fail(e)
         return f"Insight mapping failed: {str(e)}"
 
 @mcp.tool
-async def generate_strategic_brief(topic: str, stakeholders: List[str], objectives: List[str]) -> str:
+async def generate_strategic_brief(topic: str, stakeholders: List[str], objectives: List[str], depth: Depth = "comprehensive", force_refresh: bool = False, stream_sections: bool = False, output_format: ReportFormat = "markdown", ctx: Optional[Context] = None) -> str:
     """
     Generate comprehensive strategic intelligence briefings for executive decision-making.
     
@@ -446,6 +709,10 @@ async def generate_strategic_brief(topic: str, stakeholders: List[str], objectiv
         topic: Strategic topic or challenge to analyze
         stakeholders: List of key stakeholders to consider
         objectives: List of strategic objectives to address
+        depth: Execution profile - "surface" (fastest: small model, few searches), "moderate", or "comprehensive" (default: full research)
+        force_refresh: Re-run the analysis even if an equivalent request was answered recently
+        stream_sections: Send each report section to the client as a log/progress notification as soon as it is written
+        output_format: Report format: "markdown" (default), "json" or "compact" (one plain line per section)
     
     Returns:
         Executive-level strategic brief with analysis, recommendations, and implementation guidance
@@ -494,64 +761,42 @@ async def generate_strategic_brief(topic: str, stakeholders: List[str], objectiv
         Use your research capabilities to gather comprehensive strategic intelligence and provide executive-level insights.
         """
         
-        async with briefing_agent.run_mcp_servers():
-            result = await briefing_agent.run(briefing_prompt)
-        
-        briefing_data = result.output
+        sections = SectionStreamer(ctx if stream_sections else None)
+
+        async def run_briefing() -> StrategicBrief:
+            evidence = await retrieve_evidence(
+                "generate_strategic_brief",
+                [topic] + [f"{topic} {stakeholder}" for stakeholder in stakeholders] + [f"{topic} {objective}" for objective in objectives],
+                PROFILES[depth],
+                force_refresh=force_refresh,
+            )
+            return await run_analysis(briefing_agent, "generate_strategic_brief", briefing_prompt, evidence, sections, PROFILES[depth])
+
+        briefing_data = await within_deadline(
+            tool_results.get_or_run(
+                "generate_strategic_brief",
+                {"topic": topic, "stakeholders": stakeholders, "objectives": objectives, "depth": depth},
+                StrategicBrief,
+                run_briefing,
+                force_refresh=force_refresh,
+                unordered=["stakeholders", "objectives"],
+                casefold=["topic"],
+            ),
+            seconds=TOOL_DEADLINES["generate_strategic_brief"],
+            what="generate_strategic_brief",
+        )
+        await sections.finish(briefing_data)
         
         # Create structured output
-        output = f"""# Strategic Intelligence Brief
-
-## Topic
-{topic}
-
-## Key Stakeholders
-{', '.join(stakeholders)}
-
-## Strategic Objectives
-{', '.join(objectives)}
-
-## Executive Summary
-{briefing_data.executive_summary}
-
-## Key Findings
-{chr(10).join(f"- {finding}" for finding in briefing_data.key_findings)}
-
-## Strategic Implications
-{chr(10).join(f"- {implication}" for implication in briefing_data.strategic_implications)}
-
-## Stakeholder Impacts
-{chr(10).join(f"- **{stakeholder}**: {impact}" for stakeholder, impact in briefing_data.stakeholder_impacts.items())}
-
-## Risk Assessment
-{chr(10).join(f"- {risk}" for risk in briefing_data.risk_assessments)}
-
-## Opportunity Analysis
-{chr(10).join(f"- {opportunity}" for opportunity in briefing_data.opportunity_analysis)}
-
-## Competitive Landscape
-{chr(10).join(f"- {insight}" for insight in briefing_data.competitive_landscape)}
-
-## Implementation Roadmap
-{chr(10).join(f"- {step}" for step in briefing_data.implementation_roadmap)}
-
-## Success Metrics
-{chr(10).join(f"- {metric}" for metric in briefing_data.success_metrics)}
-
-## Recommendations
-{chr(10).join(f"- {recommendation}" for recommendation in briefing_data.recommendations)}
-
----
-*Generated by Knowledge Synthesizer*
-"""
-        
-        return output
+        with latency.measure("render", tool="generate_strategic_brief"):
+            return brief_report.render(briefing_data, {"topic": topic, "stakeholders": stakeholders, "objectives": objectives}, output_format)
         
     except Exception as e:
+        fail(e)
         return f"Strategic briefing failed: {str(e)}"
 
 @mcp.tool
-async def track_emerging_trends(domain: str, timeframe: str, sources: List[str]) -> str:
+async def track_emerging_trends(domain: str, timeframe: str, sources: List[str], depth: Depth = "comprehensive", incremental: bool = False, force_refresh: bool = False, stream_sections: bool = False, output_format: ReportFormat = "markdown", ctx: Optional[Context] = None) -> str:
     """
     Analyze emerging trends and predict future developments in specified domains.
     
@@ -566,6 +811,11 @@ async def track_emerging_trends(domain: str, timeframe: str, sources: List[str])
         domain: Domain to analyze for emerging trends (e.g., "artificial intelligence", "healthcare")
         timeframe: Analysis timeframe ("short-term", "medium-term", "long-term")
         sources: List of source types to analyze (e.g., ["academic", "industry", "patents", "startups"])
+        depth: Execution profile - "surface" (fastest: small model, few searches), "moderate", or "comprehensive" (default: full research)
+        incremental: Update the domain's previous analysis with only the publications since its last run (a full run when there is none); for recurring watchlists
+        force_refresh: Re-run the analysis even if an equivalent request was answered recently, from scratch even if incremental
+        stream_sections: Send each report section to the client as a log/progress notification as soon as it is written
+        output_format: Report format: "markdown" (default), "json" or "compact" (one plain line per section)
     
     Returns:
         Comprehensive trend analysis with predictions, scenarios, and monitoring recommendations
@@ -614,61 +864,156 @@ async def track_emerging_trends(domain: str, timeframe: str, sources: List[str])
         Use your research capabilities to gather comprehensive trend intelligence from multiple sources.
         """
         
-        async with trend_agent.run_mcp_servers():
-            result = await trend_agent.run(trend_prompt)
-        
-        trend_data = result.output
+        sections = SectionStreamer(ctx if stream_sections else None)
+
+        async def run_trend_analysis() -> TrendAnalysis:
+            state = trend_watch.get(domain) if incremental and not force_refresh else None
+            if state is not None and state.analysis:
+                return await update_trends(domain, timeframe, sources, state, sections, PROFILES[depth])
+            evidence = await retrieve_evidence(
+                "track_emerging_trends",
+                [domain, f"emerging {domain}", f"{domain} breakthrough"] + [f"{domain} {source}" for source in sources],
+                PROFILES[depth],
+                force_refresh=force_refresh,
+            )
+            analysis, signals = await analyze_trends("track_emerging_trends", trend_prompt, domain, evidence, sections, PROFILES[depth])
+            trend_watch.record(domain, signals, analysis, timeframe, sources)
+            return analysis
+
+        trend_data = await within_deadline(
+            tool_results.get_or_run(
+                "track_emerging_trends",
+                {"domain": domain, "timeframe": timeframe, "sources": sources, "depth": depth, "incremental": incremental},
+                TrendAnalysis,
+                run_trend_analysis,
+                force_refresh=force_refresh,
+                unordered=["sources"],
+                casefold=["domain", "timeframe"],
+            ),
+            seconds=TOOL_DEADLINES["track_emerging_trends"],
+            what="track_emerging_trends",
+        )
+        await sections.finish(trend_data)
         
         # Create structured output
-        output = f"""# Emerging Trend Analysis
-
-## Domain
-{domain}
-
-## Timeframe
-{timeframe}
-
-## Sources Analyzed
-{', '.join(sources)}
-
-## Trend Summary
-{trend_data.trend_summary}
-
-## Emerging Patterns
-{chr(10).join(f"- {pattern}" for pattern in trend_data.emerging_patterns)}
-
-## Trend Trajectories
-{chr(10).join(f"- **{trend}**: {trajectory}" for trend, trajectory in trend_data.trend_trajectories.items())}
-
-## Disruption Indicators
-{chr(10).join(f"- {indicator}" for indicator in trend_data.disruption_indicators)}
-
-## Convergence Signals
-{chr(10).join(f"- {signal}" for signal in trend_data.convergence_signals)}
-
-## Weak Signals
-{chr(10).join(f"- {signal}" for signal in trend_data.weak_signals)}
+        with latency.measure("render", tool="track_emerging_trends"):
+            return trend_report.render(trend_data, {"domain": domain, "timeframe": timeframe, "sources": sources}, output_format)
+        
+    except Exception as e:
+        fail(e)
+        return f"Trend analysis failed: {str(e)}"
 
-## Scenario Projections
-{chr(10).join(f"- {scenario}" for scenario in trend_data.scenario_projections)}
+@mcp.tool
+async def build_knowledge_dossier(topic: str, domains: List[str], stakeholders: List[str], objectives: List[str], timeframe: str = "medium-term", force_refresh: bool = False) -> str:
+    """
+    Build a complete knowledge dossier on a topic in one call: synthesis, insight map, strategic brief and trend analysis.
+    
+    This tool researches the topic once and shares the evidence:
+    - A single retrieval stage searches Semantic Scholar and the web for the topic in parallel
+    - The synthesis, mapping, briefing and trend agents then analyze that evidence concurrently
+    - Wall-clock time is close to the slowest analysis instead of the sum of four research runs
+    
+    Args:
+        topic: Topic or strategic question to build the dossier on
+        domains: Knowledge domains to cover (e.g., ["AI", "healthcare", "ethics"])
+        stakeholders: Key stakeholders to consider in the strategic brief
+        objectives: Strategic objectives to address in the strategic brief
+        timeframe: Trend analysis timeframe ("short-term", "medium-term", "long-term")
+        force_refresh: Re-run the analysis even if an equivalent request was answered recently
+    
+    Returns:
+        JSON with the shared evidence and all four structured analyses
+    """
+    
+    try:
+        queries = [topic] + [f"{domain} {topic}" for domain in domains] + [f"{topic} {stakeholder}" for stakeholder in stakeholders] + [f"emerging {topic}"]
+        
+        profile = PROFILES["comprehensive"]
+        
+        async def run_dossier() -> KnowledgeDossier:
+            evidence = await retrieve_evidence("build_knowledge_dossier", queries, profile, force_refresh=force_refresh)
+            analysis_start = time.perf_counter()
+            
+            no_streaming = SectionStreamer(None)
+            synthesis, insight_map, strategic_brief, (trend_analysis, _) = await asyncio.gather(
+                run_analysis(synthesis_agent, "build_knowledge_dossier", f"CROSS-DOMAIN KNOWLEDGE SYNTHESIS REQUEST\n\nResearch Question: {topic}\nTarget Domains: {', '.join(domains)}\nAnalysis Depth: comprehensive", evidence, no_streaming, profile),
+                map_insights("build_knowledge_dossier", f"KNOWLEDGE RELATIONSHIP MAPPING REQUEST\n\nTopics to Map: {', '.join(domains)}\nCentral Topic: {topic}\nVisualization Type: network", [topic, *domains], evidence, no_streaming, profile),
+                run_analysis(briefing_agent, "build_knowledge_dossier", f"STRATEGIC INTELLIGENCE BRIEFING REQUEST\n\nStrategic Topic: {topic}\nKey Stakeholders: {', '.join(stakeholders)}\nStrategic Objectives: {', '.join(objectives)}", evidence, no_streaming, profile),
+                analyze_trends("build_knowledge_dossier", f"EMERGING TREND ANALYSIS REQUEST\n\nDomain: {topic}\nTimeframe: {timeframe}\nSource Types: academic, industry", topic, evidence, no_streaming, profile),
+            )
+            
+            return KnowledgeDossier(
+                evidence=evidence,
+                synthesis=synthesis,
+                insight_map=insight_map,
+                strategic_brief=strategic_brief,
+                trend_analysis=trend_analysis,
+                timings={"retrieval_seconds": evidence.timings.get("retrieval_seconds", 0.0), "analysis_seconds": time.perf_counter() - analysis_start},
+            )
+        
+        dossier = await within_deadline(
+            tool_results.get_or_run(
+                "build_knowledge_dossier",
+                {"topic": topic, "domains": domains, "stakeholders": stakeholders, "objectives": objectives, "timeframe": timeframe},
+                KnowledgeDossier,
+                run_dossier,
+                force_refresh=force_refresh,
+                unordered=["domains", "stakeholders", "objectives"],
+                casefold=["topic", "timeframe"],
+            ),
+            seconds=TOOL_DEADLINES["build_knowledge_dossier"],
+            what="build_knowledge_dossier",
+        )
+        
+        with latency.measure("render", tool="build_knowledge_dossier"):
+            return dossier.model_dump_json(indent=2)
+        
+    except Exception as e:
+        fail(e)
+        return f"Knowledge dossier failed: {str(e)}"
 
-## Influence Factors
-{chr(10).join(f"- {factor}" for factor in trend_data.influence_factors)}
+# Tools that can also run as background jobs, for calls that outlast the client's request timeout
+JOB_TOOLS = ["synthesize_knowledge_domains", "create_insight_maps", "generate_strategic_brief", "track_emerging_trends", "build_knowledge_dossier"]
 
-## Prediction Confidence
-{chr(10).join(f"- {prediction}: {confidence:.2f}" for prediction, confidence in trend_data.prediction_confidence.items())}
+background_jobs = JobStore()
 
-## Monitoring Recommendations
-{chr(10).join(f"- {recommendation}" for recommendation in trend_data.monitoring_recommendations)}
+@mcp.tool
+async def start_job(tool: str, arguments: Optional[dict] = None) -> str:
+    """
+    Start a long-running tool in the background and return its job ID right away.
+    
+    Use this instead of a direct call when the tool may run longer than the
+    client waits for a response. Collect the outcome later with get_job or by
+    reading the jobs://{job_id} resource; many jobs can run at once.
+    
+    Args:
+        tool: Tool to run: synthesize_knowledge_domains, create_insight_maps, generate_strategic_brief, track_emerging_trends or build_knowledge_dossier
+        arguments: The tool's arguments, as for a direct call
+    
+    Returns:
+        JSON with the job ID, its status and the resource it can be read from
+    """
+    
+    try:
+        job = await background_jobs.submit(mcp, tool, arguments or {}, JOB_TOOLS)
+    except ValueError as e:
+        return f"Could not start job: {str(e)}"
+    return json.dumps(job.snapshot(), indent=2)
 
----
-*Generated by Knowledge Synthesizer*
-"""
-        
-        return output
-        
-    except Exception as e:
-        return f"Trend analysis failed: {str(e)}"
+@mcp.tool
+async def get_job(job_id: str, wait_seconds: float = 0.0) -> str:
+    """
+    Status, progress and, once finished, the report of a job started with start_job.
+    
+    Args:
+        job_id: The job ID returned by start_job
+        wait_seconds: Wait up to this long (at most 50 seconds) for the job to finish before answering
+    
+    Returns:
+        JSON with the status (queued, running, done, failed), current phase, tool calls and model requests made so far, and the report once done
+    """
+    
+    return json.dumps(await background_jobs.describe(job_id, wait_seconds), indent=2)
 
 @mcp.resource("synthesis://patterns")
 def get_synthesis_patterns() -> str:
@@ -764,4 +1109,85 @@ def get_visualization_strategies() -> str:
     - Guided exploration paths
     """
 
-mcp.run()
\ No newline at end of file
+@mcp.resource("cache://semantic-scholar")
+def get_semantic_scholar_cache_stats() -> str:
+    """
+    Hit/miss statistics and disk usage of the Semantic Scholar response cache.
+    """
+    
+    return json.dumps(semantic_scholar_cache.stats(), indent=2)
+
+@mcp.resource("cache://paper-store")
+def get_paper_store_stats() -> str:
+    """
+    Papers stored locally from Semantic Scholar responses, and how many local searches they answered.
+    """
+    
+    return json.dumps(paper_store.stats(), indent=2)
+
+@mcp.resource("cache://paper-embeddings")
+def get_paper_embedding_stats() -> str:
+    """
+    Size of the embedding index over the stored papers, and the semantic searches it answered.
+    """
+    
+    return json.dumps(paper_embeddings.stats(), indent=2)
+
+@mcp.resource("cache://citation-graph")
+def get_citation_graph_stats() -> str:
+    """
+    Size of the local citation graph built from citation and reference responses.
+    """
+    
+    return json.dumps(citation_graph.stats(), indent=2)
+
+@mcp.resource("cache://trend-watch")
+def get_trend_watch_stats() -> str:
+    """
+    Domains under incremental trend tracking with their publication watermarks.
+    """
+    
+    return json.dumps(trend_watch.stats(), indent=2)
+
+@mcp.resource("cache://tool-results")
+def get_tool_result_cache_stats() -> str:
+    """
+    Hit/miss statistics of the memoized tool results.
+    """
+    
+    return json.dumps(tool_results.stats(), indent=2)
+
+@mcp.resource("jobs://{job_id}")
+async def get_job_status(job_id: str) -> str:
+    """
+    Status, progress and, once finished, the report of a background job.
+    """
+    
+    return json.dumps(await background_jobs.describe(job_id), indent=2)
+
+@mcp.resource("metrics://jobs")
+def get_job_stats() -> str:
+    """
+    Background jobs per status, jobs evicted from the finished job store, and the store limits.
+    """
+    
+    return json.dumps(background_jobs.stats(), indent=2)
+
+@mcp.resource("metrics://latency")
+def get_latency_metrics() -> str:
+    """
+    Rolling p50/p95/p99 latencies (seconds) of MCP server startup and shutdown, MCP tool calls, model requests, retries and report rendering.
+    """
+    
+    return json.dumps(latency.snapshot(), indent=2)
+
+@mcp.resource("metrics://mcp-pool")
+def get_mcp_pool_stats() -> str:
+    """
+    Per-server MCP pool counters: starts, restarts, uptime, tool calls, identical concurrent calls merged into one request, and upstream scheduler queue depth, wait times and retries.
+    """
+    
+    return json.dumps(pool.stats(), indent=2)
+
+if __name__ == "__main__":
+    mcp.run()
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+In-process latency histograms for the agent MCP servers.
+
+Logfire traces need a backend; these rolling histograms don't. Each phase
+of a tool call records its duration here, keyed by phase name and labels:
+
+- `mcp.enter` / `mcp.exit`: entering and leaving `run_mcp_servers()`, per MCP server
+- `mcp.tool_call`: MCP tool calls sent to a server, per server and tool
+- `mcp.queue_wait`: time a call waited for upstream scheduler admission, per server and priority
+- `model.request`: model requests (plain and streamed), per model
+- `model.retry`: model requests that answer a retry prompt, per model and reason
+  (`output` for output validation failures, `tool` for tool retries)
+- `render`: formatting the final report, per tool
+- `cascade.tier`: one tier of a model cascade, per cascade and tier
+- `model.hedge`: hedged model requests, per model and winner (`primary` or `hedge`)
+
+Every server exposes the percentiles as the `metrics://latency` resource.
+"""
+
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from threading import Lock
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional, Tuple, Union
+
+from pydantic_ai.messages import ModelRequest, RetryPromptPart
+from pydantic_ai.models import KnownModelName, Model
+from pydantic_ai.models.wrapper import WrapperModel
+
+import jobs
+
+OUTPUT_TOOL_PREFIX = "final_result"
+
+
+class RollingHistogram:
+    """The most recent `window` samples of one latency, plus lifetime count and sum."""
+
+    def __init__(self, window: int = 1024):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q: float) -> float:
+        """The `q` quantile of the samples in the window, 0.0 when empty."""
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+
+        def percentile(q: float) -> float:
+            if not ordered:
+                return 0.0
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+        return {
+            "count": self.count,
+            "window": len(ordered),
+            "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": ordered[-1] if ordered else 0.0,
+            "total_seconds": self.total,
+        }
+
+
+class LatencyMetrics:
+    """Rolling histograms keyed by phase and labels."""
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], RollingHistogram] = {}
+        self._lock = Lock()
+
+    def record(self, phase: str, seconds: float, **labels: Any) -> None:
+        key = (phase, tuple(sorted((name, str(value)) for name, value in labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = RollingHistogram(self.window)
+            histogram.record(seconds)
+
+    @contextmanager
+    def measure(self, phase: str, **labels: Any) -> Iterator[None]:
+        """Record the duration of the block, including when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Percentiles in seconds, as `{phase: {"label=value,...": stats}}`."""
+        with self._lock:
+            items = sorted(self._histograms.items())
+        snapshot: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (phase, labels), histogram in items:
+            label = ",".join(f"{name}={value}" for name, value in labels) or "all"
+            snapshot.setdefault(phase, {})[label] = histogram.snapshot()
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+
+latency = LatencyMetrics()
+
+
+class TimedModel(WrapperModel):
+    """Records every request of the wrapped model in `latency`, and reports it to the current job (jobs.py)."""
+
+    def __init__(self, wrapped: Union[Model, KnownModelName], metrics: Optional[LatencyMetrics] = None):
+        super().__init__(wrapped)
+        self.metrics = metrics or latency
+
+    def _record(self, messages: list, seconds: float) -> None:
+        self.metrics.record("model.request", seconds, model=self.model_name)
+        last = messages[-1] if messages else None
+        if isinstance(last, ModelRequest):
+            retries = [part for part in last.parts if isinstance(part, RetryPromptPart)]
+            if retries:
+                output = any(part.tool_name is None or part.tool_name.startswith(OUTPUT_TOOL_PREFIX) for part in retries)
+                self.metrics.record("model.retry", seconds, model=self.model_name, reason="output" if output else "tool")
+
+    async def request(self, messages: list, *args: Any, **kwargs: Any):
+        jobs.report(f"model request {self.model_name}", model_request=True)
+        start = time.perf_counter()
+        try:
+            return await super().request(messages, *args, **kwargs)
+        finally:
+            self._record(messages, time.perf_counter() - start)
+
+    @asynccontextmanager
+    async def request_stream(self, messages: list, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        jobs.report(f"model request {self.model_name}", model_request=True)
+        start = time.perf_counter()
+        try:
+            async with super().request_stream(messages, *args, **kwargs) as response:
+                yield response
+        finally:
+            self._record(messages, time.perf_counter() - start)
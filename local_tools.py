@@ -0,0 +1,48 @@
+"""
+Toolset of the local paper tools, offered to the agents next to Semantic Scholar.
+
+The tools answer from what earlier runs retrieved, on local disk and
+without upstream requests:
+
+- `papers-search-local`: full-text search of the paper store (paper_store.py)
+- `papers-search-semantic`: embedding search of the stored papers (embedding_index.py)
+- `citations-local-neighborhood` / `citations-local-related`: walks of the
+  local citation graph (citation_graph.py)
+
+All of them are registered here, in `local_papers_toolset()`, so every agent
+given `local_papers` gets the full set the prompts refer to:
+
+    agent = Agent(model, toolsets=[sequential_thinking, local_papers, semantic_scholar])
+"""
+
+from typing import Any, Dict
+
+from pydantic_ai.tools import Tool
+from pydantic_ai.toolsets import FunctionToolset
+
+import jobs
+from citation_graph import citations_local_neighborhood, citations_local_related
+from embedding_index import papers_search_semantic
+from paper_store import papers_search_local
+
+
+class LocalToolset(FunctionToolset):
+    """Function tools whose calls count as tool calls of the current job (jobs.py), like MCP tool calls do."""
+
+    async def call_tool(self, name: str, tool_args: Dict[str, Any], ctx: Any, tool: Any) -> Any:
+        jobs.report(f"tool call local/{name}", tool_call=f"local/{name}")
+        return await super().call_tool(name, tool_args, ctx, tool)
+
+
+def local_papers_toolset() -> LocalToolset:
+    """Every local paper search and citation tool, in one toolset."""
+    return LocalToolset([
+        Tool(papers_search_local, name="papers-search-local"),
+        Tool(papers_search_semantic, name="papers-search-semantic"),
+        Tool(citations_local_neighborhood, name="citations-local-neighborhood"),
+        Tool(citations_local_related, name="citations-local-related"),
+    ])
+
+
+# Shared by the agents of every server
+local_papers = local_papers_toolset()
@@ -0,0 +1,482 @@
+"""
+Server-lifetime pool of warm MCP stdio subprocesses shared by the agents.
+
+Each agent script used to cold-start its `MCPServerStdio` processes inside
+`run_mcp_servers()` on every tool call. The pool starts every registered
+server once, keeps the initialized session alive for the lifetime of the
+FastMCP server, pings it periodically and respawns it when it stops
+answering. Agents keep using `run_mcp_servers()`; while the pool is running
+that call is only a readiness check. The lifespan does not wait for the
+eager servers, so `initialize` and `tools/list` are answered while they
+start; the first tool call that needs one waits for it.
+
+Servers registered with `lazy=True` are not spawned up front. Their tool
+schemas are served from a manifest cached on disk the last time the server
+ran, and the process starts when the model first calls one of their tools.
+Wrap an agent run in `pool.track_run(...)` to log how many servers it used
+and how many it had to start.
+
+Servers registered with `coalesce=True` (read-only ones only) merge
+identical concurrent tool calls, from the same model turn or from
+concurrent agent runs, into one outbound request whose outcome all callers
+share. `pool.stats()` counts the calls and how many of them were merged.
+Servers registered with a `scheduler` send their calls through that
+`UpstreamScheduler` (rate limits, concurrency cap, priorities, retries);
+merged calls are scheduled once. Tool calls are cancelled when the calling
+tool's deadline (see deadlines.py) runs out.
+
+Usage:
+
+    pool = MCPServerPool()
+    mcp = FastMCP("my-agent", lifespan=pool.lifespan)
+    semantic_scholar = pool.server("semantic_scholar", "npx", args=[...])
+"""
+
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from functools import partial
+
+import anyio
+import logfire
+from pydantic_ai.exceptions import ModelRetry
+from mcp import types as mcp_types
+from pydantic_ai.mcp import MCPServerStdio
+
+import jobs
+from deadlines import within_deadline
+from latency_metrics import latency
+from upstream_scheduler import UpstreamScheduler
+
+# Errors raised by the MCP client streams when the subprocess has gone away
+CONNECTION_ERRORS = (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream)
+
+# Local state shared by the agent servers (tool manifests, caches)
+CACHE_DIR = Path(os.getenv("KNOWLEDGE_AGENTS_CACHE_DIR", Path.home() / ".cache" / "knowledge-work-agents"))
+
+
+@dataclass
+class RunActivation:
+    """Which pooled servers one agent run touched."""
+    label: str
+    used: Set[str] = field(default_factory=set)
+    started: Set[str] = field(default_factory=set)
+
+
+_current_run: ContextVar[Optional[RunActivation]] = ContextVar("mcp_pool_current_run", default=None)
+
+
+class SingleFlight:
+    """Identical concurrent calls merged into one.
+
+    The first caller of a key performs the call; callers arriving while it is
+    in flight wait for it and share its result or exception. Unless
+    `keep_results` is set, nothing is kept once the call finishes. If the
+    first caller is cancelled, a waiting caller performs the call itself.
+
+    Args:
+        keep_results: Also share the result with callers arriving after the call finished
+        share_errors: Raise a failed call's exception in its waiters; otherwise they retry the call themselves
+    """
+
+    def __init__(self, keep_results: bool = False, share_errors: bool = True):
+        self.keep_results = keep_results
+        self.share_errors = share_errors
+        self.calls = 0
+        self.merged = 0
+        self._in_flight: Dict[str, "asyncio.Future[Any]"] = {}
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        return json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+
+    async def call(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        while key in self._in_flight:
+            future = self._in_flight[key]
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    continue
+                raise
+            except Exception:
+                self.merged += 1
+                raise
+            self.merged += 1
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await call()
+        except Exception as e:
+            del self._in_flight[key]
+            if self.share_errors:
+                future.set_exception(e)
+                # Waiters re-raise it; without any, the future must not warn about a lost exception
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        except BaseException:
+            del self._in_flight[key]
+            future.cancel()
+            raise
+        if not self.keep_results:
+            del self._in_flight[key]
+        future.set_result(result)
+        return result
+
+
+class PooledMCPServer(MCPServerStdio):
+    """`MCPServerStdio` whose subprocess lifecycle is owned by an `MCPServerPool`.
+
+    While the pool is running, entering the server (directly or through
+    `Agent.run_mcp_servers()`) waits for the warm session instead of spawning
+    a new process; a lazy server is only spawned by its first tool call.
+    Outside a running pool it behaves like `MCPServerStdio`. With `coalesce`,
+    identical concurrent tool calls share one outbound request; with a
+    `scheduler`, outbound requests wait for its admission.
+    """
+
+    def __init__(self, pool: "MCPServerPool", pool_name: str, command: str, args: List[str], lazy: bool = False, coalesce: bool = False, scheduler: Optional[UpstreamScheduler] = None, **kwargs: Any):
+        super().__init__(command, args=args, **kwargs)
+        self.pool = pool
+        self.pool_name = pool_name
+        self.lazy = lazy
+        self.coalesce = coalesce
+        self.in_flight = SingleFlight()
+        self.scheduler = scheduler
+        self.tool_calls = 0
+
+    async def __aenter__(self) -> "PooledMCPServer":
+        with latency.measure("mcp.enter", server=self.pool_name):
+            if self.pool.running:
+                if not self.lazy:
+                    await self.pool.ensure_started(self.pool_name)
+                return self
+            return await super().__aenter__()
+
+    async def __aexit__(self, *args: Any) -> Optional[bool]:
+        with latency.measure("mcp.exit", server=self.pool_name):
+            if self.pool.running:
+                return None
+            return await super().__aexit__(*args)
+
+    async def list_tools(self) -> List[mcp_types.Tool]:
+        if self.pool.running and self.lazy and not self.pool.is_ready(self.pool_name):
+            manifest = self.pool.load_manifest(self.pool_name)
+            if manifest is not None:
+                return manifest
+            await self.pool.ensure_started(self.pool_name)
+        return await super().list_tools()
+
+    async def direct_call_tool(self, name: str, args: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> Any:
+        if self.pool.running:
+            run = _current_run.get()
+            if run is not None:
+                run.used.add(self.pool_name)
+            await self.pool.ensure_started(self.pool_name)
+        self.tool_calls += 1
+        jobs.report(f"tool call {self.pool_name}/{name}", tool_call=f"{self.pool_name}/{name}")
+
+        async def call_tool() -> Any:
+            with latency.measure("mcp.tool_call", server=self.pool_name, tool=name):
+                return await super(PooledMCPServer, self).direct_call_tool(name, args, metadata)
+
+        send = call_tool if self.scheduler is None else partial(self.scheduler.run, call_tool)
+        try:
+            # Each caller waits only as long as its own tool deadline allows
+            outbound = self.in_flight.call(SingleFlight.key(name, args, metadata), send) if self.coalesce else send()
+            return await within_deadline(outbound, what=f"{self.pool_name} tool {name}")
+        except CONNECTION_ERRORS as e:
+            if not self.pool.running:
+                raise
+            self.pool.request_restart(self.pool_name, reason=f"{type(e).__name__} during {name}")
+            raise ModelRetry(f"MCP server '{self.pool_name}' was restarted, please retry the call")
+
+    async def call(self, name: str, args: Dict[str, Any]) -> Any:
+        """Call a tool from plain code, through the same `process_tool_call` hook the agents go through."""
+        if self.process_tool_call is not None:
+            return await self.process_tool_call(None, self.direct_call_tool, name, args)
+        return await self.direct_call_tool(name, args)
+
+    async def _start_process(self) -> None:
+        await super().__aenter__()
+
+    async def _stop_process(self) -> None:
+        await super().__aexit__(None, None, None)
+
+
+@dataclass
+class _PoolEntry:
+    """Lifecycle state for one pooled server."""
+    server: PooledMCPServer
+    wanted: asyncio.Event = field(default_factory=asyncio.Event)
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    restart: asyncio.Event = field(default_factory=asyncio.Event)
+    task: Optional["asyncio.Task[None]"] = None
+    error: Optional[BaseException] = None
+    starts: int = 0
+    restarts: int = 0
+    started_at: Optional[float] = None
+    last_startup_seconds: Optional[float] = None
+
+
+class MCPServerPool:
+    """Starts MCP stdio servers once and shares the warm sessions between agents.
+
+    Every server has a supervisor task that owns its subprocess, so the
+    anyio task groups behind the stdio transport are always entered and
+    exited from the same task, including on respawn.
+
+    Args:
+        health_check_interval: Seconds between pings of running servers
+        ping_timeout: Seconds a ping may take before the server is respawned
+        manifest_dir: Where tool manifests of lazy servers are cached
+    """
+
+    def __init__(self, health_check_interval: float = 30.0, ping_timeout: float = 10.0, manifest_dir: Optional[Path] = None):
+        self.health_check_interval = health_check_interval
+        self.ping_timeout = ping_timeout
+        self.manifest_dir = manifest_dir or CACHE_DIR / "mcp_manifests"
+        self._servers: Dict[str, PooledMCPServer] = {}
+        self._entries: Dict[str, _PoolEntry] = {}
+        self._health_task: Optional["asyncio.Task[None]"] = None
+        self._stopping = False
+        self.running = False
+
+    def server(self, name: str, command: str, args: List[str], lazy: bool = False, coalesce: bool = False, scheduler: Optional[UpstreamScheduler] = None, **kwargs: Any) -> PooledMCPServer:
+        """Register a stdio server with the pool, or return the one already registered under `name`.
+
+        A server is eager if any registration of it is eager, and coalesces
+        identical concurrent calls if any registration asks for it; only ask
+        for servers whose tools have no side effects. The first `scheduler`
+        given for a server is kept.
+        """
+        if name not in self._servers:
+            self._servers[name] = PooledMCPServer(self, name, command, args, lazy=lazy, coalesce=coalesce, scheduler=scheduler, **kwargs)
+        else:
+            if not lazy:
+                self._servers[name].lazy = False
+            if coalesce:
+                self._servers[name].coalesce = True
+            if self._servers[name].scheduler is None:
+                self._servers[name].scheduler = scheduler
+        return self._servers[name]
+
+    async def start(self, wait: bool = True) -> None:
+        """Spawn all eager servers and start health checking.
+
+        With `wait=False` the eager servers keep starting in the background;
+        each caller only waits for the servers it uses, in `ensure_started`.
+        """
+        if self.running:
+            return
+        self._stopping = False
+        self._entries = {name: _PoolEntry(server) for name, server in self._servers.items()}
+        for name, entry in self._entries.items():
+            entry.task = asyncio.create_task(self._supervise(name, entry), name=f"mcp-pool:{name}")
+        for entry in self._entries.values():
+            if not entry.server.lazy:
+                entry.wanted.set()
+        self.running = True
+        self._health_task = asyncio.create_task(self._health_check_loop(), name="mcp-pool:health")
+        if wait:
+            await self.warm()
+
+    async def warm(self) -> None:
+        """Wait until every eager server has started or failed to."""
+        eager = [entry for entry in self._entries.values() if not entry.server.lazy]
+        with logfire.span("mcp pool warm start", servers=[entry.server.pool_name for entry in eager]):
+            await asyncio.gather(*(entry.ready.wait() for entry in eager))
+
+    async def stop(self) -> None:
+        """Shut down every pooled subprocess."""
+        if not self.running:
+            return
+        self._stopping = True
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for entry in self._entries.values():
+            entry.restart.set()
+            entry.wanted.set()
+        await asyncio.gather(*(entry.task for entry in self._entries.values() if entry.task), return_exceptions=True)
+        self.running = False
+
+    @asynccontextmanager
+    async def lifespan(self, app: Any = None):
+        """FastMCP lifespan that keeps the pool warm for the server lifetime.
+
+        The eager servers start in the background, so the client's
+        `initialize` is answered without waiting for the subprocesses.
+        """
+        await self.start(wait=False)
+        try:
+            yield {}
+        finally:
+            # The lifespan is usually torn down by cancellation; finish shutting the subprocesses down regardless
+            with anyio.CancelScope(shield=True):
+                await self.stop()
+
+    async def ensure_started(self, name: str) -> None:
+        """Wait until the pooled server `name` has an initialized session.
+
+        Raises:
+            The startup error if the server could not be spawned.
+        """
+        entry = self._entries[name]
+        run = _current_run.get()
+        if entry.error is not None:
+            entry.error = None
+            entry.ready.clear()
+        if not entry.ready.is_set():
+            if run is not None and not entry.wanted.is_set():
+                run.started.add(name)
+            entry.wanted.set()
+            await entry.ready.wait()
+        if entry.error is not None:
+            raise entry.error
+
+    def is_ready(self, name: str) -> bool:
+        """Whether `name` currently has a live session."""
+        entry = self._entries.get(name)
+        return bool(entry and entry.ready.is_set() and entry.error is None)
+
+    @contextmanager
+    def track_run(self, label: str):
+        """Record which pooled servers an agent run used and started, and log it on exit."""
+        run = RunActivation(label)
+        token = _current_run.set(run)
+        jobs.report(label)
+        try:
+            yield run
+        finally:
+            _current_run.reset(token)
+            logfire.info(
+                "{label} used {used_count} mcp servers, started {started_count}",
+                label=label,
+                used_count=len(run.used),
+                started_count=len(run.started),
+                used=sorted(run.used),
+                started=sorted(run.started),
+            )
+
+    def load_manifest(self, name: str) -> Optional[List[mcp_types.Tool]]:
+        """Tool schemas cached the last time `name` ran, if any."""
+        path = self.manifest_dir / f"{name}.json"
+        try:
+            return [mcp_types.Tool.model_validate(tool) for tool in json.loads(path.read_text())]
+        except (OSError, ValueError):
+            return None
+
+    def _save_manifest(self, name: str, tools: List[mcp_types.Tool]) -> None:
+        path = self.manifest_dir / f"{name}.json"
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps([tool.model_dump(mode="json", exclude_none=True) for tool in tools]))
+        except OSError as e:
+            logfire.warn("could not write tool manifest for {name}: {error}", name=name, error=repr(e))
+
+    def request_restart(self, name: str, reason: str = "") -> None:
+        """Ask the supervisor to respawn `name` before its next use."""
+        entry = self._entries.get(name)
+        if entry is None or entry.restart.is_set():
+            return
+        logfire.warn("restarting mcp server {name}: {reason}", name=name, reason=reason)
+        entry.restarts += 1
+        entry.ready.clear()
+        entry.restart.set()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-server lifecycle and tool call counters."""
+        stats = {}
+        for name in self._servers:
+            entry = self._entries.get(name)
+            stats[name] = {
+                "lazy": self._servers[name].lazy,
+                "running": self.is_ready(name),
+                "starts": entry.starts if entry else 0,
+                "restarts": entry.restarts if entry else 0,
+                "uptime_seconds": time.monotonic() - entry.started_at if entry and entry.started_at else 0.0,
+                "last_startup_seconds": entry.last_startup_seconds if entry else None,
+                "last_error": repr(entry.error) if entry and entry.error else None,
+                "coalesce": self._servers[name].coalesce,
+                "tool_calls": self._servers[name].tool_calls,
+                "merged_calls": self._servers[name].in_flight.merged,
+                "scheduler": self._servers[name].scheduler.stats() if self._servers[name].scheduler else None,
+            }
+        return stats
+
+    async def _supervise(self, name: str, entry: _PoolEntry) -> None:
+        try:
+            await self._supervise_loop(name, entry)
+        finally:
+            if entry.started_at is not None:
+                # Cancelled while the server was up: close it from this task, which owns its task groups
+                entry.ready.clear()
+                with anyio.CancelScope(shield=True):
+                    await entry.server._stop_process()
+                entry.started_at = None
+
+    async def _supervise_loop(self, name: str, entry: _PoolEntry) -> None:
+        server = entry.server
+        while not self._stopping:
+            await entry.wanted.wait()
+            if self._stopping:
+                break
+            start = time.perf_counter()
+            # Cleared before the spawn, so a stop requested while the server is starting is not lost
+            entry.restart.clear()
+            try:
+                with logfire.span("start mcp server {name}", name=name):
+                    await server._start_process()
+            except Exception as e:
+                logfire.error("mcp server {name} failed to start: {error}", name=name, error=repr(e))
+                entry.error = e
+                entry.wanted.clear()
+                entry.ready.set()
+                continue
+            entry.starts += 1
+            entry.started_at = time.monotonic()
+            entry.last_startup_seconds = time.perf_counter() - start
+            entry.ready.set()
+            try:
+                self._save_manifest(name, (await server._client.list_tools()).tools)
+            except Exception as e:
+                logfire.warn("could not list tools of {name}: {error}", name=name, error=repr(e))
+
+            await entry.restart.wait()
+            entry.ready.clear()
+            try:
+                await server._stop_process()
+            except Exception as e:
+                logfire.warn("mcp server {name} did not shut down cleanly: {error}", name=name, error=repr(e))
+            entry.started_at = None
+
+    async def _health_check_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for name, entry in self._entries.items():
+                if not entry.ready.is_set() or entry.error is not None:
+                    continue
+                try:
+                    await asyncio.wait_for(entry.server._client.send_ping(), self.ping_timeout)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.request_restart(name, reason=f"health check failed: {e!r}")
+
+
+# Process-wide pool shared by every agent module loaded into this server
+pool = MCPServerPool()
@@ -0,0 +1,124 @@
+"""
+Model cascades: answer with a cheap model first, escalate only when needed.
+
+A `ModelCascade` runs the first tier, checks its structured output with a
+quality gate and moves on to the next tier only when the gate reports
+issues (or the tier fails). Most simple requests are answered by the cheap
+tier; the rest pay for both.
+
+    cascade = ModelCascade("breakthrough", [("flash", flash_model), ("pro", None)], gate=list_field_issues)
+    output = await cascade.run(lambda model: sections.run(agent, prompt, model=model))
+
+A tier's model of `None` means the agent's own model. `stats()` reports the
+escalation rate and reasons; per-tier latency is recorded as
+`cascade.tier` in `latency`.
+"""
+
+import re
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import logfire
+from pydantic import BaseModel
+
+from latency_metrics import RollingHistogram, latency
+
+Gate = Callable[[BaseModel], List[str]]
+
+
+def _normalized(item: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", item.casefold()).split())
+
+
+def _similar(a: str, b: str, threshold: float) -> bool:
+    words_a, words_b = set(a.split()), set(b.split())
+    if not words_a or not words_b:
+        return a == b
+    return len(words_a & words_b) / len(words_a | words_b) >= threshold
+
+
+def list_field_issues(output: BaseModel, min_items: int = 3, min_chars: int = 40, max_duplicate_share: float = 0.2, similarity: float = 0.8) -> List[str]:
+    """Cheap completeness checks of a model whose fields are lists of text items.
+
+    Flags list fields with fewer than `min_items` items, items shorter than
+    `min_chars` characters, and outputs where more than `max_duplicate_share`
+    of all items repeat (or nearly repeat, by word overlap) an earlier item.
+    Issues read "kind: detail".
+    """
+    issues = []
+    seen: List[str] = []
+    items = duplicates = 0
+    for name, value in output:
+        if not isinstance(value, list):
+            continue
+        if len(value) < min_items:
+            issues.append(f"too few items: {name} has {len(value)}")
+        short = sum(1 for item in value if len(str(item).strip()) < min_chars)
+        if short:
+            issues.append(f"short items: {name} has {short} under {min_chars} characters")
+        for item in value:
+            normalized = _normalized(str(item))
+            items += 1
+            if any(_similar(normalized, earlier, similarity) for earlier in seen):
+                duplicates += 1
+            seen.append(normalized)
+    if items and duplicates / items > max_duplicate_share:
+        issues.append(f"duplicates: {duplicates} of {items} items")
+    return issues
+
+
+class ModelCascade:
+    """Tiers of models tried in order until one's output passes the quality gate.
+
+    Args:
+        name: Cascade name used in logs and latency labels
+        tiers: (label, model) pairs from cheapest to strongest; the last tier's output is always accepted
+        gate: Returns the quality issues ("kind: detail") of an output; no issues accepts it
+    """
+
+    def __init__(self, name: str, tiers: List[Tuple[str, Any]], gate: Gate):
+        self.name = name
+        self.tiers = tiers
+        self.gate = gate
+        self.runs = 0
+        self.answered: Counter = Counter()
+        self.escalations: Counter = Counter()
+        self.reasons: Counter = Counter()
+        self._latency = {label: RollingHistogram() for label, _ in tiers}
+
+    async def run(self, run_tier: Callable[[Optional[Any]], Awaitable[BaseModel]]) -> BaseModel:
+        """Call `run_tier(model)` per tier and return the first output that passes the gate."""
+        self.runs += 1
+        for number, (label, model) in enumerate(self.tiers):
+            last = number == len(self.tiers) - 1
+            start = time.perf_counter()
+            try:
+                output = await run_tier(model)
+            except Exception as e:
+                if last:
+                    raise
+                issues = [f"error: {type(e).__name__}: {e}"]
+            else:
+                issues = [] if last else self.gate(output)
+            finally:
+                elapsed = time.perf_counter() - start
+                self._latency[label].record(elapsed)
+                latency.record("cascade.tier", elapsed, cascade=self.name, tier=label)
+            if not issues:
+                self.answered[label] += 1
+                return output
+            self.escalations[label] += 1
+            self.reasons.update(issue.split(":")[0] for issue in issues)
+            logfire.info("{cascade} escalating from {tier}: {issues}", cascade=self.name, tier=label, issues=issues)
+        raise AssertionError("unreachable")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "answered_by": {label: self.answered[label] for label, _ in self.tiers},
+            "escalations": {label: self.escalations[label] for label, _ in self.tiers[:-1]},
+            "escalation_rate": self.escalations[self.tiers[0][0]] / self.runs if self.runs else 0.0,
+            "escalation_reasons": dict(self.reasons.most_common(10)),
+            "tier_latency_seconds": {label: histogram.snapshot() for label, histogram in self._latency.items()},
+        }
@@ -0,0 +1,317 @@
+"""
+Local full-text store of every paper the agents have seen on Semantic Scholar.
+
+Search results used to be thrown away after each run (or kept only as raw
+responses keyed on the exact query, see tool_cache.py). `PaperStore` keeps
+each paper record returned through the `semantic_scholar` server (title,
+abstract, year, venue, authors, fields of study, citation count and IDs) in
+SQLite with an FTS5 index, so a later query phrased differently can still
+be answered from disk in milliseconds:
+
+    semantic_scholar = pool.server(
+        "semantic_scholar", "npx", args=[...],
+        process_tool_call=paper_store.capture(semantic_scholar_cache.process_tool_call),
+    )
+
+The store is searched by the agents through the `papers-search-local` tool
+(`local_papers` toolset, see local_tools.py) and by the knowledge synthesizer's retrieval stage,
+which only goes to Semantic Scholar for queries the store cannot fill.
+Records are upserted by paper ID; a later, partial record (e.g. without an
+abstract) never erases what is already known.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+
+import logfire
+from evidence import normalize_records
+from mcp_pool import CACHE_DIR
+
+SortBy = Literal["relevance", "citationCount", "year"]
+
+# Column weights of the BM25 ranking: title, abstract, fields of study
+BM25_WEIGHTS = (10.0, 1.0, 2.0)
+
+# Words that match nearly every paper and only slow the full-text query down
+STOPWORDS = frozenset("a an and are as at by for from how in into is of on or the to using via what with".split())
+
+ORDER_BY = {
+    "relevance": "rank",
+    "citationCount": "p.citation_count DESC, rank",
+    "year": "p.year DESC, rank",
+}
+
+PAPER_COLUMNS = "p.paper_id, p.title, p.abstract, p.year, p.venue, p.authors, p.fields_of_study, p.citation_count, p.external_ids, p.url, p.publication_date"
+
+
+def _paper(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    """Semantic Scholar-shaped record of a `PAPER_COLUMNS` row."""
+    return {
+        "paperId": row[0],
+        "title": row[1],
+        "abstract": row[2],
+        "year": row[3],
+        "venue": row[4],
+        "authors": [{"name": name} for name in json.loads(row[5])],
+        "fieldsOfStudy": json.loads(row[6]),
+        "citationCount": row[7],
+        "externalIds": json.loads(row[8]),
+        "url": row[9],
+        "publicationDate": row[10],
+    }
+
+
+def match_expression(query: str, any_term: bool = False) -> Optional[str]:
+    """FTS5 MATCH expression for a free-text query: every term (or any term), as quoted prefix-free tokens."""
+    terms = [term for term in re.findall(r"\w+", query.casefold()) if term not in STOPWORDS and len(term) > 1]
+    if not terms:
+        return None
+    return (" OR " if any_term else " ").join(f'"{term}"' for term in dict.fromkeys(terms))
+
+
+class PaperStore:
+    """SQLite paper records with an FTS5 index over title, abstract and fields of study.
+
+    Args:
+        path: SQLite file to store the papers in
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.ingested = 0
+        self.searches = 0
+        self.answered = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS papers (
+                    paper_id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    abstract TEXT,
+                    year INTEGER,
+                    venue TEXT,
+                    authors TEXT NOT NULL,
+                    fields_of_study TEXT NOT NULL,
+                    citation_count INTEGER,
+                    external_ids TEXT NOT NULL,
+                    url TEXT,
+                    updated_at REAL NOT NULL,
+                    publication_date TEXT
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+                    title, abstract, fields_of_study, content='papers', content_rowid='rowid', tokenize='porter unicode61'
+                );
+                CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+                    INSERT INTO papers_fts (rowid, title, abstract, fields_of_study) VALUES (new.rowid, new.title, new.abstract, new.fields_of_study);
+                END;
+                CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+                    INSERT INTO papers_fts (papers_fts, rowid, title, abstract, fields_of_study) VALUES ('delete', old.rowid, old.title, old.abstract, old.fields_of_study);
+                END;
+                CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE ON papers BEGIN
+                    INSERT INTO papers_fts (papers_fts, rowid, title, abstract, fields_of_study) VALUES ('delete', old.rowid, old.title, old.abstract, old.fields_of_study);
+                    INSERT INTO papers_fts (rowid, title, abstract, fields_of_study) VALUES (new.rowid, new.title, new.abstract, new.fields_of_study);
+                END;
+                """
+            )
+            # Stores created before publication dates were kept
+            if "publication_date" not in {column[1] for column in db.execute("PRAGMA table_info(papers)")}:
+                db.execute("ALTER TABLE papers ADD COLUMN publication_date TEXT")
+            db.commit()
+            self._db = db
+        return self._db
+
+    def add(self, result: Any) -> int:
+        """Upsert every paper record found in a Semantic Scholar tool result. Returns the number of records stored."""
+        rows = []
+        now = time.time()
+        for record in normalize_records(result, "semantic_scholar", ""):
+            # Records without a Semantic Scholar or external ID (e.g. parsed from free text) can't be merged reliably
+            if record.id == record.title and not record.external_ids:
+                continue
+            rows.append((
+                record.id, record.title, record.abstract, record.year, record.venue,
+                json.dumps(record.authors, ensure_ascii=False), json.dumps(record.fields_of_study, ensure_ascii=False),
+                record.citation_count, json.dumps(record.external_ids), record.url, now, record.published,
+            ))
+        if not rows:
+            return 0
+        with self._lock:
+            db = self._connect()
+            db.executemany(
+                """INSERT INTO papers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (paper_id) DO UPDATE SET
+                    title = excluded.title,
+                    abstract = COALESCE(excluded.abstract, abstract),
+                    year = COALESCE(excluded.year, year),
+                    venue = COALESCE(excluded.venue, venue),
+                    authors = CASE WHEN excluded.authors = '[]' THEN authors ELSE excluded.authors END,
+                    fields_of_study = CASE WHEN excluded.fields_of_study = '[]' THEN fields_of_study ELSE excluded.fields_of_study END,
+                    citation_count = COALESCE(excluded.citation_count, citation_count),
+                    external_ids = CASE WHEN excluded.external_ids = '{}' THEN external_ids ELSE excluded.external_ids END,
+                    url = COALESCE(excluded.url, url),
+                    publication_date = COALESCE(excluded.publication_date, publication_date),
+                    updated_at = excluded.updated_at""",
+                rows,
+            )
+            db.commit()
+        self.ingested += len(rows)
+        return len(rows)
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        year_start: Optional[int] = None,
+        year_end: Optional[int] = None,
+        min_citations: Optional[int] = None,
+        sort_by: SortBy = "relevance",
+        any_term: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Papers matching every term of `query`, topped up with papers matching any term unless `any_term` is off.
+
+        Results have the shape of Semantic Scholar paper records (`paperId`,
+        `title`, `abstract`, `citationCount`, ...).
+        """
+        self.searches += 1
+        filters = ""
+        params: List[Any] = []
+        for clause, value in (("p.year >= ?", year_start), ("p.year <= ?", year_end), ("p.citation_count >= ?", min_citations)):
+            if value is not None:
+                filters += f" AND {clause}"
+                params.append(value)
+
+        papers: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            db = self._connect()
+            for match_any in (False, True) if any_term else (False,):
+                expression = match_expression(query, match_any)
+                if expression is None or len(papers) >= limit:
+                    break
+                rows = db.execute(
+                    f"""SELECT {PAPER_COLUMNS}, bm25(papers_fts, {', '.join(map(str, BM25_WEIGHTS))}) AS rank
+                        FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid
+                        WHERE papers_fts MATCH ?{filters}
+                        ORDER BY {ORDER_BY[sort_by]} LIMIT ?""",
+                    (expression, *params, limit),
+                ).fetchall()
+                for row in rows:
+                    papers.setdefault(row[0], _paper(row))
+        if papers:
+            self.answered += 1
+        return list(papers.values())[:limit]
+
+    def get(self, paper_ids: List[str]) -> List[Dict[str, Any]]:
+        """Stored papers by ID, in the given order; unknown IDs are skipped."""
+        if not paper_ids:
+            return []
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT {PAPER_COLUMNS} FROM papers p WHERE p.paper_id IN ({', '.join('?' * len(paper_ids))})",
+                list(paper_ids),
+            ).fetchall()
+        papers = {row[0]: _paper(row) for row in rows}
+        return [papers[paper_id] for paper_id in paper_ids if paper_id in papers]
+
+    def timeline(self, query: str, limit: int = 50000) -> List[Tuple[str, Optional[int], Optional[str], str]]:
+        """(title, year, publication date, fields of study JSON) of up to `limit` papers matching every term of `query`, for time series."""
+        expression = match_expression(query)
+        if expression is None:
+            return []
+        with self._lock:
+            return self._connect().execute(
+                """SELECT p.title, p.year, p.publication_date, p.fields_of_study
+                FROM papers_fts JOIN papers p ON p.rowid = papers_fts.rowid
+                WHERE papers_fts MATCH ? AND p.year IS NOT NULL LIMIT ?""",
+                (expression, limit),
+            ).fetchall()
+
+    def changed_since(self, after: Tuple[float, int] = (0.0, 0), limit: int = 1000) -> List[Tuple[str, str, Optional[str], float, int]]:
+        """(paper ID, title, abstract, updated_at, rowid) of papers stored or updated after the `(updated_at, rowid)` watermark `after`, oldest first."""
+        with self._lock:
+            return self._connect().execute(
+                """SELECT paper_id, title, abstract, updated_at, rowid FROM papers
+                WHERE (updated_at, rowid) > (?, ?) ORDER BY updated_at, rowid LIMIT ?""",
+                (*after, limit),
+            ).fetchall()
+
+    def capture(self, process_tool_call: Optional[Callable] = None) -> Callable:
+        """`process_tool_call` hook storing the papers of every response that comes back from the server.
+
+        `process_tool_call` (e.g. the response cache's hook) wraps the upstream
+        call, so responses it answers itself are not stored again.
+        """
+        async def process(ctx: Any, call_tool: Any, name: str, tool_args: Dict[str, Any]) -> Any:
+            async def call_and_store(name: str, tool_args: Dict[str, Any], metadata: Any = None) -> Any:
+                result = await call_tool(name, tool_args, metadata)
+                try:
+                    self.add(result)
+                except Exception as e:
+                    logfire.warn("could not store papers from {tool}: {error}", tool=name, error=repr(e))
+                return result
+
+            if process_tool_call is None:
+                return await call_and_store(name, tool_args)
+            return await process_tool_call(ctx, call_and_store, name, tool_args)
+
+        return process
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._connect()
+            db.execute("DELETE FROM papers")
+            db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Stored papers, records ingested and local searches answered since startup."""
+        with self._lock:
+            papers, with_abstract = self._connect().execute("SELECT COUNT(*), COUNT(abstract) FROM papers").fetchone()
+        return {
+            "papers": papers,
+            "with_abstract": with_abstract,
+            "ingested": self.ingested,
+            "searches": self.searches,
+            "answered": self.answered,
+            "answer_rate": self.answered / self.searches if self.searches else 0.0,
+        }
+
+
+paper_store = PaperStore(CACHE_DIR / "papers.sqlite")
+
+
+async def papers_search_local(
+    query: str,
+    limit: int = 10,
+    yearStart: Optional[int] = None,
+    yearEnd: Optional[int] = None,
+    minCitations: Optional[int] = None,
+    sortBy: SortBy = "relevance",
+) -> str:
+    """Search the papers already retrieved from Semantic Scholar, stored on local disk.
+
+    Answers in milliseconds and costs no Semantic Scholar request. Matches every
+    word of the query in titles, abstracts and fields of study, then any word.
+    Use it before papers-search-advanced and only search Semantic Scholar for
+    what it does not cover.
+
+    Args:
+        query: Search terms
+        limit: Maximum number of papers to return
+        yearStart: Only papers published in or after this year
+        yearEnd: Only papers published in or before this year
+        minCitations: Only papers with at least this many citations
+        sortBy: "relevance", "citationCount" or "year"
+    """
+    papers = paper_store.search(query, limit=limit, year_start=yearStart, year_end=yearEnd, min_citations=minCitations, sort_by=sortBy)
+    return json.dumps({"total": len(papers), "source": "local paper store", "data": papers}, ensure_ascii=False)
@@ -0,0 +1,179 @@
+"""
+Declarative rendering of the agents' structured outputs into reports.
+
+A `ReportSpec` lists the sections of a report in order: each `Section`
+shows one field of the response model (or one request argument) in a given
+style, and `Block`s hold static text such as dividers and footers. The spec
+is compiled once at import; rendering walks it and writes every piece into a
+single buffer, splitting each `Heading: detail` item at most once.
+
+    report = ReportSpec(
+        "Cross-Domain Knowledge Synthesis",
+        Section("Research Question", "research_question", TEXT),
+        Section("Domain Connections", "domain_connections"),
+        Section("Confidence Scores", "confidence_scores", SCORES),
+        Block("---\\n*Generated by Knowledge Synthesizer*"),
+    )
+    report.render(synthesis_data, {"research_question": question}, "markdown")
+
+Formats: `markdown` (the reports the tools have always returned), `json`
+(request arguments plus the model fields) and `compact` (one plain line per
+section, no static text).
+"""
+
+import io
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Literal, Mapping, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+# Section styles
+TEXT = "text"          # the value as is
+BOLD = "bold"          # **value**
+INLINE = "inline"      # list joined with ", "
+BULLETS = "bullets"    # one bullet per item
+LABELED = "labeled"    # "Heading: detail" items as bullets with a bold heading
+SCORES = "scores"      # mapping of name to a number, shown with two decimals
+PAIRS = "pairs"        # mapping of name to text, with a bold name
+
+ReportFormat = Literal["markdown", "json", "compact"]
+FORMATS = ("markdown", "json", "compact")
+
+
+@dataclass(frozen=True)
+class Section:
+    """A `## title` section showing a model field, or a request argument of the same name."""
+    title: str
+    field: str
+    style: str = BULLETS
+    icon: str = ""
+
+
+@dataclass(frozen=True)
+class Block:
+    """Static markdown between sections; left out of the JSON and compact formats."""
+    text: str
+
+
+Writer = Callable[[io.StringIO, Any, str], None]
+
+
+def _write_text(buffer: io.StringIO, value: Any, bullet: str) -> None:
+    buffer.write(str(value))
+
+
+def _write_bold(buffer: io.StringIO, value: Any, bullet: str) -> None:
+    buffer.write("**")
+    buffer.write(str(value))
+    buffer.write("**")
+
+
+def _write_inline(buffer: io.StringIO, value: Any, bullet: str) -> None:
+    buffer.write(", ".join(value))
+
+
+def _write_bullets(buffer: io.StringIO, value: Any, bullet: str) -> None:
+    if value:
+        buffer.write(bullet)
+        buffer.write(f"\n{bullet}".join(map(str, value)))
+
+
+def _labeled(item: str) -> str:
+    heading, colon, detail = item.partition(":")
+    return f"**{heading}**: {detail if colon else item}"
+
+
+def _write_labeled(buffer: io.StringIO, value: Any, bullet: str) -> None:
+    if value:
+        buffer.write(bullet)
+        buffer.write(f"\n{bullet}".join(map(_labeled, value)))
+
+
+def _write_scores(buffer: io.StringIO, value: Any, bullet: str) -> None:
+    buffer.write("\n".join(f"{bullet}{key}: {score:.2f}" for key, score in value.items()))
+
+
+def _write_pairs(buffer: io.StringIO, value: Any, bullet: str) -> None:
+    buffer.write("\n".join(f"{bullet}**{key}**: {text}" for key, text in value.items()))
+
+
+MARKDOWN_WRITERS: Dict[str, Writer] = {
+    TEXT: _write_text,
+    BOLD: _write_bold,
+    INLINE: _write_inline,
+    BULLETS: _write_bullets,
+    LABELED: _write_labeled,
+    SCORES: _write_scores,
+    PAIRS: _write_pairs,
+}
+
+
+def _compact_value(value: Any, style: str) -> str:
+    if style == SCORES:
+        return "; ".join(f"{key}: {score:.2f}" for key, score in value.items())
+    if isinstance(value, Mapping):
+        return "; ".join(f"{key}: {text}" for key, text in value.items())
+    if isinstance(value, (list, tuple)):
+        return "; ".join(str(item) for item in value)
+    return " ".join(str(value).split())
+
+
+class ReportSpec:
+    """An ordered, compiled report layout for one response model.
+
+    Args:
+        title: Report title (`# title` in markdown)
+        parts: `Section`s and `Block`s in display order
+        bullet: Bullet marker used by list sections
+    """
+
+    def __init__(self, title: str, *parts: Union[Section, Block], bullet: str = "-"):
+        self.title = title
+        self.parts = parts
+        self.bullet = f"{bullet} "
+        self.sections = [part for part in parts if isinstance(part, Section)]
+        # Compiled steps: (static text, field, writer); static-only steps have no field
+        self._steps: List[Tuple[str, Optional[str], Optional[Writer]]] = []
+        for part in parts:
+            if isinstance(part, Block):
+                self._steps.append((f"\n\n{part.text}", None, None))
+            else:
+                if part.style not in MARKDOWN_WRITERS:
+                    raise ValueError(f"Unknown section style {part.style!r} for {part.field}")
+                heading = f"{part.icon} {part.title}" if part.icon else part.title
+                self._steps.append((f"\n\n## {heading}\n", part.field, MARKDOWN_WRITERS[part.style]))
+
+    def render(self, data: BaseModel, context: Optional[Dict[str, Any]] = None, output_format: ReportFormat = "markdown") -> str:
+        """Render `data`, taking fields missing from the model (the request arguments) from `context`."""
+        context = context or {}
+        if output_format == "markdown":
+            return self.markdown(data, context)
+        if output_format == "json":
+            return json.dumps({"title": self.title, "request": context, "report": data.model_dump()}, indent=2, ensure_ascii=False)
+        if output_format == "compact":
+            return self.compact(data, context)
+        raise ValueError(f"Unknown output format {output_format!r}, expected one of {', '.join(FORMATS)}")
+
+    def markdown(self, data: BaseModel, context: Dict[str, Any]) -> str:
+        buffer = io.StringIO()
+        buffer.write("# ")
+        buffer.write(self.title)
+        for text, field, writer in self._steps:
+            buffer.write(text)
+            if writer is not None:
+                writer(buffer, context[field] if field in context else getattr(data, field), self.bullet)
+        buffer.write("\n")
+        return buffer.getvalue()
+
+    def compact(self, data: BaseModel, context: Dict[str, Any]) -> str:
+        buffer = io.StringIO()
+        buffer.write(self.title)
+        for section in self.sections:
+            value = context[section.field] if section.field in context else getattr(data, section.field)
+            buffer.write("\n")
+            buffer.write(section.title)
+            buffer.write(": ")
+            buffer.write(_compact_value(value, section.style))
+        buffer.write("\n")
+        return buffer.getvalue()
@@ -0,0 +1,121 @@
+"""
+Progressive delivery of report sections while an agent is still writing its output.
+
+With streaming enabled, the agent's structured output is requested as
+prompted JSON so the model streams it token by token (Gemini does not stream
+the arguments of a final output tool call). Each field of the response model
+is sent to the MCP client as a log notification, plus a progress
+notification when the client asked for progress, as soon as the model has
+moved on to the next field. The tool still returns the fully formatted
+report at the end.
+
+Usage inside an `@mcp.tool` that takes a FastMCP `Context`:
+
+    sections = SectionStreamer(ctx if stream_sections else None)
+    async with agent.run_mcp_servers():
+        output = await sections.run(agent, prompt)
+    await sections.finish(output)
+"""
+
+from typing import Any, Dict, List, Optional, Set
+
+import logfire
+import pydantic_core
+from fastmcp import Context
+from pydantic import BaseModel
+from pydantic_ai import Agent, PromptedOutput
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart
+
+
+def render_section(title: str, value: Any) -> str:
+    """Markdown for one output field, matching the bullet style of the final reports."""
+    if isinstance(value, dict):
+        body = "\n".join(f"- {key}: {item:.2f}" if isinstance(item, float) else f"- **{key}**: {item}" for key, item in value.items())
+    elif isinstance(value, list):
+        body = "\n".join(f"- {item}" for item in value)
+    else:
+        body = str(value)
+    return f"## {title}\n{body}\n"
+
+
+def partial_fields(response: ModelResponse) -> Dict[str, Any]:
+    """Fields of the structured output parsed so far from a (possibly incomplete) model response."""
+    for part in response.parts:
+        if isinstance(part, ToolCallPart):
+            if isinstance(part.args, dict):
+                return part.args
+            text = part.args or ""
+        elif isinstance(part, TextPart):
+            text = part.content
+        else:
+            continue
+        start = text.find("{")
+        if start == -1:
+            continue
+        try:
+            parsed = pydantic_core.from_json(text[start:], allow_partial=True)
+        except ValueError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+    return {}
+
+
+class SectionStreamer:
+    """Sends completed output fields to the MCP client while the agent run is in flight.
+
+    Args:
+        ctx: FastMCP request context; `None` disables streaming and `run` becomes a plain `agent.run`
+        titles: Section titles by field name, defaulting to the title-cased field name
+    """
+
+    def __init__(self, ctx: Optional[Context], titles: Optional[Dict[str, str]] = None):
+        self.ctx = ctx
+        self.titles = titles or {}
+        self.sent: Set[str] = set()
+        self._total: Optional[int] = None
+
+    def title(self, field: str) -> str:
+        return self.titles.get(field, field.replace("_", " ").title())
+
+    async def run(self, agent: Agent, prompt: str, **run_options: Any) -> Any:
+        """Run `agent` on `prompt` and return its output, streaming sections if enabled.
+
+        `run_options` (model, usage limits, an `output_type` other than the agent's) are passed on to the agent run.
+        """
+        if self.ctx is None:
+            result = await agent.run(prompt, **run_options)
+            return result.output
+
+        output_type = run_options.pop("output_type", agent.output_type)
+        self._total = len(output_type.model_fields)
+        async with agent.run_stream(prompt, output_type=PromptedOutput(output_type), **run_options) as result:
+            async for response, is_last in result.stream_structured(debounce_by=0.25):
+                fields = partial_fields(response)
+                names = list(fields)
+                # A field is complete once the model has started on the next one
+                complete = names if is_last else names[:-1]
+                await self._send(fields, complete)
+            return await result.get_output()
+
+    async def finish(self, output: BaseModel) -> None:
+        """Send every section not streamed yet, e.g. when the output came from the memo."""
+        if self.ctx is None:
+            return
+        self._total = len(type(output).model_fields)
+        fields = output.model_dump()
+        await self._send(fields, list(fields))
+
+    async def _send(self, fields: Dict[str, Any], complete: List[str]) -> None:
+        for name in complete:
+            # Fields left null, e.g. unchanged by an update, are sent by `finish`
+            if name in self.sent or fields[name] is None:
+                continue
+            self.sent.add(name)
+            section = render_section(self.title(name), fields[name])
+            try:
+                await self.ctx.info(section, logger_name="report.section")
+                await self.ctx.report_progress(len(self.sent), self._total, message=self.title(name))
+            except Exception as e:
+                # The report is still returned in full; a lost notification is not fatal
+                logfire.warn("could not stream section {name}: {error}", name=name, error=repr(e))
@@ -7,23 +7,37 @@
 #     "pydantic>=2.0.0",
 #     "python-dotenv>=1.0.0",
 #     "logfire>=0.1.0",
+#     "numpy>=1.24",
+#     "fastembed>=0.3",
 # ]
 # ///
 
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 from pydantic_ai import Agent
-from pydantic_ai.mcp import MCPServerStdio
 from pydantic import BaseModel
 import os
 from dotenv import load_dotenv
-import logfire
+import json
+import asyncio
+import time
+from typing import Optional
+from citation_graph import citation_graph
+from deadlines import HedgedModel, within_deadline
+from embedding_index import paper_embeddings
+from jobs import JobStore, fail
+from latency_metrics import TimedModel, latency
+from local_tools import local_papers
+from mcp_pool import CACHE_DIR, pool
+from paper_store import paper_store
+from report_rendering import BOLD, BULLETS, Block, ReportFormat, ReportSpec, Section
+from report_streaming import SectionStreamer
+from startup import DeferredStartup, deferred, telemetry
+from tool_cache import HOUR, ToolResultMemo, semantic_scholar_cache, shared_lookups
+from upstream_scheduler import call_priority, semantic_scholar_scheduler
 
 load_dotenv()
 
-mcp = FastMCP("semantic-scholar-innovation-agent")
-
-logfire.configure()
-logfire.instrument_pydantic_ai()
+mcp = FastMCP("semantic-scholar-innovation-agent", lifespan=pool.lifespan)
 
 class SemanticScholarInnovationResponse(BaseModel):
     """Structured output for semantic scholar innovation research with 2025 insights"""
@@ -40,8 +54,8 @@ class SemanticScholarInnovationResponse(BaseModel):
     research_gap_opportunities: list[str]
     next_generation_approaches: list[str]
 
-sequential_thinking = MCPServerStdio('npx', args=['-y', '@modelcontextprotocol/server-sequential-thinking'])
-semantic_scholar = MCPServerStdio('npx', args=['-y', '@smithery/cli@latest', 'run', '@hamid-vakilzadeh/mcpsemanticscholar', '--key', '4e694cd2-ce2d-4ea7-a742-4990a24854f1'])
+sequential_thinking = pool.server('sequential_thinking', 'npx', args=['-y', '@modelcontextprotocol/server-sequential-thinking'])
+semantic_scholar = pool.server('semantic_scholar', 'npx', args=['-y', '@smithery/cli@latest', 'run', '@hamid-vakilzadeh/mcpsemanticscholar', '--key', '4e694cd2-ce2d-4ea7-a742-4990a24854f1'], coalesce=True, scheduler=semantic_scholar_scheduler, process_tool_call=paper_store.capture(citation_graph.capture(semantic_scholar_cache.process_tool_call)))
 
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
@@ -77,6 +91,10 @@ SEARCH STRATEGY FOR 2025 INSIGHTS:
 6. **Breakthrough Pattern Search**: Search for paradigm-shifting approaches in 2025
 
 SEMANTIC SCHOLAR TOOL OPTIMIZATION:
+- Run papers-search-local first for each angle: it searches papers already retrieved, from local disk, in milliseconds
+- Use papers-search-semantic to find stored papers on the same topic phrased differently: one semantic query replaces several keyword variations
+- Send papers-search-advanced only for the angles the local searches do not cover
+- Use citations-local-neighborhood and citations-local-related for citation analysis of papers already explored; call papers-citations / papers-references only for papers they do not know
 - Use papers-search-advanced with minCitations for credible sources
 - Apply yearStart=2025, yearEnd=2025 filters consistently
 - Use sortBy="citationCount" for high-impact papers
@@ -109,16 +127,233 @@ Structure ALL insights as list[str] items that are:
 
 Your goal is to provide the most comprehensive, up-to-date, and insightful analysis of innovative ideas using the latest 2025 academic research through aggressive parallel tool usage."""
 
-innovation_research_agent = Agent(
-    "gemini-2.5-flash",
-    system_prompt=system_prompt,
-    mcp_servers=[sequential_thinking, semantic_scholar],
-    output_type=SemanticScholarInnovationResponse,
-    instrument=True
+# Static instructions for every research request; the request itself only carries the innovation idea
+RESEARCH_REQUEST_INSTRUCTIONS = """CRITICAL INSTRUCTIONS:
+1. Use sequential thinking to plan a comprehensive parallel research strategy
+2. Make MULTIPLE PARALLEL tool calls to Semantic Scholar (minimum 15-20 calls)
+3. Focus EXCLUSIVELY on 2025 publications using yearStart=2025, yearEnd=2025 filters
+4. Use papers-search-advanced with different query variations simultaneously
+5. Perform citation and reference analysis on key papers in parallel
+6. Search across multiple related fields and disciplines concurrently
+
+PARALLEL RESEARCH STRATEGY:
+
+PHASE 1: CORE INNOVATION SEARCHES (Run 4-5 parallel searches)
+- Primary innovation search with 2025 filter
+- Adjacent technology search with 2025 filter
+- Methodology innovation search with 2025 filter
+- Application domain search with 2025 filter
+- Breakthrough pattern search with 2025 filter
+
+PHASE 2: DEEP ANALYSIS (Run 6-8 parallel analyses)
+- Citation analysis of top papers found in Phase 1
+- Reference analysis of breakthrough papers
+- Author research for key innovation researchers
+- Interdisciplinary connection searches
+- Technology convergence analysis
+- Research gap identification
+
+PHASE 3: SYNTHESIS AND INSIGHTS (Run 4-6 parallel syntheses)
+- Pattern recognition across research streams
+- Innovation acceleration factor analysis
+- Paradigm shift identification
+- Practical implementation pathway research
+- Future research direction mapping
+- Next-generation approach discovery
+
+RESEARCH DIMENSIONS TO EXPLORE:
+
+1. CUTTING-EDGE RESEARCH FINDINGS:
+- Latest 2025 breakthroughs related to the innovation idea
+- High-impact papers with novel findings
+- Emerging research results and experimental outcomes
+- Breakthrough discoveries and significant advances
+
+2. NOVEL METHODOLOGIES 2025:
+- New approaches and techniques developed in 2025
+- Innovative research methodologies and frameworks
+- Breakthrough analytical methods and tools
+- Novel experimental designs and validation approaches
+
+3. EMERGING INNOVATION PATTERNS:
+- Patterns of innovation emerging across 2025 research
+- Common themes and convergence points
+- Innovation acceleration trends and catalysts
+- Systematic approaches to breakthrough innovation
+
+4. BREAKTHROUGH APPLICATIONS:
+- Real-world applications and implementations from 2025
+- Practical use cases and deployment scenarios
+- Success stories and case studies
+- Commercial and industrial applications
+
+5. INTERDISCIPLINARY CONNECTIONS:
+- Cross-domain applications and integrations
+- Connections between different research fields
+- Hybrid approaches combining multiple disciplines
+- Innovation through interdisciplinary collaboration
+
+6. FUTURE RESEARCH DIRECTIONS:
+- Emerging research trajectories and focus areas
+- Next-generation research questions and challenges
+- Future innovation opportunities and possibilities
+- Long-term research roadmaps and visions
+
+7. TECHNOLOGY CONVERGENCE TRENDS:
+- Convergence of different technologies and approaches
+- Integration patterns and synergistic effects
+- Technology fusion and hybrid solutions
+- Convergence-driven innovation opportunities
+
+8. INNOVATION ACCELERATION FACTORS:
+- Factors accelerating innovation in this domain
+- Catalysts for breakthrough discoveries
+- Enabling technologies and infrastructure
+- Accelerated development methodologies
+
+9. PARADIGM SHIFTING PAPERS:
+- Papers that challenge established paradigms
+- Breakthrough research that changes perspectives
+- Paradigm-shifting methodologies and frameworks
+- Transformative insights and revelations
+
+10. PRACTICAL IMPLEMENTATION INSIGHTS:
+- Actionable insights for implementation
+- Practical deployment strategies and considerations
+- Real-world implementation challenges and solutions
+- Success factors and best practices
+
+11. RESEARCH GAP OPPORTUNITIES:
+- Unexplored areas and research opportunities
+- Gaps in current research and knowledge
+- Underexplored applications and use cases
+- Innovation opportunities in research gaps
+
+12. NEXT-GENERATION APPROACHES:
+- Emerging next-generation methodologies
+- Future approaches and evolution trajectories
+- Advanced techniques and sophisticated methods
+- Next-level innovation frameworks and strategies
+
+EXECUTION REQUIREMENTS:
+- Make extensive parallel tool calls to Semantic Scholar
+- Focus exclusively on 2025 publications
+- Use advanced search filters and parameters
+- Analyze high-impact papers and breakthrough research
+- Identify patterns across multiple research streams
+- Generate actionable insights for practical implementation
+
+Use your sequential thinking capabilities to orchestrate this comprehensive parallel research strategy and deliver cutting-edge 2025 insights that advance understanding of the innovation idea."""
+
+# Agents are built on the first tool call, so initialize and tools/list don't wait for the Gemini client
+@deferred
+def build_agents() -> None:
+    global innovation_research_agent
+    from gemini_cache import CachedGeminiModel
+
+    innovation_research_agent = Agent(
+        TimedModel(HedgedModel(CachedGeminiModel("gemini-2.5-flash"))),
+        system_prompt=[system_prompt, RESEARCH_REQUEST_INSTRUCTIONS],
+        toolsets=[sequential_thinking, local_papers, semantic_scholar],
+        output_type=SemanticScholarInnovationResponse,
+        instrument=True
+    )
+
+mcp.add_middleware(DeferredStartup(telemetry, build_agents))
+
+# Report layouts, rendered by report_rendering.py
+research_report = ReportSpec(
+    "Semantic Scholar Innovation Research - 2025 Insights",
+    Section("Innovation Idea Analysis", "innovation_idea", BOLD),
+    Block("*Comprehensive academic research using Semantic Scholar focused on 2025 breakthrough insights*"),
+    Block("---"),
+    Section("Cutting-Edge Research Findings (2025)", "cutting_edge_research_findings", BULLETS, icon="🔬"),
+    Section("Novel Methodologies 2025", "novel_methodologies_2025", BULLETS, icon="🛠️"),
+    Section("Emerging Innovation Patterns", "emerging_innovation_patterns", BULLETS, icon="🌟"),
+    Section("Breakthrough Applications", "breakthrough_applications", BULLETS, icon="💡"),
+    Section("Interdisciplinary Connections", "interdisciplinary_connections", BULLETS, icon="🔗"),
+    Section("Future Research Directions", "future_research_directions", BULLETS, icon="🚀"),
+    Section("Technology Convergence Trends", "technology_convergence_trends", BULLETS, icon="⚡"),
+    Section("Innovation Acceleration Factors", "innovation_acceleration_factors", BULLETS, icon="🎯"),
+    Section("Paradigm Shifting Papers", "paradigm_shifting_papers", BULLETS, icon="📄"),
+    Section("Practical Implementation Insights", "practical_implementation_insights", BULLETS, icon="🔧"),
+    Section("Research Gap Opportunities", "research_gap_opportunities", BULLETS, icon="🎪"),
+    Section("Next-Generation Approaches", "next_generation_approaches", BULLETS, icon="🔮"),
+    Block("""---
+
+*Generated by Semantic Scholar Innovation Agent - 2025 Research Specialist*
+
+## Research Methodology Applied:
+- **Parallel Tool Strategy**: Executed 15+ concurrent Semantic Scholar searches
+- **2025 Focus**: Exclusively analyzed cutting-edge 2025 publications
+- **Multi-Domain Analysis**: Explored innovation across multiple research fields
+- **Citation Network Analysis**: Analyzed citation patterns and research networks
+- **Interdisciplinary Synthesis**: Connected insights across diverse domains
+- **Sequential Thinking**: Methodically orchestrated comprehensive research strategy
+
+## Search Optimization:
+- **Advanced Filters**: yearStart=2025, yearEnd=2025, minCitations, sortBy=citationCount
+- **Parallel Queries**: Multiple simultaneous searches across different angles
+- **Batch Processing**: Efficient multi-paper analysis and synthesis
+- **Domain Coverage**: AI, computer science, engineering, interdisciplinary fields
+- **High-Impact Focus**: Prioritized breakthrough papers and novel methodologies
+
+Ready to transform innovative ideas into actionable 2025 research insights!"""),
+    bullet="•",
 )
 
+# End-to-end time limit of each tool, in seconds, so MCP clients get an answer before they time out;
+# in a batch, each idea gets its own
+TOOL_DEADLINES = {"research_innovation_idea": 180.0}
+
+# Memoized agent outputs for repeated or equivalent requests
+tool_results = ToolResultMemo(
+    ttls={"research_innovation_idea": 24 * HOUR},
+    path=CACHE_DIR / "semantic_scholar_innovation_results.sqlite",
+)
+
+async def run_innovation_research(innovation_idea: str, force_refresh: bool = False, sections: Optional[SectionStreamer] = None, output_format: ReportFormat = "markdown") -> str:
+    """
+    Research one innovation idea and render its report; failures are returned as the report text.
+    """
+    
+    research_prompt = f"""
+    SEMANTIC SCHOLAR INNOVATION RESEARCH REQUEST
+    
+    INNOVATION IDEA TO RESEARCH:
+    {innovation_idea}
+    """
+    
+    try:
+        sections = sections or SectionStreamer(None)
+
+        async def run_research() -> SemanticScholarInnovationResponse:
+            with pool.track_run("research_innovation_idea"):
+                async with innovation_research_agent.run_mcp_servers():
+                    return await sections.run(innovation_research_agent, research_prompt)
+
+        research_data = await within_deadline(
+            tool_results.get_or_run(
+                "research_innovation_idea",
+                {"innovation_idea": innovation_idea},
+                SemanticScholarInnovationResponse,
+                run_research,
+                force_refresh=force_refresh,
+            ),
+            seconds=TOOL_DEADLINES["research_innovation_idea"],
+            what="research_innovation_idea",
+        )
+        await sections.finish(research_data)
+        
+        with latency.measure("render", tool="research_innovation_idea"):
+            return research_report.render(research_data, {"innovation_idea": innovation_idea}, output_format)
+        
+    except Exception as e:
+        fail(e)
+        return f"Semantic Scholar innovation research failed: {str(e)}"
+
 @mcp.tool
-async def research_innovation_idea(innovation_idea: str) -> str:
+async def research_innovation_idea(innovation_idea: str, force_refresh: bool = False, stream_sections: bool = False, output_format: ReportFormat = "markdown", ctx: Optional[Context] = None) -> str:
     """
     Conduct deep research on a novel innovative idea using Semantic Scholar to discover cutting-edge 2025 insights.
     
@@ -132,211 +367,192 @@ async def research_innovation_idea(innovation_idea: str) -> str:
     
     Args:
         innovation_idea: The novel innovative idea to research deeply using Semantic Scholar
+        force_refresh: Re-run the analysis even if an equivalent request was answered recently
+        stream_sections: Send each report section to the client as a log/progress notification as soon as it is written
+        output_format: Report format: "markdown" (default), "json" or "compact" (one plain line per section)
     
     Returns:
         Comprehensive 2025 research insights with cutting-edge academic findings and innovation patterns
     """
     
-    research_prompt = f"""
-    SEMANTIC SCHOLAR INNOVATION RESEARCH REQUEST
-    
-    INNOVATION IDEA TO RESEARCH:
-    {innovation_idea}
-    
-    CRITICAL INSTRUCTIONS:
-    1. Use sequential thinking to plan a comprehensive parallel research strategy
-    2. Make MULTIPLE PARALLEL tool calls to Semantic Scholar (minimum 15-20 calls)
-    3. Focus EXCLUSIVELY on 2025 publications using yearStart=2025, yearEnd=2025 filters
-    4. Use papers-search-advanced with different query variations simultaneously
-    5. Perform citation and reference analysis on key papers in parallel
-    6. Search across multiple related fields and disciplines concurrently
-    
-    PARALLEL RESEARCH STRATEGY:
-    
-    PHASE 1: CORE INNOVATION SEARCHES (Run 4-5 parallel searches)
-    - Primary innovation search with 2025 filter
-    - Adjacent technology search with 2025 filter
-    - Methodology innovation search with 2025 filter
-    - Application domain search with 2025 filter
-    - Breakthrough pattern search with 2025 filter
-    
-    PHASE 2: DEEP ANALYSIS (Run 6-8 parallel analyses)
-    - Citation analysis of top papers found in Phase 1
-    - Reference analysis of breakthrough papers
-    - Author research for key innovation researchers
-    - Interdisciplinary connection searches
-    - Technology convergence analysis
-    - Research gap identification
-    
-    PHASE 3: SYNTHESIS AND INSIGHTS (Run 4-6 parallel syntheses)
-    - Pattern recognition across research streams
-    - Innovation acceleration factor analysis
-    - Paradigm shift identification
-    - Practical implementation pathway research
-    - Future research direction mapping
-    - Next-generation approach discovery
-    
-    RESEARCH DIMENSIONS TO EXPLORE:
-    
-    1. CUTTING-EDGE RESEARCH FINDINGS:
-    - Latest 2025 breakthroughs related to the innovation idea
-    - High-impact papers with novel findings
-    - Emerging research results and experimental outcomes
-    - Breakthrough discoveries and significant advances
-    
-    2. NOVEL METHODOLOGIES 2025:
-    - New approaches and techniques developed in 2025
-    - Innovative research methodologies and frameworks
-    - Breakthrough analytical methods and tools
-    - Novel experimental designs and validation approaches
-    
-    3. EMERGING INNOVATION PATTERNS:
-    - Patterns of innovation emerging across 2025 research
-    - Common themes and convergence points
-    - Innovation acceleration trends and catalysts
-    - Systematic approaches to breakthrough innovation
-    
-    4. BREAKTHROUGH APPLICATIONS:
-    - Real-world applications and implementations from 2025
-    - Practical use cases and deployment scenarios
-    - Success stories and case studies
-    - Commercial and industrial applications
-    
-    5. INTERDISCIPLINARY CONNECTIONS:
-    - Cross-domain applications and integrations
-    - Connections between different research fields
-    - Hybrid approaches combining multiple disciplines
-    - Innovation through interdisciplinary collaboration
-    
-    6. FUTURE RESEARCH DIRECTIONS:
-    - Emerging research trajectories and focus areas
-    - Next-generation research questions and challenges
-    - Future innovation opportunities and possibilities
-    - Long-term research roadmaps and visions
-    
-    7. TECHNOLOGY CONVERGENCE TRENDS:
-    - Convergence of different technologies and approaches
-    - Integration patterns and synergistic effects
-    - Technology fusion and hybrid solutions
-    - Convergence-driven innovation opportunities
-    
-    8. INNOVATION ACCELERATION FACTORS:
-    - Factors accelerating innovation in this domain
-    - Catalysts for breakthrough discoveries
-    - Enabling technologies and infrastructure
-    - Accelerated development methodologies
+    return await run_innovation_research(innovation_idea, force_refresh, SectionStreamer(ctx if stream_sections else None), output_format)
+
+@mcp.tool
+async def research_innovation_ideas(ideas: list[str], max_concurrency: int = 4, force_refresh: bool = False) -> str:
+    """
+    Research many innovative ideas concurrently on one set of warm Semantic Scholar sessions.
     
-    9. PARADIGM SHIFTING PAPERS:
-    - Papers that challenge established paradigms
-    - Breakthrough research that changes perspectives
-    - Paradigm-shifting methodologies and frameworks
-    - Transformative insights and revelations
+    Ideas are researched in parallel up to max_concurrency at a time. Identical
+    Semantic Scholar lookups made for different ideas go upstream once and are
+    shared, and repeated ideas are researched once.
     
-    10. PRACTICAL IMPLEMENTATION INSIGHTS:
-    - Actionable insights for implementation
-    - Practical deployment strategies and considerations
-    - Real-world implementation challenges and solutions
-    - Success factors and best practices
+    Args:
+        ideas: The innovative ideas to research
+        max_concurrency: Maximum number of ideas researched at the same time
+        force_refresh: Re-run the research even for ideas answered recently
     
-    11. RESEARCH GAP OPPORTUNITIES:
-    - Unexplored areas and research opportunities
-    - Gaps in current research and knowledge
-    - Underexplored applications and use cases
-    - Innovation opportunities in research gaps
+    Returns:
+        Per-idea research reports plus aggregate timing and lookup statistics
+    """
     
-    12. NEXT-GENERATION APPROACHES:
-    - Emerging next-generation methodologies
-    - Future approaches and evolution trajectories
-    - Advanced techniques and sophisticated methods
-    - Next-level innovation frameworks and strategies
+    unique_ideas = list(dict.fromkeys(" ".join(idea.split()) for idea in ideas if idea.strip()))
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    timings: dict[str, float] = {}
     
-    EXECUTION REQUIREMENTS:
-    - Make extensive parallel tool calls to Semantic Scholar
-    - Focus exclusively on 2025 publications
-    - Use advanced search filters and parameters
-    - Analyze high-impact papers and breakthrough research
-    - Identify patterns across multiple research streams
-    - Generate actionable insights for practical implementation
+    async def research(idea: str) -> str:
+        async with semaphore:
+            start = time.perf_counter()
+            report = await run_innovation_research(idea, force_refresh)
+            timings[idea] = time.perf_counter() - start
+            return report
     
-    Use your sequential thinking capabilities to orchestrate this comprehensive parallel research strategy and deliver cutting-edge 2025 insights that advance understanding of the innovation idea.
-    """
+    batch_start = time.perf_counter()
+    # Batch lookups yield the upstream to interactive requests
+    with shared_lookups() as lookups, call_priority("batch"):
+        reports = await asyncio.gather(*(research(idea) for idea in unique_ideas))
+    wall_clock = time.perf_counter() - batch_start
+    serial = sum(timings.values())
     
-    try:
-        async with innovation_research_agent.run_mcp_servers():
-            result = await innovation_research_agent.run(research_prompt)
-        
-        research_data = result.output
-        
-        research_report = f"""# Semantic Scholar Innovation Research - 2025 Insights
+    return f"""# Semantic Scholar Innovation Research - Batch of {len(unique_ideas)} Ideas
 
-## Innovation Idea Analysis
-**{innovation_idea}**
+## Batch Summary
+- **Ideas Researched**: {len(unique_ideas)} ({len(ideas) - len(unique_ideas)} duplicates skipped)
+- **Max Concurrency**: {max(1, max_concurrency)}
+- **Wall-Clock Time**: {wall_clock:.1f}s
+- **Sum of Per-Idea Times**: {serial:.1f}s ({serial / wall_clock if wall_clock else 1.0:.1f}x speedup over serial)
+- **Semantic Scholar Lookups**: {lookups.calls - lookups.merged} sent upstream, {lookups.merged} shared between ideas
 
-*Comprehensive academic research using Semantic Scholar focused on 2025 breakthrough insights*
+## Per-Idea Timing
+{chr(10).join(f"- {idea}: {timings.get(idea, 0.0):.1f}s" for idea in unique_ideas)}
 
 ---
 
-## 🔬 Cutting-Edge Research Findings (2025)
-{chr(10).join(f"• {finding}" for finding in research_data.cutting_edge_research_findings)}
-
-## 🛠️ Novel Methodologies 2025
-{chr(10).join(f"• {methodology}" for methodology in research_data.novel_methodologies_2025)}
-
-## 🌟 Emerging Innovation Patterns
-{chr(10).join(f"• {pattern}" for pattern in research_data.emerging_innovation_patterns)}
+{(chr(10) + "---" + chr(10) + chr(10)).join(reports)}
+"""
 
-## 💡 Breakthrough Applications
-{chr(10).join(f"• {application}" for application in research_data.breakthrough_applications)}
+# Tools that can also run as background jobs, for calls that outlast the client's request timeout
+JOB_TOOLS = ["research_innovation_idea", "research_innovation_ideas"]
 
-## 🔗 Interdisciplinary Connections
-{chr(10).join(f"• {connection}" for connection in research_data.interdisciplinary_connections)}
+background_jobs = JobStore()
 
-## 🚀 Future Research Directions
-{chr(10).join(f"• {direction}" for direction in research_data.future_research_directions)}
+@mcp.tool
+async def start_job(tool: str, arguments: Optional[dict] = None) -> str:
+    """
+    Start a long-running tool in the background and return its job ID right away.
+    
+    Use this instead of a direct call when the tool may run longer than the
+    client waits for a response. Collect the outcome later with get_job or by
+    reading the jobs://{job_id} resource; many jobs can run at once.
+    
+    Args:
+        tool: Tool to run: research_innovation_idea or research_innovation_ideas
+        arguments: The tool's arguments, as for a direct call
+    
+    Returns:
+        JSON with the job ID, its status and the resource it can be read from
+    """
+    
+    try:
+        job = await background_jobs.submit(mcp, tool, arguments or {}, JOB_TOOLS)
+    except ValueError as e:
+        return f"Could not start job: {str(e)}"
+    return json.dumps(job.snapshot(), indent=2)
 
-## ⚡ Technology Convergence Trends
-{chr(10).join(f"• {trend}" for trend in research_data.technology_convergence_trends)}
+@mcp.tool
+async def get_job(job_id: str, wait_seconds: float = 0.0) -> str:
+    """
+    Status, progress and, once finished, the report of a job started with start_job.
+    
+    Args:
+        job_id: The job ID returned by start_job
+        wait_seconds: Wait up to this long (at most 50 seconds) for the job to finish before answering
+    
+    Returns:
+        JSON with the status (queued, running, done, failed), current phase, tool calls and model requests made so far, and the report once done
+    """
+    
+    return json.dumps(await background_jobs.describe(job_id, wait_seconds), indent=2)
 
-## 🎯 Innovation Acceleration Factors
-{chr(10).join(f"• {factor}" for factor in research_data.innovation_acceleration_factors)}
+@mcp.resource("cache://semantic-scholar")
+def get_semantic_scholar_cache_stats() -> str:
+    """
+    Hit/miss statistics and disk usage of the Semantic Scholar response cache.
+    """
+    
+    return json.dumps(semantic_scholar_cache.stats(), indent=2)
 
-## 📄 Paradigm Shifting Papers
-{chr(10).join(f"• {paper}" for paper in research_data.paradigm_shifting_papers)}
+@mcp.resource("cache://paper-store")
+def get_paper_store_stats() -> str:
+    """
+    Papers stored locally from Semantic Scholar responses, and how many local searches they answered.
+    """
+    
+    return json.dumps(paper_store.stats(), indent=2)
 
-## 🔧 Practical Implementation Insights
-{chr(10).join(f"• {insight}" for insight in research_data.practical_implementation_insights)}
+@mcp.resource("cache://paper-embeddings")
+def get_paper_embedding_stats() -> str:
+    """
+    Size of the embedding index over the stored papers, and the semantic searches it answered.
+    """
+    
+    return json.dumps(paper_embeddings.stats(), indent=2)
 
-## 🎪 Research Gap Opportunities
-{chr(10).join(f"• {gap}" for gap in research_data.research_gap_opportunities)}
+@mcp.resource("cache://citation-graph")
+def get_citation_graph_stats() -> str:
+    """
+    Size of the local citation graph built from citation and reference responses.
+    """
+    
+    return json.dumps(citation_graph.stats(), indent=2)
 
-## 🔮 Next-Generation Approaches
-{chr(10).join(f"• {approach}" for approach in research_data.next_generation_approaches)}
+@mcp.resource("cache://tool-results")
+def get_tool_result_cache_stats() -> str:
+    """
+    Hit/miss statistics of the memoized tool results.
+    """
+    
+    return json.dumps(tool_results.stats(), indent=2)
 
----
+@mcp.resource("cache://gemini-context")
+def get_gemini_context_cache_stats() -> str:
+    """
+    Gemini context cache usage: prompt tokens served from cached content versus sent uncached.
+    """
+    from gemini_cache import context_cache
+    
+    return json.dumps(context_cache.stats(), indent=2)
 
-*Generated by Semantic Scholar Innovation Agent - 2025 Research Specialist*
+@mcp.resource("jobs://{job_id}")
+async def get_job_status(job_id: str) -> str:
+    """
+    Status, progress and, once finished, the report of a background job.
+    """
+    
+    return json.dumps(await background_jobs.describe(job_id), indent=2)
 
-## Research Methodology Applied:
-- **Parallel Tool Strategy**: Executed 15+ concurrent Semantic Scholar searches
-- **2025 Focus**: Exclusively analyzed cutting-edge 2025 publications
-- **Multi-Domain Analysis**: Explored innovation across multiple research fields
-- **Citation Network Analysis**: Analyzed citation patterns and research networks
-- **Interdisciplinary Synthesis**: Connected insights across diverse domains
-- **Sequential Thinking**: Methodically orchestrated comprehensive research strategy
+@mcp.resource("metrics://jobs")
+def get_job_stats() -> str:
+    """
+    Background jobs per status, jobs evicted from the finished job store, and the store limits.
+    """
+    
+    return json.dumps(background_jobs.stats(), indent=2)
 
-## Search Optimization:
-- **Advanced Filters**: yearStart=2025, yearEnd=2025, minCitations, sortBy=citationCount
-- **Parallel Queries**: Multiple simultaneous searches across different angles
-- **Batch Processing**: Efficient multi-paper analysis and synthesis
-- **Domain Coverage**: AI, computer science, engineering, interdisciplinary fields
-- **High-Impact Focus**: Prioritized breakthrough papers and novel methodologies
+@mcp.resource("metrics://latency")
+def get_latency_metrics() -> str:
+    """
+    Rolling p50/p95/p99 latencies (seconds) of MCP server startup and shutdown, MCP tool calls, model requests, retries and report rendering.
+    """
+    
+    return json.dumps(latency.snapshot(), indent=2)
 
-Ready to transform innovative ideas into actionable 2025 research insights!
-"""
-        
-        return research_report
-        
-    except Exception as e:
-        return f"Semantic Scholar innovation research failed: {str(e)}"
+@mcp.resource("metrics://mcp-pool")
+def get_mcp_pool_stats() -> str:
+    """
+    Per-server MCP pool counters: starts, restarts, uptime, tool calls, identical concurrent calls merged into one request, and upstream scheduler queue depth, wait times and retries.
+    """
+    
+    return json.dumps(pool.stats(), indent=2)
 
-mcp.run()
\ No newline at end of file
+if __name__ == "__main__":
+    mcp.run()
\ No newline at end of file
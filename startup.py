@@ -0,0 +1,88 @@
+"""
+Deferred startup for the agent MCP servers.
+
+MCP clients launch these servers on demand, so the time to answer
+`initialize` and `tools/list` is on the user's critical path. Those only
+need the tool declarations; the agents, their Gemini models (and the
+google-genai import behind them) and the telemetry configuration are only
+needed to run a tool. Each script registers that setup as a `Deferred` and
+installs `DeferredStartup`, which builds it on the first tool call or
+resource read:
+
+    @deferred
+    def build_agents() -> None:
+        global my_agent
+        my_agent = Agent(...)
+
+    mcp.add_middleware(DeferredStartup(telemetry, build_agents))
+
+Tool bodies keep using the module globals the builder assigns. Code that
+drives the tools directly (benchmarks, scripts) calls `complete()` first.
+"""
+
+import threading
+from typing import Any, Callable, List
+
+from fastmcp.server.middleware import Middleware
+
+_registered: List["Deferred"] = []
+
+
+class Deferred:
+    """Setup run once, on first use, from whichever thread or task needs it first."""
+
+    def __init__(self, build: Callable[[], Any]):
+        self.build = build
+        self.name = getattr(build, "__qualname__", repr(build))
+        self.built = False
+        self._value: Any = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        if not self.built:
+            with self._lock:
+                if not self.built:
+                    self._value = self.build()
+                    self.built = True
+        return self._value
+
+
+def deferred(build: Callable[[], Any]) -> Deferred:
+    """Register `build` to run on the first tool call instead of at import."""
+    setup = Deferred(build)
+    _registered.append(setup)
+    return setup
+
+
+def complete() -> None:
+    """Run every registered deferred setup now."""
+    for setup in list(_registered):
+        setup.get()
+
+
+@deferred
+def telemetry() -> None:
+    """Logfire configuration and pydantic-ai instrumentation, shared by every agent module in the process."""
+    import logfire
+
+    logfire.configure()
+    logfire.instrument_pydantic_ai()
+
+
+class DeferredStartup(Middleware):
+    """Builds the given deferred setups before the first tool call or resource read."""
+
+    def __init__(self, *setups: Deferred):
+        self.setups = setups
+
+    def _complete(self) -> None:
+        for setup in self.setups:
+            setup.get()
+
+    async def on_call_tool(self, context: Any, call_next: Callable[[Any], Any]) -> Any:
+        self._complete()
+        return await call_next(context)
+
+    async def on_read_resource(self, context: Any, call_next: Callable[[Any], Any]) -> Any:
+        self._complete()
+        return await call_next(context)
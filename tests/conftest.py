@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Module-level caches live under CACHE_DIR; keep them out of the user's cache
+os.environ.setdefault("KNOWLEDGE_AGENTS_CACHE_DIR", tempfile.mkdtemp(prefix="knowledge-agents-tests-"))
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import threading
+
+from citation_graph import CitationGraph, citation_context
+from evidence import EvidenceRecord
+from paper_store import PaperStore
+
+
+def test_citation_context_labels_evidence_links_and_co_citations(tmp_path):
+    graph = CitationGraph(tmp_path / "graph")
+    # a cites b; c and d are each cited together with a by three papers
+    graph.add_edges([("a", "b")] + [(f"citing{n}", target) for n in range(3) for target in ("a", "c")] + [("citing0", "d")])
+    store = PaperStore(tmp_path / "papers.sqlite")
+    store.add([{"paperId": "c", "title": "Co-cited survey", "year": 2020}])
+    records = [EvidenceRecord(source="semantic_scholar", id=paper_id, title=paper_id) for paper_id in ("a", "b")]
+
+    context = citation_context(records, graph, store)
+    assert "[E1] cites [E2]" in context
+    assert "Most often cited together with [E1]: Co-cited survey (2020) (3x); d (1x)" in context
+
+
+def test_citation_context_is_empty_for_unknown_papers(tmp_path):
+    records = [EvidenceRecord(source="semantic_scholar", id="unknown", title="Unknown"), EvidenceRecord(source="web", id="https://example.org", title="Page")]
+
+    assert citation_context(records, CitationGraph(tmp_path / "graph"), PaperStore(tmp_path / "papers.sqlite")) == ""
+
+
+def test_capture_adds_edges_in_a_worker_thread(tmp_path, monkeypatch):
+    graph = CitationGraph(tmp_path / "graph", merge_every=1)
+    merged_on = []
+    merge = graph.merge
+
+    def recording_merge():
+        merged_on.append(threading.current_thread())
+        return merge()
+
+    monkeypatch.setattr(graph, "merge", recording_merge)
+
+    async def call_tool(name, tool_args, metadata=None):
+        return json.dumps({"data": [{"paperId": "citing", "title": "Citing paper"}]})
+
+    asyncio.run(graph.capture()(None, call_tool, "papers-citations", {"paperId": "cited"}))
+
+    assert graph.subgraph(["citing", "cited"]) == [("citing", "cited")]
+    assert merged_on and merged_on[0] is not threading.main_thread()
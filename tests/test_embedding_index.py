@@ -0,0 +1,53 @@
+import asyncio
+import threading
+
+import embedding_index
+from embedding_index import EmbeddingIndex, HashingEmbedder, semantic_answers, semantic_search
+from paper_store import PaperStore
+
+
+class MeaningEmbedder(HashingEmbedder):
+    """The hashing embedder, trusted like a sentence embedding model."""
+
+    answers_queries = True
+
+
+def build_index(tmp_path, embedder) -> EmbeddingIndex:
+    store = PaperStore(tmp_path / "papers.sqlite")
+    store.add([
+        {"paperId": "a", "title": "Solid-state battery electrolytes", "abstract": "Ceramic electrolytes for lithium batteries.", "year": 2024},
+        {"paperId": "b", "title": "Protein folding with transformers", "abstract": "Structure prediction.", "year": 2023},
+    ])
+    return EmbeddingIndex(tmp_path / "index", embedder=embedder, store=store)
+
+
+def test_hashing_embedder_does_not_answer_for_semantic_scholar(tmp_path):
+    index = build_index(tmp_path, HashingEmbedder())
+
+    search = asyncio.run(semantic_search(["solid-state battery electrolytes"], limit=1, index=index))
+    answers = asyncio.run(semantic_answers(["solid-state battery electrolytes"], limit=1, index=index))
+    assert [paper["paperId"] for paper in search[0]] == ["a"]
+    assert answers == [[]]
+
+
+def test_meaning_embedder_answers_for_semantic_scholar(tmp_path):
+    index = build_index(tmp_path, MeaningEmbedder())
+
+    answers = asyncio.run(semantic_answers(["solid-state battery electrolytes"], limit=1, index=index))
+    assert [paper["paperId"] for paper in answers[0]] == ["a"]
+
+
+def test_embedder_is_loaded_off_the_event_loop(tmp_path, monkeypatch):
+    loaded_on = []
+
+    def default_embedder():
+        loaded_on.append(threading.current_thread())
+        return MeaningEmbedder()
+
+    monkeypatch.setattr(embedding_index, "default_embedder", default_embedder)
+    index = build_index(tmp_path, None)
+
+    answers = asyncio.run(semantic_answers(["solid-state battery electrolytes"], limit=1, index=index))
+
+    assert [paper["paperId"] for paper in answers[0]] == ["a"]
+    assert loaded_on and loaded_on[0] is not threading.main_thread()
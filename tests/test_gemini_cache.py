@@ -0,0 +1,65 @@
+import asyncio
+from types import SimpleNamespace
+
+from google.genai import errors
+
+from gemini_cache import GeminiContextCache
+from innovation_breakthrough_agent import INNOVATION_REQUEST_INSTRUCTIONS, system_prompt
+
+MODEL = "gemini-2.5-pro"
+
+
+class Caches:
+    """`client.aio.caches` recording the cached contents created."""
+
+    def __init__(self, error=None):
+        self.created = []
+        self.error = error
+
+    async def create(self, model, config):
+        self.created.append((model, config))
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(name=f"cachedContents/{len(self.created)}")
+
+
+def client(caches: Caches):
+    return SimpleNamespace(aio=SimpleNamespace(caches=caches))
+
+
+def innovation_config():
+    # The static prefix of the pro innovation agent before any tool declarations
+    return {"system_instruction": "\n\n".join([system_prompt, INNOVATION_REQUEST_INSTRUCTIONS]), "temperature": 0.2}
+
+
+def test_innovation_agent_prefix_reaches_caches_create():
+    caches = Caches()
+    cache = GeminiContextCache()
+
+    name = asyncio.run(cache.cached_content(client(caches), MODEL, innovation_config()))
+
+    assert name == "cachedContents/1"
+    assert [model for model, _ in caches.created] == [MODEL]
+    assert caches.created[0][1]["system_instruction"] == innovation_config()["system_instruction"]
+    assert "temperature" not in caches.created[0][1]
+
+
+def test_prefix_rejected_by_gemini_is_not_offered_again():
+    caches = Caches(error=errors.ClientError(400, {"error": {"code": 400, "message": "Cached content is too small", "status": "INVALID_ARGUMENT"}}))
+    cache = GeminiContextCache(retry_after=0)
+
+    first = asyncio.run(cache.cached_content(client(caches), MODEL, innovation_config()))
+    second = asyncio.run(cache.cached_content(client(caches), MODEL, innovation_config()))
+
+    assert first is None and second is None
+    assert len(caches.created) == 1
+    assert cache.stats()["cache_failures"] == 1
+
+
+def test_prefix_shorter_than_the_minimum_is_not_offered():
+    caches = Caches()
+
+    name = asyncio.run(GeminiContextCache().cached_content(client(caches), MODEL, {"system_instruction": "Be brief."}))
+
+    assert name is None
+    assert caches.created == []
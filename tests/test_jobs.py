@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from fastmcp import FastMCP
+
+from jobs import JobStore, fail
+
+mcp = FastMCP("jobs-test")
+
+
+@mcp.tool
+async def analyze(topic: str) -> str:
+    """Fails the way the agent tools do: the error is caught and answered as text."""
+    try:
+        raise RuntimeError(f"upstream unavailable for {topic}")
+    except Exception as e:
+        fail(e)
+        return f"Analysis failed: {str(e)}"
+
+
+def test_tool_reporting_its_error_ends_the_job_failed():
+    async def scenario():
+        store = JobStore()
+        job = await store.submit(mcp, "analyze", {"topic": "batteries"}, ["analyze"])
+        return await store.describe(job.id, wait=5)
+
+    snapshot = asyncio.run(scenario())
+
+    assert snapshot["status"] == "failed"
+    assert snapshot["phase"] == "failed"
+    assert snapshot["error"] == "RuntimeError: upstream unavailable for batteries"
+
+
+def test_fail_outside_a_job_is_ignored():
+    fail(RuntimeError("not in a job"))
+
+
+def test_jobs_wait_queued_then_run_to_done():
+    async def scenario():
+        store = JobStore(max_running=1)
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "report"
+
+        first = store.start("analyze", {}, slow)
+        second = store.start("analyze", {}, slow)
+        await asyncio.sleep(0)
+        statuses = [first.status, second.status]
+        release.set()
+        await asyncio.wait_for(second.finished.wait(), timeout=5)
+        return statuses, await store.describe(first.id), await store.describe(second.id)
+
+    statuses, first, second = asyncio.run(scenario())
+
+    assert statuses == ["running", "queued"]
+    assert (first["status"], first["result"], first["error"]) == ("done", "report", None)
+    assert second["status"] == "done"
+
+
+def test_raising_run_fails_and_cancelled_run_is_cancelled():
+    async def scenario():
+        store = JobStore()
+
+        async def broken():
+            raise ValueError("bad response")
+
+        async def forever():
+            await asyncio.Event().wait()
+
+        failed = store.start("analyze", {}, broken)
+        cancelled = store.start("analyze", {}, forever)
+        await asyncio.sleep(0)
+        cancelled.task.cancel()
+        await asyncio.wait_for(asyncio.gather(failed.finished.wait(), cancelled.finished.wait()), timeout=5)
+        return failed.snapshot(), cancelled.snapshot(), store.stats()
+
+    failed, cancelled, stats = asyncio.run(scenario())
+
+    assert (failed["status"], failed["error"]) == ("failed", "ValueError: bad response")
+    assert cancelled["status"] == "cancelled"
+    assert stats["jobs"] == {"failed": 1, "cancelled": 1}
+
+
+def test_max_pending_refuses_and_finished_jobs_are_evicted_oldest_first():
+    async def scenario():
+        store = JobStore(max_pending=1, max_finished=1)
+
+        async def done():
+            return "report"
+
+        first = store.start("analyze", {}, done)
+        with pytest.raises(ValueError, match="1 jobs are already queued or running"):
+            store.start("analyze", {}, done)
+        await first.finished.wait()
+        second = store.start("analyze", {}, done)
+        await second.finished.wait()
+        return await store.describe(first.id), await store.describe(second.id), store.evicted
+
+    first, second, evicted = asyncio.run(scenario())
+
+    assert first["status"] == "unknown"
+    assert second["status"] == "done"
+    assert evicted == 1
+
+
+def test_submit_checks_tool_and_argument_names():
+    async def scenario():
+        store = JobStore()
+        errors = []
+        for tool, arguments in [("missing", {}), ("analyze", {}), ("analyze", {"topic": "x", "depth": "surface"})]:
+            try:
+                await store.submit(mcp, tool, arguments, ["analyze"])
+            except ValueError as e:
+                errors.append(str(e))
+        return errors
+
+    errors = asyncio.run(scenario())
+
+    assert errors == [
+        "'missing' does not run as a job, expected one of analyze",
+        "analyze requires topic",
+        "analyze takes no argument depth",
+    ]
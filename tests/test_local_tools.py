@@ -0,0 +1,10 @@
+from local_tools import local_papers_toolset
+
+
+def test_local_papers_offers_every_local_tool():
+    assert sorted(local_papers_toolset().tools) == [
+        "citations-local-neighborhood",
+        "citations-local-related",
+        "papers-search-local",
+        "papers-search-semantic",
+    ]
@@ -0,0 +1,32 @@
+import asyncio
+
+import knowledge_synthesizer
+from evidence import EvidenceBundle, EvidenceRecord
+from execution_profiles import PROFILES
+from knowledge_synthesizer import retrieve_evidence
+from tool_cache import ToolResultMemo
+
+PAPER = EvidenceRecord(source="semantic_scholar", id="p1", title="Halide solid electrolytes", year=2025)
+
+
+def test_failed_retrieval_is_not_memoized(monkeypatch):
+    responses = [
+        EvidenceBundle(queries=["batteries"], records=[], errors=["semantic_scholar: 429 Too Many Requests"]),
+        EvidenceBundle(queries=["batteries"], records=[PAPER]),
+    ]
+    calls = []
+
+    async def gather_evidence(queries, *args, year_start=None, **kwargs):
+        calls.append(year_start)
+        return responses[min(len(calls), len(responses)) - 1]
+
+    monkeypatch.setattr(knowledge_synthesizer, "gather_evidence", gather_evidence)
+    monkeypatch.setattr(knowledge_synthesizer, "tool_results", ToolResultMemo())
+
+    def retrieve() -> EvidenceBundle:
+        return asyncio.run(retrieve_evidence("synthesize_knowledge_domains", ["batteries"], PROFILES["surface"]))
+
+    assert retrieve().errors
+    assert retrieve().records == [PAPER]
+    assert retrieve().records == [PAPER]
+    assert len(calls) == 2
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from mcp_pool import SingleFlight
+
+
+def test_concurrent_calls_are_merged():
+    async def scenario():
+        flight = SingleFlight()
+        sent = []
+
+        async def call():
+            sent.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.call("key", call) for _ in range(5)))
+        assert results == ["result"] * 5
+        # Finished calls are not kept
+        assert await flight.call("key", call) == "result"
+        return flight, sent
+
+    flight, sent = asyncio.run(scenario())
+    assert len(sent) == 2
+    assert (flight.calls, flight.merged) == (6, 4)
+
+
+def test_errors_are_shared_by_default():
+    async def scenario():
+        flight = SingleFlight()
+        sent = []
+
+        async def call():
+            sent.append(1)
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream error")
+
+        results = await asyncio.gather(*(flight.call("key", call) for _ in range(3)), return_exceptions=True)
+        return results, sent
+
+    results, sent = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(sent) == 1
+
+
+def test_kept_results_without_shared_errors():
+    async def scenario():
+        flight = SingleFlight(keep_results=True, share_errors=False)
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            await asyncio.sleep(0.01)
+            if len(attempts) == 1:
+                raise ValueError("first attempt fails")
+            return "result"
+
+        results = await asyncio.gather(*(flight.call("key", flaky) for _ in range(3)), return_exceptions=True)
+        # Kept after the call finished
+        later = await flight.call("key", flaky)
+        return results, later, attempts
+
+    results, later, attempts = asyncio.run(scenario())
+    assert isinstance(results[0], ValueError)
+    assert results[1:] == ["result", "result"]
+    assert later == "result"
+    assert len(attempts) == 2
+
+
+def test_cancelled_first_caller_hands_the_call_to_a_waiter():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def call():
+            await asyncio.sleep(0.05)
+            return "result"
+
+        first = asyncio.ensure_future(flight.call("key", call))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.call("key", call))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "result"
@@ -0,0 +1,88 @@
+import tool_cache
+from tool_cache import ToolResponseCache
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_response_cache_serves_until_ttl(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tool_cache.time, "time", clock)
+    cache = ToolResponseCache(tmp_path / "cache.sqlite", ttls={"papers-get": 60})
+
+    assert cache.put("papers-get", {"paperId": "a"}, {"title": "A"})
+    assert cache.get("papers-get", {"paperId": "a"})[:2] == (True, {"title": "A"})
+
+    clock.now += 59
+    assert cache.get("papers-get", {"paperId": "a"})[0]
+    clock.now += 2
+    assert cache.get("papers-get", {"paperId": "a"})[:2] == (False, None)
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_response_cache_normalizes_arguments(tmp_path):
+    cache = ToolResponseCache(tmp_path / "cache.sqlite")
+
+    cache.put("papers-search-basic", {"query": "graph  networks", "limit": 5, "year": None}, ["hit"])
+    assert cache.get("papers-search-basic", {"limit": 5, "query": " graph networks "})[:2] == (True, ["hit"])
+
+
+def test_response_cache_skips_uncacheable_tools_and_values(tmp_path):
+    cache = ToolResponseCache(tmp_path / "cache.sqlite", ttls={"papers-live": 0})
+
+    assert not cache.put("papers-live", {}, "value")
+    assert not cache.put("papers-get", {}, object())
+    assert cache.stats()["entries"] == 0
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tool_cache.time, "time", clock)
+    cache = ToolResponseCache(tmp_path / "cache.sqlite", max_bytes=250)
+    payload = "x" * 100
+
+    for paper in ("a", "b"):
+        clock.now += 1
+        cache.put("papers-get", {"paperId": paper}, payload)
+    # Reading "a" makes "b" the least recently used
+    clock.now += 1
+    assert cache.get("papers-get", {"paperId": "a"})[0]
+    clock.now += 1
+    cache.put("papers-get", {"paperId": "c"}, payload)
+
+    assert cache.get("papers-get", {"paperId": "a"})[0]
+    assert not cache.get("papers-get", {"paperId": "b"})[0]
+    assert cache.get("papers-get", {"paperId": "c"})[0]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= 250
+
+
+def test_response_cache_evicts_expired_entries_first(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tool_cache.time, "time", clock)
+    cache = ToolResponseCache(tmp_path / "cache.sqlite", ttls={"papers-search-basic": 10}, max_bytes=250)
+    payload = "x" * 100
+
+    cache.put("papers-search-basic", {"query": "old"}, payload)
+    clock.now += 1
+    cache.put("papers-get", {"paperId": "a"}, payload)
+    clock.now += 20
+    cache.put("papers-get", {"paperId": "b"}, payload)
+
+    assert cache.get("papers-get", {"paperId": "a"})[0]
+    assert cache.get("papers-get", {"paperId": "b"})[0]
+    assert cache.stats()["entries"] == 2
+
+
+def test_response_cache_persists_across_instances(tmp_path):
+    ToolResponseCache(tmp_path / "cache.sqlite").put("papers-get", {"paperId": "a"}, {"title": "A"})
+
+    reopened = ToolResponseCache(tmp_path / "cache.sqlite")
+    assert reopened.get("papers-get", {"paperId": "a"})[:2] == (True, {"title": "A"})
+    assert reopened.stats()["bytes"] > 0
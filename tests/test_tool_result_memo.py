@@ -0,0 +1,93 @@
+import asyncio
+
+from pydantic import BaseModel
+
+import tool_cache
+from tool_cache import ToolResultMemo
+
+
+class Report(BaseModel):
+    text: str
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run(memo: ToolResultMemo, args: dict, text: str, **options) -> Report:
+    async def produce() -> Report:
+        return Report(text=text)
+
+    return asyncio.run(memo.get_or_run("brief", args, Report, produce, **options))
+
+
+def test_memo_serves_equivalent_requests():
+    memo = ToolResultMemo(ttls={"brief": 60})
+
+    assert run(memo, {"topic": "Fusion", "stakeholders": ["b", "A"]}, "first", unordered=["stakeholders"], casefold=["topic"]).text == "first"
+    assert run(memo, {"topic": "fusion ", "stakeholders": ["a", "B", "a"]}, "second", unordered=["stakeholders"], casefold=["topic"]).text == "first"
+    assert run(memo, {"topic": "fusion", "stakeholders": ["a", "b"]}, "third", force_refresh=True).text == "third"
+
+
+def test_memo_expires_after_ttl(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tool_cache.time, "time", clock)
+    memo = ToolResultMemo(ttls={"brief": 60})
+
+    assert run(memo, {"topic": "fusion"}, "first").text == "first"
+    clock.now += 59
+    assert run(memo, {"topic": "fusion"}, "second").text == "first"
+    clock.now += 2
+    assert run(memo, {"topic": "fusion"}, "third").text == "third"
+
+
+def test_memo_disk_hit_keeps_stored_expiry(tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tool_cache.time, "time", clock)
+    path = tmp_path / "results.sqlite"
+    assert run(ToolResultMemo(ttls={"brief": 60}, path=path), {"topic": "fusion"}, "first").text == "first"
+
+    # A restarted server reads the result back from disk late in its TTL...
+    clock.now += 50
+    restarted = ToolResultMemo(ttls={"brief": 60}, path=path)
+    assert run(restarted, {"topic": "fusion"}, "second").text == "first"
+    assert restarted.stats()["tools"]["brief"]["disk_hits"] == 1
+    # ...and must not serve it from memory beyond the original expiry
+    clock.now += 11
+    assert run(restarted, {"topic": "fusion"}, "third").text == "third"
+
+
+def test_memo_does_not_store_failed_runs(tmp_path):
+    memo = ToolResultMemo(ttls={"brief": 60}, path=tmp_path / "results.sqlite")
+
+    async def fail() -> Report:
+        raise RuntimeError("upstream down")
+
+    try:
+        asyncio.run(memo.get_or_run("brief", {"topic": "fusion"}, Report, fail))
+    except RuntimeError:
+        pass
+    assert run(memo, {"topic": "fusion"}, "retried").text == "retried"
+
+
+def test_memo_lru_is_bounded():
+    memo = ToolResultMemo(ttls={"brief": 60}, max_entries=2)
+
+    for topic in ("a", "b", "c"):
+        run(memo, {"topic": topic}, topic)
+    assert memo.stats()["memory_entries"] == 2
+    assert run(memo, {"topic": "a"}, "recomputed").text == "recomputed"
+
+
+def test_memo_skips_outputs_cacheable_rejects(tmp_path):
+    memo = ToolResultMemo(ttls={"brief": 60}, path=tmp_path / "memo.sqlite")
+    complete = lambda report: report.text != "partial"
+
+    assert run(memo, {"topic": "fusion"}, "partial", cacheable=complete).text == "partial"
+    assert run(memo, {"topic": "fusion"}, "full", cacheable=complete).text == "full"
+    assert run(memo, {"topic": "fusion"}, "later", cacheable=complete).text == "full"
+    assert memo.misses["brief"] == 2
@@ -0,0 +1,29 @@
+import json
+
+from trend_signals import compute_signals
+
+FIELDS = json.dumps(["Physics"])
+
+
+def test_latest_ignores_papers_dated_after_today():
+    rows = [
+        ("Quantum error correction codes", 2024, "2024-03-15", FIELDS),
+        ("Quantum error correction decoders", 2024, "2024-05-02", FIELDS),
+        # Announced ahead of its publication date
+        ("Quantum error correction hardware", 2025, "2025-01-10", FIELDS),
+    ]
+
+    signals = compute_signals(rows, "quantum", granularity="month", today=(2024, 6))
+
+    assert signals.latest == "2024-05-02"
+    assert signals.papers == 2
+
+
+def test_latest_falls_back_to_years_up_to_today():
+    rows = [
+        ("Graph neural networks", 2022, None, FIELDS),
+        ("Graph transformers", 2023, None, FIELDS),
+        ("Graph foundation models", 2031, None, FIELDS),
+    ]
+
+    assert compute_signals(rows, "graph", granularity="year", today=(2024, 1)).latest == "2023"
@@ -0,0 +1,123 @@
+import asyncio
+import json
+
+import pytest
+from pydantic_ai import Agent
+from pydantic_ai.models.test import TestModel
+
+import knowledge_synthesizer
+from evidence import EvidenceBundle, EvidenceRecord, gather_evidence
+from execution_profiles import PROFILES
+from knowledge_synthesizer import TrendAnalysis, analyze_trends, update_trends
+from report_streaming import SectionStreamer
+from trend_signals import TrendSignals
+from trend_watch import TrendWatch
+
+DOMAIN = "solid-state batteries"
+PREVIOUS = TrendAnalysis(
+    trend_summary="Sulfide electrolytes lead.",
+    emerging_patterns=["sulfide electrolytes", "dry electrode processing"],
+    trend_trajectories={"sulfide electrolytes": "rising"},
+    disruption_indicators=[],
+    convergence_signals=[],
+    weak_signals=[],
+    scenario_projections=[],
+    influence_factors=[],
+    prediction_confidence={"sulfide electrolytes": 0.7},
+    monitoring_recommendations=[],
+)
+NEW_PAPER = EvidenceRecord(source="semantic_scholar", id="p1", title="Halide solid electrolytes", published="2025-03-01", year=2025)
+
+
+class RecordingStreamer(SectionStreamer):
+    """A non-streaming SectionStreamer that remembers the prompts it ran."""
+
+    def __init__(self):
+        super().__init__(None)
+        self.prompts = []
+
+    async def run(self, agent, prompt, **run_options):
+        self.prompts.append(prompt)
+        return await super().run(agent, prompt, **run_options)
+
+
+@pytest.fixture
+def watch(tmp_path, monkeypatch):
+    watch = TrendWatch(tmp_path / "trends")
+    signals = TrendSignals(query=DOMAIN, granularity="year", periods=[], papers=0, terms=0, signals=[], latest="2025-03-01")
+
+    async def gather_evidence(queries, *args, **kwargs):
+        return EvidenceBundle(queries=queries, records=[NEW_PAPER])
+
+    monkeypatch.setattr(knowledge_synthesizer, "trend_watch", watch)
+    monkeypatch.setattr(knowledge_synthesizer, "trend_signals", lambda store, domain: signals)
+    monkeypatch.setattr(knowledge_synthesizer, "gather_evidence", gather_evidence)
+    monkeypatch.setattr(knowledge_synthesizer, "trend_agent", Agent(TestModel(), output_type=TrendAnalysis), raising=False)
+    return watch, signals
+
+
+def use_model(monkeypatch, output):
+    model = TestModel(custom_output_args=output)
+    monkeypatch.setattr(knowledge_synthesizer, "profile_models", {name: model for name in PROFILES}, raising=False)
+
+
+def test_update_replaces_returned_fields_through_the_section_streamer(watch, monkeypatch):
+    watch, signals = watch
+    state = watch.record(DOMAIN, signals.model_copy(update={"latest": "2024-12-01"}), PREVIOUS)
+    use_model(monkeypatch, {"emerging_patterns": ["halide electrolytes"]})
+    sections = RecordingStreamer()
+
+    analysis = asyncio.run(update_trends(DOMAIN, "short-term", [], state, sections, PROFILES["surface"]))
+
+    assert len(sections.prompts) == 1
+    assert "replaces the previous one entirely" in sections.prompts[0]
+    assert analysis.emerging_patterns == ["halide electrolytes"]
+    assert analysis.trend_summary == PREVIOUS.trend_summary
+    saved = watch.get(DOMAIN)
+    assert saved.runs == 2
+    assert saved.watermark == "2025-03-01"
+    assert saved.analysis["emerging_patterns"] == ["halide electrolytes"]
+
+
+def test_analyze_trends_leaves_the_domain_state_alone(watch, monkeypatch):
+    watch, _ = watch
+    use_model(monkeypatch, PREVIOUS.model_dump())
+    evidence = EvidenceBundle(queries=[DOMAIN], records=[NEW_PAPER])
+
+    analysis, signals = asyncio.run(analyze_trends("build_knowledge_dossier", "TREND REQUEST", DOMAIN, evidence, SectionStreamer(None), PROFILES["surface"]))
+
+    assert analysis == PREVIOUS
+    assert signals.latest == "2025-03-01"
+    assert watch.get(DOMAIN) is None
+
+
+class SemanticScholar:
+    """`papers-search-advanced` over fixed papers, in relevance order unless sorted by citation count."""
+
+    def __init__(self, papers):
+        self.papers = papers
+
+    async def call(self, tool, args):
+        papers = [paper for paper in self.papers if paper["year"] >= args.get("yearStart", 0)]
+        if args["sortBy"] == "citationCount":
+            papers = sorted(papers, key=lambda paper: -paper["citationCount"])
+        return json.dumps({"data": papers[:args["limit"]]})
+
+
+def test_update_finds_new_papers_a_citation_sorted_search_would_miss(watch, monkeypatch):
+    watch, signals = watch
+    state = watch.record(DOMAIN, signals.model_copy(update={"latest": "2024-06-01"}), PREVIOUS)
+    older = [{"paperId": f"old{n}", "title": f"Sulfide electrolyte study {n}", "year": 2024, "publicationDate": "2024-03-01", "citationCount": 50 + n} for n in range(10)]
+    newer = [{"paperId": f"new{n}", "title": f"Halide electrolyte preprint {n}", "year": 2024, "publicationDate": "2024-11-01", "citationCount": 0} for n in range(2)]
+    # Relevant, but past the first `per_query` results and behind every older paper by citations
+    papers = older[:6] + [newer[0]] + older[6:8] + [newer[1]] + older[8:]
+    monkeypatch.setattr(knowledge_synthesizer, "gather_evidence", gather_evidence)
+    monkeypatch.setattr(knowledge_synthesizer, "semantic_scholar", SemanticScholar(papers))
+    use_model(monkeypatch, {"emerging_patterns": ["halide electrolytes"]})
+    sections = RecordingStreamer()
+
+    asyncio.run(update_trends(DOMAIN, "short-term", [], state, sections, PROFILES["surface"]))
+
+    assert "NO NEW PUBLICATIONS" not in sections.prompts[0]
+    assert "Halide electrolyte preprint 0" in sections.prompts[0]
+    assert "Halide electrolyte preprint 1" in sections.prompts[0]
@@ -0,0 +1,57 @@
+from evidence import EvidenceRecord
+from trend_signals import TrendSignal, TrendSignals
+from trend_watch import GROWTH_CHANGE, newer_than, signal_changes
+
+
+def record(id, published=None, year=None) -> EvidenceRecord:
+    return EvidenceRecord(source="semantic_scholar", id=id, title=id, published=published, year=year)
+
+
+def signal(term, trajectory="rising", growth=1.0) -> TrendSignal:
+    return TrendSignal(term=term, kind="term", papers=10, recent_papers=5, growth=growth, acceleration=0.0, burst=0.0, trajectory=trajectory, weak_signal=False, series=[1, 2, 3])
+
+
+def signals(rising, declining=()) -> TrendSignals:
+    return TrendSignals(query="batteries", granularity="year", periods=[], papers=0, terms=0, signals=list(rising), declining=list(declining))
+
+
+def test_newer_than_keeps_records_after_the_watermark():
+    records = [
+        record("before", published="2024-03-01"),
+        record("same day", published="2024-05-02"),
+        record("after", published="2024-05-03"),
+        record("same year only", year=2024),
+        record("later year only", year=2025),
+        record("undated"),
+    ]
+
+    assert [r.id for r in newer_than(records, "2024-05-02")] == ["after", "later year only"]
+
+
+def test_newer_than_without_a_watermark_keeps_everything():
+    records = [record("a", published="2020-01-01"), record("b")]
+
+    assert newer_than(records, None) == records
+
+
+def test_signal_changes_reports_new_moved_and_faded_signals():
+    previous = [signal("sulfide electrolytes"), signal("anode-free cells", growth=1.0), signal("lithium metal"), signal("dry electrodes", growth=1.0)]
+    current = signals(
+        [signal("halide electrolytes", trajectory="emerging"), signal("anode-free cells", growth=1.0 + GROWTH_CHANGE), signal("dry electrodes", growth=1.2)],
+        declining=[signal("lithium metal", trajectory="declining", growth=-1.0)],
+    )
+
+    changes = signal_changes(previous, current)
+
+    assert [change.split(":")[0] for change in changes] == [
+        "NEW halide electrolytes",
+        "MOVED anode-free cells",
+        "MOVED lithium metal",
+        "FADED sulfide electrolytes",
+    ]
+
+
+def test_signal_changes_is_empty_when_nothing_moved():
+    previous = [signal("sulfide electrolytes")]
+
+    assert signal_changes(previous, signals(previous)) == []
@@ -0,0 +1,354 @@
+"""
+Content-addressed on-disk cache for MCP tool responses.
+
+Responses are stored in a local SQLite file keyed on the tool name plus
+normalized arguments, so repeated or overlapping research (the same search
+issued by several agents, or again a day later) is answered from disk
+instead of hitting the upstream API and its rate limits.
+
+The cache plugs into any `MCPServerStdio` through `process_tool_call`, so it
+works the same against the Smithery Semantic Scholar server and against a
+local stand-in server:
+
+    semantic_scholar = pool.server(
+        "semantic_scholar", "npx", args=[...],
+        process_tool_call=semantic_scholar_cache.process_tool_call,
+    )
+
+`ToolResultMemo` sits one level higher and memoizes the structured output
+of a whole agent run behind an `@mcp.tool`, so a brief or trend analysis
+re-requested with equivalent arguments is rendered from the memo in
+milliseconds instead of re-running the agent.
+
+`shared_lookups()` scopes a `SingleFlight` table (mcp_pool.py) over a batch
+of concurrent agent runs: identical calls made by different runs of the
+batch go upstream once, including calls that are still in flight.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple, Type, TypeVar
+
+import logfire
+from pydantic import BaseModel
+
+from mcp_pool import CACHE_DIR, SingleFlight
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+OutputT = TypeVar("OutputT", bound=BaseModel)
+
+# Per-tool TTLs for the Semantic Scholar MCP server. Citation counts move,
+# reference lists of a published paper do not.
+SEMANTIC_SCHOLAR_TTLS: Dict[str, float] = {
+    "papers-search-basic": 1 * DAY,
+    "papers-search-advanced": 1 * DAY,
+    "papers-match": 7 * DAY,
+    "papers-get": 7 * DAY,
+    "papers-batch": 7 * DAY,
+    "papers-citations": 3 * DAY,
+    "papers-references": 30 * DAY,
+    "authors-search": 7 * DAY,
+    "authors-papers": 3 * DAY,
+}
+
+
+_shared_lookups: ContextVar[Optional[SingleFlight]] = ContextVar("tool_cache_shared_lookups", default=None)
+
+
+@contextmanager
+def shared_lookups():
+    """Share identical cached-tool calls between all agent runs started inside this block.
+
+    The first run to make a call performs it; identical calls from other runs
+    wait for and reuse its result, also after it finished. A failed call is
+    not shared, so waiters retry it themselves.
+    """
+    lookups = SingleFlight(keep_results=True, share_errors=False)
+    token = _shared_lookups.set(lookups)
+    try:
+        yield lookups
+    finally:
+        _shared_lookups.reset(token)
+
+
+def normalize_args(value: Any) -> Any:
+    """Canonical form of tool arguments: sorted keys, no nulls, collapsed whitespace."""
+    if isinstance(value, dict):
+        return {key: normalize_args(value[key]) for key in sorted(value) if value[key] is not None}
+    if isinstance(value, (list, tuple)):
+        return [normalize_args(item) for item in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def cache_key(tool_name: str, args: Dict[str, Any]) -> Tuple[str, str]:
+    """Content address of a tool call, plus the canonical argument JSON it was derived from."""
+    canonical = json.dumps(normalize_args(args), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{tool_name}\0{canonical}".encode()).hexdigest(), canonical
+
+
+class ToolResponseCache:
+    """SQLite cache of MCP tool responses with per-tool TTLs and size-based LRU eviction.
+
+    Only JSON-serializable responses (text, dicts, lists) are cached; errors
+    are never cached because they surface as exceptions from the tool call.
+
+    Args:
+        path: SQLite file to store responses in
+        ttls: Seconds each tool's responses stay fresh, by tool name
+        default_ttl: TTL for tools not listed in `ttls`; 0 disables caching for them
+        max_bytes: Total response size kept on disk before least recently used entries are evicted
+    """
+
+    def __init__(self, path: Path, ttls: Optional[Dict[str, float]] = None, default_ttl: float = DAY, max_bytes: int = 256 * 1024 * 1024):
+        self.path = Path(path)
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    tool TEXT NOT NULL,
+                    args TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+            db.commit()
+            self._total_bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            self._db = db
+        return self._db
+
+    def ttl_for(self, tool_name: str) -> float:
+        return self.ttls.get(tool_name, self.default_ttl)
+
+    def get(self, tool_name: str, args: Dict[str, Any]) -> Tuple[bool, Any, float]:
+        """Look up a fresh response. Returns `(hit, value, expires_at)`."""
+        key, _ = cache_key(tool_name, args)
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            row = db.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= now:
+                self.misses[tool_name] += 1
+                return False, None, 0.0
+            db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            db.commit()
+        self.hits[tool_name] += 1
+        return True, json.loads(row[0]), row[1]
+
+    def put(self, tool_name: str, args: Dict[str, Any], value: Any) -> bool:
+        """Store a response. Returns False if the tool is not cacheable or the value is not JSON."""
+        ttl = self.ttl_for(tool_name)
+        if ttl <= 0:
+            return False
+        try:
+            payload = json.dumps(value, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return False
+        key, canonical = cache_key(tool_name, args)
+        size = len(payload.encode())
+        if size > self.max_bytes:
+            return False
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            old = db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, tool_name, canonical, payload, size, now, now + ttl, now),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict(db, now)
+            db.commit()
+        return True
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then least recently used ones until under `max_bytes`."""
+        expired = db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses WHERE expires_at <= ?", (now,)).fetchone()
+        db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        self.evictions += expired[0]
+        self._total_bytes -= expired[1]
+        if self._total_bytes <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if self._total_bytes <= self.max_bytes:
+                break
+            doomed.append((key,))
+            self._total_bytes -= size
+        db.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._connect()
+            db.execute("DELETE FROM responses")
+            db.commit()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters overall and per tool, plus on-disk usage."""
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "tools": {
+                tool: {"hits": self.hits[tool], "misses": self.misses[tool]}
+                for tool in sorted(set(self.hits) | set(self.misses))
+            },
+        }
+
+    async def process_tool_call(self, ctx: Any, call_tool: Any, name: str, tool_args: Dict[str, Any]) -> Any:
+        """`MCPServerStdio.process_tool_call` hook that serves cached responses."""
+        if self.ttl_for(name) > 0:
+            hit, value, _ = self.get(name, tool_args)
+            if hit:
+                logfire.debug("tool cache hit {tool}", tool=name)
+                return value
+
+        async def call() -> Any:
+            result = await call_tool(name, tool_args, None)
+            self.put(name, tool_args, result)
+            return result
+
+        lookups = _shared_lookups.get()
+        if lookups is not None:
+            return await lookups.call(cache_key(name, tool_args)[0], call)
+        return await call()
+
+
+class ToolResultMemo:
+    """Memoizes the structured agent output behind each `@mcp.tool`.
+
+    Entries live in an in-memory LRU and, when `path` is given, in a SQLite
+    `ToolResponseCache` so they survive server restarts. Only successful runs
+    are stored; a run that raises, or whose output `cacheable` rejects, is
+    never memoized.
+
+    Args:
+        ttls: Seconds each tool's results stay fresh, by tool name
+        default_ttl: TTL for tools not listed in `ttls`
+        max_entries: Size of the in-memory LRU
+        path: Optional SQLite file for the persistent backend
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 6 * HOUR, max_entries: int = 256, path: Optional[Path] = None):
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.backend = ToolResponseCache(path, ttls=self.ttls, default_ttl=default_ttl) if path else None
+        self.memory_hits: Counter = Counter()
+        self.disk_hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self._lru: "OrderedDict[str, Tuple[float, BaseModel]]" = OrderedDict()
+
+    @staticmethod
+    def normalize(args: Dict[str, Any], unordered: Iterable[str] = (), casefold: Iterable[str] = ()) -> Dict[str, Any]:
+        """Equivalent-request form of tool arguments.
+
+        Lists named in `unordered` are case-folded, deduplicated and sorted;
+        strings named in `casefold` are case-folded. Whitespace is collapsed
+        everywhere by `normalize_args`.
+        """
+        normalized = dict(args)
+        for name in unordered:
+            if normalized.get(name) is not None:
+                normalized[name] = sorted({" ".join(str(item).split()).casefold() for item in normalized[name]})
+        for name in casefold:
+            if isinstance(normalized.get(name), str):
+                normalized[name] = normalized[name].casefold()
+        return normalize_args(normalized)
+
+    async def get_or_run(
+        self,
+        tool_name: str,
+        args: Dict[str, Any],
+        output_type: Type[OutputT],
+        run: Callable[[], Awaitable[OutputT]],
+        force_refresh: bool = False,
+        unordered: Iterable[str] = (),
+        casefold: Iterable[str] = (),
+        cacheable: Optional[Callable[[OutputT], bool]] = None,
+    ) -> OutputT:
+        """Return the memoized output for equivalent `args`, or await `run()` and memoize it unless `cacheable` rejects it."""
+        args = self.normalize(args, unordered, casefold)
+        key, _ = cache_key(tool_name, args)
+        ttl = self.ttls.get(tool_name, self.default_ttl)
+        now = time.time()
+        if not force_refresh and ttl > 0:
+            cached = self._lru.get(key)
+            if cached is not None and cached[0] > now:
+                self._lru.move_to_end(key)
+                self.memory_hits[tool_name] += 1
+                return cached[1]
+            if self.backend is not None:
+                hit, value, expires_at = self.backend.get(tool_name, args)
+                if hit:
+                    output = output_type.model_validate(value)
+                    # The stored expiry, so a result read back from disk is not served past its TTL
+                    self._remember(key, expires_at, output)
+                    self.disk_hits[tool_name] += 1
+                    return output
+
+        self.misses[tool_name] += 1
+        output = await run()
+        if ttl > 0 and (cacheable is None or cacheable(output)):
+            self._remember(key, time.time() + ttl, output)
+            if self.backend is not None:
+                self.backend.put(tool_name, args, output.model_dump(mode="json"))
+        return output
+
+    def _remember(self, key: str, expires_at: float, output: BaseModel) -> None:
+        self._lru[key] = (expires_at, output)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        tools = sorted(set(self.memory_hits) | set(self.disk_hits) | set(self.misses))
+        return {
+            "memory_entries": len(self._lru),
+            "tools": {
+                tool: {"memory_hits": self.memory_hits[tool], "disk_hits": self.disk_hits[tool], "misses": self.misses[tool]}
+                for tool in tools
+            },
+        }
+
+
+# Shared by every agent that talks to the Semantic Scholar MCP server
+semantic_scholar_cache = ToolResponseCache(CACHE_DIR / "semantic_scholar.sqlite", ttls=SEMANTIC_SCHOLAR_TTLS)
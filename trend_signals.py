@@ -0,0 +1,267 @@
+"""
+Numeric trend engine over the locally stored paper metadata.
+
+`track_emerging_trends` used to leave trajectories, weak signals and
+confidence entirely to the model reading a page of search results.
+`trend_signals` first counts, for every title term and field of study of the
+papers in the local store (paper_store.py) matching the domain, how many
+papers mention it per year or month, as one terms x periods NumPy array.
+All terms are then scored at once:
+
+- growth: log2 ratio of the term's share of papers in the recent periods
+  to its share before them
+- acceleration: slope of the log share over the last few periods minus the
+  slope over the few before
+- burst: largest z-score of a recent period's count above the count the
+  baseline share predicts for that period's volume
+
+Shares rather than counts are compared, so growth of the store itself (or a
+half-finished current period) does not read as a trend. The strongest
+signals are handed to the trend agent as structured evidence through
+`TrendSignals.to_prompt()`.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from concept_graph import title_terms
+from paper_store import PaperStore
+
+if TYPE_CHECKING:
+    import numpy as np
+
+Granularity = Literal["auto", "year", "month"]
+
+# Periods of history kept, and how many of the latest count as "recent"
+HISTORY = {"year": 10, "month": 36}
+RECENT = {"year": 2, "month": 6}
+# Periods in each of the two windows whose slopes give the acceleration
+SLOPE_WINDOW = {"year": 3, "month": 6}
+
+# Monthly series once this share of the papers has a publication date
+MONTHLY_COVERAGE = 0.8
+
+# Terms in fewer papers than this are not scored
+MIN_PAPERS = 3
+# Pseudo-count smoothing the shares of rare terms
+SMOOTHING = 0.5
+# Growth (log2 share ratio) that counts as rising / declining
+GROWTH = 0.5
+# Burst z-score that flags a weak signal in a term with few recent papers
+BURST_Z = 2.0
+WEAK_SIGNAL_PAPERS = 5
+
+# Signals passed to the trend agent
+TOP_SIGNALS = 15
+
+
+class TrendSignal(BaseModel):
+    """Scores of one term's publication time series"""
+    term: str
+    kind: Literal["term", "field"]
+    papers: int
+    recent_papers: int
+    growth: float
+    acceleration: float
+    burst: float
+    trajectory: Literal["emerging", "accelerating", "rising", "steady", "declining"]
+    weak_signal: bool
+    series: List[int]
+
+
+class TrendSignals(BaseModel):
+    """Strongest publication trends among the stored papers on a domain"""
+    query: str
+    granularity: Literal["year", "month"]
+    periods: List[str]
+    papers: int
+    terms: int
+    signals: List[TrendSignal]
+    declining: List[TrendSignal] = []
+    latest: Optional[str] = None
+    seconds: float = 0.0
+
+    def to_prompt(self) -> str:
+        """Compact text form of the signals for a model prompt."""
+        if not self.terms:
+            return f"COMPUTED PUBLICATION TRENDS: not enough stored papers on '{self.query}' to score trends ({self.papers} papers)."
+        lines = [
+            f"COMPUTED PUBLICATION TRENDS ({self.papers} stored papers on '{self.query}', {self.terms} terms scored, "
+            f"{self.granularity}ly counts {self.periods[0]}..{self.periods[-1]}; growth = log2 change of the term's share of papers, "
+            f"recent vs earlier; burst = z-score of a recent {self.granularity} above the earlier rate). Base trend trajectories, "
+            "weak signals and prediction confidence on these numbers:",
+        ]
+        if not self.signals:
+            lines.append("- no term is rising or bursting")
+        for signal in self.signals + self.declining:
+            lines.append(
+                f"- {signal.term}{' (field)' if signal.kind == 'field' else ''}: {signal.trajectory}{', WEAK SIGNAL' if signal.weak_signal else ''}; "
+                f"{signal.papers} papers, {signal.recent_papers} recent; growth {signal.growth:+.2f}, acceleration {signal.acceleration:+.2f}, "
+                f"burst {signal.burst:.1f}; counts {' '.join(map(str, signal.series))}"
+            )
+        return "\n".join(lines)
+
+
+def _period(year: int, published: Optional[str], granularity: str) -> Optional[int]:
+    if granularity == "year":
+        return year
+    if not published or len(published) < 7:
+        return None
+    return int(published[:4]) * 12 + int(published[5:7]) - 1
+
+
+def _label(period: int, granularity: str) -> str:
+    return str(period) if granularity == "year" else f"{period // 12}-{period % 12 + 1:02d}"
+
+
+def slopes(values: np.ndarray) -> np.ndarray:
+    """Least-squares slope of every row of `values` against the column index."""
+    import numpy as np
+    x = np.arange(values.shape[1], dtype=np.float64)
+    x -= x.mean()
+    denominator = (x * x).sum()
+    return values @ x / denominator if denominator else np.zeros(values.shape[0])
+
+
+def compute_signals(
+    rows: Sequence[Tuple[str, Optional[int], Optional[str], str]],
+    query: str,
+    granularity: Granularity = "auto",
+    top: int = TOP_SIGNALS,
+    today: Optional[Tuple[int, int]] = None,
+) -> TrendSignals:
+    """Score the publication time series of every term in `rows` (see `PaperStore.timeline`).
+
+    Args:
+        rows: (title, year, publication date, fields of study JSON) per paper
+        query: Domain the papers were selected by; its own words are not scored
+        granularity: "year", "month", or "auto" (monthly when most papers have a publication date)
+        top: Rising signals returned, plus up to a third as many declining ones
+        today: (year, month) after which papers are ignored; defaults to the current month
+    """
+    import numpy as np
+    import scipy.sparse as sp
+    if granularity == "auto":
+        dated = sum(1 for row in rows if row[2] and len(row[2]) >= 7)
+        granularity = "month" if rows and dated / len(rows) >= MONTHLY_COVERAGE else "year"
+    year, month = today or time.localtime()[:2]
+    # The series ends at the latest period with papers: a store not refreshed for a while has no "recent" gap
+    paper_periods = [_period(paper_year, published, granularity) for _, paper_year, published, _ in rows]
+    last = min(year if granularity == "year" else year * 12 + month - 1, max((period for period in paper_periods if period is not None), default=0))
+    first = last - HISTORY[granularity] + 1
+    recent = RECENT[granularity]
+
+    # Paper x term incidence and paper periods; every paper matched the query, so terms with its words say nothing
+    query_words = set(query.casefold().split())
+    names: List[Tuple[str, str]] = []
+    term_columns: Dict[str, Optional[int]] = {}
+    field_columns: Dict[str, int] = {}
+    field_lists: Dict[str, List[int]] = {}
+    periods, columns, paper_rows = [], [], []
+    for (title, _, _, fields), period in zip(rows, paper_periods):
+        if period is None or not first <= period <= last:
+            continue
+        paper = len(periods)
+        periods.append(period - first)
+        found = set()
+        for term in title_terms(title):
+            if term not in term_columns:
+                term_columns[term] = None if query_words.intersection(term.split()) else len(names)
+                if term_columns[term] is not None:
+                    names.append(("term", term))
+            found.add(term_columns[term])
+        if fields not in field_lists:
+            for field in json.loads(fields or "[]"):
+                if field not in field_columns:
+                    field_columns[field] = len(names)
+                    names.append(("field", field))
+            field_lists[fields] = [field_columns[field] for field in json.loads(fields or "[]")]
+        found.update(field_lists[fields])
+        found.discard(None)
+        columns.extend(found)
+        paper_rows.extend([paper] * len(found))
+
+    labels = [_label(first + offset, granularity) for offset in range(last - first + 1)]
+    # Latest publication seen up to `today`, the watermark of incremental runs (trend_watch.py); a future date would hide every paper before it
+    month_end = f"{year:04d}-{month:02d}"
+    latest = (
+        max((published for _, _, published, _ in rows if published and published[:7] <= month_end), default=None)
+        or max((f"{paper_year}" for _, paper_year, _, _ in rows if paper_year and paper_year <= year), default=None)
+    )
+    if not periods or not names:
+        return TrendSignals(query=query, granularity=granularity, periods=labels, papers=len(periods), terms=0, signals=[], latest=latest)
+    incidence = sp.csr_matrix((np.ones(len(columns)), (paper_rows, columns)), shape=(len(periods), len(names)))
+    membership = sp.csr_matrix((np.ones(len(periods)), (np.arange(len(periods)), periods)), shape=(len(periods), len(labels)))
+
+    supported = np.flatnonzero(np.asarray(incidence.sum(axis=0)).ravel() >= MIN_PAPERS)
+    counts = (incidence[:, supported].T @ membership).toarray()
+    volume = np.asarray(membership.sum(axis=0)).ravel()
+
+    # Growth of the share of papers, recent periods vs the ones before
+    recent_counts, base_counts = counts[:, -recent:].sum(axis=1), counts[:, :-recent].sum(axis=1)
+    recent_volume, base_volume = volume[-recent:].sum(), volume[:-recent].sum()
+    base_share = (base_counts + SMOOTHING) / (base_volume + 2 * SMOOTHING)
+    recent_share = (recent_counts + SMOOTHING) / (recent_volume + 2 * SMOOTHING)
+    growth = np.log2(recent_share / base_share) if base_volume and recent_volume else np.zeros(len(supported))
+
+    # Acceleration: change of the log-share slope between the last two windows
+    window = SLOPE_WINDOW[granularity]
+    log_share = np.log2((counts + SMOOTHING) / (volume + 2 * SMOOTHING))
+    acceleration = slopes(log_share[:, -window:]) - slopes(log_share[:, -2 * window + 1:-window + 1])
+
+    # Burst: recent counts above what the baseline share predicts at each period's volume
+    expected = base_share[:, None] * volume[None, -recent:]
+    burst = ((counts[:, -recent:] - expected) / np.sqrt(expected + 1)).max(axis=1) if base_volume else np.zeros(len(supported))
+
+    emerging = (base_counts == 0) & (recent_counts >= MIN_PAPERS)
+    trajectory = np.where(emerging, "emerging", np.where(growth >= GROWTH, np.where(acceleration > 0, "accelerating", "rising"), np.where(growth <= -GROWTH, "declining", "steady")))
+    weak = (burst >= BURST_Z) & (recent_counts <= WEAK_SIGNAL_PAPERS)
+    score = np.maximum(growth, 0) + np.maximum(burst, 0) / BURST_Z
+
+    def signal(i: int) -> TrendSignal:
+        kind, term = names[supported[i]]
+        return TrendSignal(
+            term=term, kind=kind, papers=int(counts[i].sum()), recent_papers=int(recent_counts[i]),
+            growth=round(float(growth[i]), 3), acceleration=round(float(acceleration[i]), 3), burst=round(float(burst[i]), 2),
+            trajectory=str(trajectory[i]), weak_signal=bool(weak[i]), series=[int(count) for count in counts[i]],
+        )
+
+    def distinct(order: np.ndarray, count: int) -> List[int]:
+        # "quantum", "kernels" and "quantum kernels" in the same papers are one signal: keep the first of terms with near-identical series
+        picked: List[int] = []
+        for i in order:
+            if not any(np.abs(counts[i] - counts[j]).sum() <= 0.2 * counts[j].sum() for j in picked):
+                picked.append(i)
+            if len(picked) == count:
+                break
+        return picked
+
+    candidates = np.isin(trajectory, ["emerging", "accelerating", "rising"]) | weak
+    # Ties (the same papers) go to the longer phrase
+    words = np.array([len(names[column][1].split()) for column in supported])
+    rising = distinct(np.flatnonzero(candidates)[np.lexsort((-words[candidates], -score[candidates]))], top)
+    declining = trajectory == "declining"
+    falling = distinct(np.flatnonzero(declining)[np.lexsort((-words[declining], growth[declining]))], max(1, top // 3))
+    return TrendSignals(
+        query=query,
+        granularity=granularity,
+        periods=labels,
+        papers=len(periods),
+        terms=len(supported),
+        signals=[signal(i) for i in rising],
+        declining=[signal(i) for i in falling],
+        latest=latest,
+    )
+
+
+def trend_signals(store: PaperStore, query: str, granularity: Granularity = "auto", top: int = TOP_SIGNALS, limit: int = 100000) -> TrendSignals:
+    """Trend signals of the stored papers matching `query`."""
+    start = time.perf_counter()
+    signals = compute_signals(store.timeline(query, limit), query, granularity, top)
+    signals.seconds = time.perf_counter() - start
+    return signals
@@ -0,0 +1,137 @@
+"""
+Per-domain state of `track_emerging_trends`, for incremental reruns.
+
+Watchlists run the same domains every week, and each run used to retrieve
+and analyze everything from scratch. After every trend analysis the domain's
+`TrendState` is saved: the latest publication date seen (the watermark),
+the computed trend signals (trend_signals.py) and the analysis itself. An
+incremental run then:
+
+1. searches only for publications from the watermark's year on, and keeps
+   the records published after the watermark (`newer_than`)
+2. rescores the trend signals and lists what moved since the last run
+   (`signal_changes`)
+3. asks the model only for the parts of the previous analysis the new
+   publications and signal changes revise, or skips the model entirely when
+   nothing changed
+
+States are small JSON files, one per domain, replaced atomically.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel
+
+from evidence import EvidenceRecord
+from mcp_pool import CACHE_DIR
+from trend_signals import TrendSignal, TrendSignals
+
+# Growth change (log2 share) that counts as a moved signal
+GROWTH_CHANGE = 0.5
+
+
+class TrendState(BaseModel):
+    """What the last trend analysis of a domain saw and concluded"""
+    domain: str
+    watermark: Optional[str] = None
+    signals: List[TrendSignal] = []
+    analysis: Dict[str, Any] = {}
+    timeframe: str = ""
+    sources: List[str] = []
+    updated_at: float = 0.0
+    runs: int = 0
+
+
+def newer_than(records: Sequence[EvidenceRecord], watermark: Optional[str]) -> List[EvidenceRecord]:
+    """Records published after the watermark; records with only a year count when the year is later."""
+    if not watermark:
+        return list(records)
+    return [
+        record for record in records
+        if (record.published and record.published > watermark) or (not record.published and record.year and record.year > int(watermark[:4]))
+    ]
+
+
+def signal_changes(previous: Sequence[TrendSignal], current: TrendSignals) -> List[str]:
+    """Signals that appeared, disappeared, changed trajectory or moved by `GROWTH_CHANGE` since the previous run."""
+    before = {signal.term: signal for signal in previous}
+    now = {signal.term: signal for signal in current.signals + current.declining}
+    changes = []
+    for term, signal in now.items():
+        old = before.get(term)
+        if old is None:
+            changes.append(f"NEW {term}: {signal.trajectory}{', weak signal' if signal.weak_signal else ''}, growth {signal.growth:+.2f}, burst {signal.burst:.1f}, {signal.recent_papers} recent papers")
+        elif old.trajectory != signal.trajectory or abs(signal.growth - old.growth) >= GROWTH_CHANGE:
+            changes.append(f"MOVED {term}: {old.trajectory} -> {signal.trajectory}, growth {old.growth:+.2f} -> {signal.growth:+.2f}, recent papers {old.recent_papers} -> {signal.recent_papers}")
+    for term, old in before.items():
+        if term not in now:
+            changes.append(f"FADED {term}: was {old.trajectory}, growth {old.growth:+.2f}")
+    return changes
+
+
+class TrendWatch:
+    """JSON state files of the domains under trend tracking.
+
+    Args:
+        directory: Where the state files are kept
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self.incremental_runs = 0
+        self.model_calls_skipped = 0
+
+    def _path(self, domain: str) -> Path:
+        key = " ".join(domain.casefold().split())
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()[:24]}.json"
+
+    def get(self, domain: str) -> Optional[TrendState]:
+        path = self._path(domain)
+        try:
+            return TrendState.model_validate_json(path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def record(self, domain: str, signals: TrendSignals, analysis: BaseModel, timeframe: str = "", sources: Sequence[str] = ()) -> TrendState:
+        """Save the outcome of a trend analysis as the domain's new state."""
+        with self._lock:
+            previous = self.get(domain)
+            state = TrendState(
+                domain=domain,
+                watermark=max(filter(None, [signals.latest, previous.watermark if previous else None]), default=None),
+                signals=signals.signals + signals.declining,
+                analysis=analysis.model_dump(),
+                timeframe=timeframe,
+                sources=list(sources),
+                updated_at=time.time(),
+                runs=(previous.runs if previous else 0) + 1,
+            )
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(domain)
+            partial = path.with_suffix(".partial")
+            partial.write_text(state.model_dump_json())
+            os.replace(partial, path)
+        return state
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in self.directory.glob("*.json"):
+                path.unlink()
+
+    def stats(self) -> Dict[str, Any]:
+        """Tracked domains with their watermarks, and how often incremental runs skipped the model."""
+        domains = []
+        for path in sorted(self.directory.glob("*.json")):
+            state = json.loads(path.read_text())
+            domains.append({"domain": state["domain"], "watermark": state.get("watermark"), "runs": state.get("runs", 0), "updated_at": state.get("updated_at")})
+        return {"domains": domains, "incremental_runs": self.incremental_runs, "model_calls_skipped": self.model_calls_skipped}
+
+
+trend_watch = TrendWatch(CACHE_DIR / "trend_watch")
@@ -0,0 +1,213 @@
+"""
+Rate-limit-aware scheduling of the calls sent to upstream MCP servers.
+
+The research agents ask for 15-20 parallel Semantic Scholar searches at a
+time, and the upstream API answers a burst like that with 429s. An
+`UpstreamScheduler` sits between the agents and one server and:
+
+- paces calls with a token bucket (`rate` per second, bursts of `burst`)
+- caps the number of calls in flight (`max_concurrency`)
+- admits waiting calls by priority, so interactive requests go before
+  batch ones (`call_priority("batch")` marks everything started inside it)
+- retries calls that failed with a 429 or 5xx after a jittered exponential
+  backoff, pausing the whole upstream meanwhile
+
+A throttled call therefore reaches the model as a slower success instead of
+an error. `stats()` reports queue depth, wait times and retries.
+
+    semantic_scholar = pool.server("semantic_scholar", "npx", args=[...], scheduler=semantic_scholar_scheduler)
+"""
+
+import asyncio
+import random
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional
+
+import logfire
+from pydantic_ai.exceptions import ModelRetry
+
+from latency_metrics import RollingHistogram, latency
+
+# Admission order: every waiting interactive call goes before any batch call
+PRIORITIES = ("interactive", "batch")
+
+# Tool errors worth retrying: rate limiting and transient upstream failures
+RETRYABLE_ERROR = re.compile(r"\b(429|50[0234])\b|too many requests|rate limit|service unavailable|bad gateway|gateway time-?out", re.IGNORECASE)
+RETRY_AFTER = re.compile(r"retry[- ]after\D{0,3}(\d+(?:\.\d+)?)", re.IGNORECASE)
+
+_priority: ContextVar[str] = ContextVar("upstream_scheduler_priority", default="interactive")
+
+
+@contextmanager
+def call_priority(priority: str) -> Iterator[None]:
+    """Schedule the upstream calls made inside this block (and the tasks it starts) at `priority`."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority {priority!r}, expected one of {', '.join(PRIORITIES)}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+
+class UpstreamScheduler:
+    """Paces, caps, prioritizes and retries the calls to one upstream server.
+
+    Args:
+        name: Upstream name used in logs and latency labels
+        rate: Calls started per second, on average
+        burst: Calls that may start at once after an idle period
+        max_concurrency: Calls in flight at the same time
+        max_retries: Retries of a call that keeps failing with a 429 or 5xx
+        base_delay: Backoff before the first retry, doubled on each further one
+        max_delay: Upper bound of a single backoff
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, max_concurrency: int, max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._bucket = TokenBucket(rate, burst)
+        self._queues: Dict[str, Deque["asyncio.Future[None]"]] = {priority: deque() for priority in PRIORITIES}
+        self._waits = {priority: RollingHistogram() for priority in PRIORITIES}
+        self._active = 0
+        self._paused_until = 0.0
+        self._released: Optional[asyncio.Event] = None
+        self._dispatcher: Optional["asyncio.Task[None]"] = None
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.max_queue_depth = 0
+
+    async def run(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `call` once admitted, retrying it while the upstream answers with 429s or 5xx errors."""
+        priority = _priority.get()
+        self.calls += 1
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(priority)
+            try:
+                return await call()
+            except ModelRetry as e:
+                if not RETRYABLE_ERROR.search(str(e)):
+                    raise
+                self.throttled += 1
+                if attempt == self.max_retries:
+                    self.failures += 1
+                    raise
+                self._back_off(attempt, str(e))
+                self.retries += 1
+            finally:
+                self._release()
+        raise AssertionError("unreachable")
+
+    def _back_off(self, attempt: int, error: str) -> None:
+        """Pause the upstream for a jittered exponential backoff, or for the delay the upstream asked for."""
+        retry_after = RETRY_AFTER.search(error)
+        if retry_after:
+            delay = min(self.max_delay, float(retry_after.group(1)))
+        else:
+            delay = random.uniform(0.5, 1.0) * min(self.max_delay, self.base_delay * 2 ** attempt)
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        logfire.info("{upstream} throttled, backing off {delay:.1f}s: {error}", upstream=self.name, delay=delay, error=error[:200])
+
+    async def _acquire(self, priority: str) -> None:
+        admitted = asyncio.get_running_loop().create_future()
+        queue = self._queues[priority]
+        queue.append(admitted)
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth())
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch(), name=f"upstream-scheduler:{self.name}")
+        start = time.perf_counter()
+        try:
+            await admitted
+        except asyncio.CancelledError:
+            if admitted.done() and not admitted.cancelled():
+                self._release()
+            elif admitted in queue:
+                queue.remove(admitted)
+            raise
+        waited = time.perf_counter() - start
+        self._waits[priority].record(waited)
+        latency.record("mcp.queue_wait", waited, server=self.name, priority=priority)
+
+    def _release(self) -> None:
+        self._active -= 1
+        if self._released is not None:
+            self._released.set()
+
+    def _next(self) -> Optional[Deque["asyncio.Future[None]"]]:
+        """The highest-priority queue with a live waiter at its head."""
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue and queue[0].cancelled():
+                queue.popleft()
+            if queue:
+                return queue
+        return None
+
+    async def _dispatch(self) -> None:
+        self._released = asyncio.Event()
+        while (queue := self._next()) is not None:
+            if self._active >= self.max_concurrency:
+                self._released.clear()
+                await self._released.wait()
+                continue
+            delay = max(self._bucket.delay(), self._paused_until - time.monotonic())
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+            self._bucket.take()
+            self._active += 1
+            queue.popleft().set_result(None)
+
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "in_flight": self._active,
+            "queued": {priority: len(queue) for priority, queue in self._queues.items()},
+            "max_queue_depth": self.max_queue_depth,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "failures": self.failures,
+            "paused_seconds": max(0.0, self._paused_until - time.monotonic()),
+            "wait_seconds": {priority: histogram.snapshot() for priority, histogram in self._waits.items()},
+        }
+
+
+# Semantic Scholar allows about one request per second per key; bursts are absorbed by the queue
+semantic_scholar_scheduler = UpstreamScheduler("semantic_scholar", rate=1.0, burst=5, max_concurrency=4)
+fetch_scheduler = UpstreamScheduler("fetch", rate=10.0, burst=20, max_concurrency=8)